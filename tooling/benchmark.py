@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark the tooling on seeded synthetic ontologies of increasing size
+
+For each size a synthetic TBox, SKOS vocabulary and ABox are generated by
+`synthetic_ontology.py` and the following phases are timed:
+  generate       writing the synthetic files
+  parse          cold RDFLib parse of all three files (no snapshot)
+  snapshot_load  warm load of the same files from the graph snapshot cache
+  query          the five generate_*_viz.py generators (DOT only, no layout),
+                 with the on-disk SPARQL result cache off
+  query_cached   the same generators answered from a warm result cache
+  dot_build      owl2dot label index, hierarchy extraction and DOT text
+  reduction      transitive reduction and closure index over the hierarchy
+  validation     every queries/*.rq check against the combined graph
+
+Each phase runs --repeat times; the JSON output keeps every run plus the
+median, so results from different commits can be compared with --compare.
+Snapshots and cached results are written to a temporary cache directory,
+never to build/cache. MHM_SPARQL_ENDPOINT is ignored, so every query runs
+in this process.
+
+Usage:
+  python3 benchmark.py [--sizes 1k,10k,100k,1m] [--seed 42] [--repeat 3]
+      [--output build/bench/results-<timestamp>.json] [--compare OLD.json] [--keep DIR]
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import rdflib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = '1k,10k,100k,1m'
+PHASES = ['generate', 'parse', 'snapshot_load', 'query', 'query_cached', 'dot_build', 'reduction', 'validation']
+
+def timed(fn, repeat):
+    """Run fn `repeat` times with stdout silenced; returns (run seconds, last result)"""
+    runs, result = [], None
+    for _ in range(repeat):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            started = time.perf_counter()
+            result = fn()
+            runs.append(round(time.perf_counter() - started, 6))
+    return runs, result
+
+def phase_query(tbox, all_files, out_dir):
+    """Run the five DOT generators through fresh query sessions"""
+    import sparql_session
+    from generate_hierarchy_viz import generate_class_hierarchy_dot
+    from generate_objprop_viz import generate_object_properties_dot
+    from generate_dataprop_viz import generate_data_properties_dot
+    from generate_layers_viz import generate_layers_dot
+    from generate_external_mappings_viz import generate_external_mappings_dot
+
+    sparql_session.get_session(tbox).graph  # loading is measured separately
+    sparql_session.get_session(all_files).graph
+    generate_class_hierarchy_dot(tbox, os.path.join(out_dir, 'class-hierarchy.dot'))
+    generate_object_properties_dot(tbox, os.path.join(out_dir, 'object-properties.dot'))
+    generate_data_properties_dot(tbox, os.path.join(out_dir, 'data-properties.dot'))
+    generate_layers_dot(tbox, os.path.join(out_dir, 'layers-overview.dot'))
+    generate_external_mappings_dot(all_files, os.path.join(out_dir, 'external-mappings.dot'))
+
+def phase_dot_build(g):
+    """owl2dot's in-memory path for the three DOT views"""
+    from owl2dot import (TermTable, build_label_index, get_class_hierarchy, get_object_properties,
+                         get_data_properties, generate_class_dot, generate_objprop_dot,
+                         generate_dataprop_dot)
+    labels = build_label_index(g)
+    terms = TermTable()
+    generate_class_dot(labels, terms, get_class_hierarchy(g, terms))
+    generate_objprop_dot(labels, terms, *get_object_properties(g, terms))
+    generate_dataprop_dot(labels, terms, *get_data_properties(g, terms))
+
+def phase_reduction(g):
+    """Transitive reduction plus closure index over the subclass/subproperty hierarchy"""
+    from hierarchy import ClosureIndex, transitive_reduction
+    from subgraph import hierarchy_children
+    children = hierarchy_children(g)
+    transitive_reduction(children)
+    ClosureIndex(children)
+
+def phase_validation(all_files):
+    """All query checks against the combined graph; returns (passed, total)"""
+    import validate_queries
+    validate_queries._GRAPH = None  # new data for every size
+    queries = sorted(glob.glob(os.path.join(REPO_ROOT, 'queries', '*.rq')))
+    results, _ = validate_queries.run_checks(all_files, queries)
+    return sum(1 for r in results if r['passed']), len(results)
+
+@contextlib.contextmanager
+def result_cache():
+    """Turn the on-disk SPARQL result cache on for the enclosed block"""
+    os.environ['MHM_SPARQL_CACHE'] = '1'
+    try:
+        yield
+    finally:
+        os.environ['MHM_SPARQL_CACHE'] = '0'
+
+def bench_size(size, seed, repeat, work_dir):
+    """Generate one synthetic ontology and time every phase on it"""
+    import graph_cache
+    import sparql_session
+    from synthetic_ontology import generate
+
+    runs = {}
+    runs['generate'], info = timed(lambda: generate(work_dir, size, seed), repeat)
+    tbox = info['tbox']
+    all_files = [info['tbox'], info['vocab'], info['abox']]
+
+    runs['parse'], g = timed(lambda: graph_cache.parse_sources(all_files), repeat)
+    graph_cache.load_graph(all_files)  # write the snapshot
+    runs['snapshot_load'], _ = timed(lambda: graph_cache.load_graph(all_files), repeat)
+
+    dot_dir = os.path.join(work_dir, 'dot')
+    os.makedirs(dot_dir, exist_ok=True)
+
+    def query():
+        sparql_session._SESSIONS.clear()
+        phase_query(tbox, all_files, dot_dir)
+    # Session loads are part of each run; subtract a separately timed load
+    runs['query'], _ = timed(query, repeat)
+    load_runs, _ = timed(lambda: (graph_cache.load_graph(tbox), graph_cache.load_graph(all_files)), repeat)
+    runs['query'] = [round(max(0.0, q - l), 6) for q, l in zip(runs['query'], load_runs)]
+    with result_cache():
+        query()  # fill the cache
+        runs['query_cached'], _ = timed(query, repeat)
+    sparql_session._SESSIONS.clear()
+
+    tbox_graph = graph_cache.load_graph(tbox)
+    runs['dot_build'], _ = timed(lambda: phase_dot_build(tbox_graph), repeat)
+    runs['reduction'], _ = timed(lambda: phase_reduction(tbox_graph), repeat)
+    runs['validation'], (passed, total) = timed(lambda: phase_validation(all_files), repeat)
+
+    return {
+        'size': size,
+        'triples': len(g),
+        'classes': info['classes'],
+        'concepts': info['concepts'],
+        'checks_passed': passed,
+        'checks_total': total,
+        'phases': {name: {'median': round(statistics.median(runs[name]), 6), 'runs': runs[name]} for name in PHASES},
+    }
+
+def print_row(result, previous=None):
+    phases = result['phases']
+    cells = []
+    for name in PHASES:
+        cell = f"{name}={phases[name]['median']:.3f}s"
+        old = previous and previous['phases'].get(name)
+        if old and old['median'] > 0:
+            cell += f" ({phases[name]['median'] / old['median']:.2f}x)"
+        cells.append(cell)
+    print(f"[bench] {result['size']:>8} ({result['triples']} triples): " + ' '.join(cells))
+
+def load_previous(path):
+    """Index an earlier results file by size"""
+    with open(path) as f:
+        return {r['size']: r for r in json.load(f)['results']}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Time the tooling on synthetic ontologies of several sizes')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f'Comma-separated target triple counts (default: {DEFAULT_SIZES})')
+    parser.add_argument('--seed', type=int, default=42, help='Generator seed (default: 42)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per phase (default: 3)')
+    parser.add_argument('--output', help='Results JSON (default: build/bench/results-<timestamp>.json)')
+    parser.add_argument('--compare', help='Earlier results JSON to print speed ratios against')
+    parser.add_argument('--keep', help='Keep the generated ontologies in this directory')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    from synthetic_ontology import parse_size
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    previous = load_previous(args.compare) if args.compare else {}
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    output = args.output or os.path.join(REPO_ROOT, 'build', 'bench', f'results-{stamp}.json')
+
+    work_root = args.keep or tempfile.mkdtemp(prefix='mhm-bench-')
+    os.environ['MHM_CACHE_DIR'] = os.path.join(work_root, 'cache')
+    os.environ.pop('MHM_GRAPH_CACHE', None)
+    os.environ['MHM_SPARQL_CACHE'] = '0'  # every query run evaluates; query_cached times the cache
+    os.environ.pop('MHM_SPARQL_ENDPOINT', None)
+    results = []
+    try:
+        for size in sizes:
+            result = bench_size(size, args.seed, max(1, args.repeat), os.path.join(work_root, str(size)))
+            print_row(result, previous.get(size))
+            results.append(result)
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'timestamp': stamp,
+            'python': platform.python_version(),
+            'rdflib': rdflib.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'results': results,
+        }, f, indent=2)
+    print(f"[bench] results written to {output}")
+
+if __name__ == '__main__':
+    sys.exit(main())
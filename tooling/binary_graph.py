@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Dictionary-encoded binary graphs that load with mmap
+
+A `.mhmb` file holds a sorted term dictionary and the triples as uint32
+term IDs in three sorted permutations (SPO, POS and OSP):
+
+  header   magic "MHMB", version, term/triple counts, section offsets,
+           SHA-256 source key (same key as the graph snapshots)
+  offsets  uint32[terms + 1] into the term blob
+  terms    UTF-8 encoded terms, sorted ('U' IRI, 'B' blank node,
+           'L' lexical \\0 datatype \\0 language)
+  spo/pos/osp  uint32[triples * 3], each sorted in its own order
+
+`BinaryGraph` maps the file read-only and reads the arrays in place
+(memoryview casts, no copy). Processes that open the same file share its
+pages through the OS page cache, instead of each building its own rdflib
+graph. Pattern lookups binary-search the permutation whose prefix is bound.
+Terms are decoded only when a match is returned. `to_graph()` builds a
+regular rdflib Graph for code that needs SPARQL.
+
+`load_binary(sources)` keeps content-addressed files under
+`build/cache/binary/` and exports on a miss, like `graph_cache.load_graph`.
+
+Usage:
+  python3 binary_graph.py export FILE [FILE ...] [--output OUT.mhmb]
+  python3 binary_graph.py export-all            # ontology, classified-elk, alignments/, vocab/
+  python3 binary_graph.py import IN.mhmb --output OUT.ttl
+  python3 binary_graph.py info IN.mhmb
+  python3 binary_graph.py query IN.mhmb [S|?] [P|?] [O|?]
+"""
+
+import argparse
+import glob
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from rdflib import BNode, Graph, Literal, URIRef
+
+from graph_cache import cache_dir, load_graph, source_key
+from profiling import add_profile_arg, configure, phase
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAGIC = b'MHMB'
+FORMAT_VERSION = 1
+# magic, version, byte order, terms, triples, offsets/terms/spo/pos/osp positions, source key
+HEADER = struct.Struct('<4sIBxxxII5Q32s')
+PERMUTATIONS = {'spo': (0, 1, 2), 'pos': (1, 2, 0), 'osp': (2, 0, 1)}
+DEFAULT_SETS = {
+    'mhm_ontology': ['mhm_ontology.owl'],
+    'classified-elk': ['classified-elk.owl'],
+    'alignments': ['alignments/*.owl', 'alignments/*.ttl'],
+    'vocab': ['vocab/*.ttl'],
+}
+
+def encode_term(term):
+    if isinstance(term, URIRef):
+        return 'U' + str(term)
+    if isinstance(term, BNode):
+        return 'B' + str(term)
+    return f"L{term}\0{term.datatype or ''}\0{term.language or ''}"
+
+def decode_term(text):
+    kind, body = text[0], text[1:]
+    if kind == 'U':
+        return URIRef(body)
+    if kind == 'B':
+        return BNode(body)
+    lexical, datatype, language = body.split('\0')
+    return Literal(lexical, datatype=URIRef(datatype) if datatype else None, lang=language or None)
+
+def _align(f):
+    pad = -f.tell() % 8
+    f.write(b'\0' * pad)
+    return f.tell()
+
+def write_binary(g, path, key=''):
+    """Write graph g as a .mhmb file"""
+    terms = sorted({encode_term(t) for triple in g for t in triple})
+    ids = {t: i for i, t in enumerate(terms)}
+    rows = [(ids[encode_term(s)], ids[encode_term(p)], ids[encode_term(o)]) for s, p, o in g]
+
+    blob = bytearray()
+    offsets = array('I', [0])
+    for t in terms:
+        blob += t.encode('utf-8')
+        offsets.append(len(blob))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(b'\0' * HEADER.size)
+        positions = []
+        positions.append(_align(f))
+        f.write(offsets.tobytes())
+        positions.append(_align(f))
+        f.write(bytes(blob))
+        for order in PERMUTATIONS.values():
+            positions.append(_align(f))
+            flat = array('I')
+            for row in sorted(tuple(r[i] for i in order) for r in rows):
+                flat.extend(row)
+            f.write(flat.tobytes())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder == 'little', len(terms), len(rows),
+                            *positions, bytes.fromhex(key)[:32].ljust(32, b'\0')))
+    os.replace(tmp, path)
+    return len(terms), len(rows)
+
+class BinaryGraph:
+    """Read-only, memory-mapped view of a .mhmb file with rdflib-style lookups"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, little, self.n_terms, self.n_triples, *positions, key = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path}: not a version {FORMAT_VERSION} binary graph")
+        if bool(little) != (sys.byteorder == 'little'):
+            raise ValueError(f"{path}: written on a machine with a different byte order")
+        self.key = key.hex()
+        view = self._view = memoryview(self._map)
+        offsets_at, terms_at, *perm_at = positions
+        self._offsets = view[offsets_at:offsets_at + 4 * (self.n_terms + 1)].cast('I')
+        self._terms = view[terms_at:terms_at + self._offsets[self.n_terms]]
+        self._perms = {name: view[at:at + 12 * self.n_triples].cast('I')
+                       for name, at in zip(PERMUTATIONS, perm_at)}
+        self._decoded = {}
+
+    def close(self):
+        """Unmap the file; unfinished triples() iterators raise ValueError if resumed"""
+        for v in [self._offsets, self._terms, *self._perms.values(), self._view]:
+            v.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.n_triples
+
+    def _text(self, i):
+        return bytes(self._terms[self._offsets[i]:self._offsets[i + 1]]).decode('utf-8')
+
+    def term(self, i):
+        """rdflib term for a term ID (decoded once)"""
+        term = self._decoded.get(i)
+        if term is None:
+            term = self._decoded[i] = decode_term(self._text(i))
+        return term
+
+    def lookup(self, term):
+        """Term ID of an rdflib term, or None if the graph does not contain it"""
+        target = encode_term(term).encode('utf-8')
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(self._terms[self._offsets[mid]:self._offsets[mid + 1]]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.n_terms and self._text(lo).encode('utf-8') == target else None
+
+    def _range(self, perm, prefix):
+        """Row range of perm whose leading columns equal prefix"""
+        n, k = self.n_triples, len(prefix)
+
+        def row(i):
+            return tuple(perm[3 * i:3 * i + k])
+
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if row(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        start, hi = lo, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if row(mid) <= prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def triple_ids(self, pattern):
+        """Yield (s, p, o) term IDs matching an ID pattern with None wildcards"""
+        s, p, o = pattern
+        if s is not None:
+            if p is not None:
+                name, prefix = 'spo', (s, p) if o is None else (s, p, o)
+            else:
+                name, prefix = ('spo', (s,)) if o is None else ('osp', (o, s))
+        elif p is not None:
+            name, prefix = 'pos', (p,) if o is None else (p, o)
+        elif o is not None:
+            name, prefix = 'osp', (o,)
+        else:
+            name, prefix = 'spo', ()
+        perm, order = self._perms[name], PERMUTATIONS[name]
+        start, end = self._range(perm, prefix) if prefix else (0, self.n_triples)
+        for i in range(start, end):
+            row = tuple(perm[3 * i:3 * i + 3])  # no slice of the map stays alive across the yield
+            spo = [0, 0, 0]
+            for column, position in enumerate(order):
+                spo[position] = row[column]
+            yield tuple(spo)
+
+    def triples(self, pattern=(None, None, None)):
+        """rdflib-style triple pattern matching"""
+        ids = []
+        for term in pattern:
+            if term is None:
+                ids.append(None)
+                continue
+            i = self.lookup(term)
+            if i is None:
+                return
+            ids.append(i)
+        for s, p, o in self.triple_ids(tuple(ids)):
+            yield self.term(s), self.term(p), self.term(o)
+
+    def __iter__(self):
+        return self.triples()
+
+    def __contains__(self, triple):
+        return next(self.triples(triple), None) is not None
+
+    def subjects(self, predicate=None, obj=None):
+        return (s for s, _, _ in self.triples((None, predicate, obj)))
+
+    def objects(self, subject=None, predicate=None):
+        return (o for _, _, o in self.triples((subject, predicate, None)))
+
+    def subject_objects(self, predicate=None):
+        return ((s, o) for s, _, o in self.triples((None, predicate, None)))
+
+    def value(self, subject=None, predicate=None, obj=None):
+        """First matching object (or subject when obj is given), like Graph.value"""
+        for s, _, o in self.triples((subject, predicate, obj)):
+            return s if obj is not None else o
+        return None
+
+    def to_graph(self):
+        """Materialize a regular rdflib Graph (needed for SPARQL)"""
+        g = Graph()
+        for triple in self.triples():
+            g.add(triple)
+        return g
+
+def load_binary(sources, catalog=None):
+    """Memory-mapped BinaryGraph for the source files, exporting on a cache miss"""
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    sources = [os.fspath(s) for s in sources]
+    key = source_key(sources, catalog)
+    path = os.path.join(cache_dir('binary'), key + '.mhmb')
+    if not os.path.exists(path):
+        with phase('write binary', 'write'):
+            write_binary(load_graph(sources, catalog), path, key)
+    with phase('map binary', 'load'):
+        return BinaryGraph(path)
+
+def expand(patterns):
+    files = []
+    for pattern in patterns:
+        files.extend(sorted(glob.glob(os.path.join(REPO_ROOT, pattern))))
+    return files
+
+def export(files, output):
+    started = time.perf_counter()
+    key = source_key(files)
+    terms, triples = write_binary(load_graph(files), output, key)
+    size = os.path.getsize(output)
+    print(f"[binary] {output}: {triples} triples, {terms} terms, {size / 1024:.1f} KiB "
+          f"({time.perf_counter() - started:.2f}s)")
+
+def parse_term(text):
+    """Command-line term: ? (any), <IRI>, IRI, _:bnode or a plain literal"""
+    if text in ('?', '_'):
+        return None
+    if text.startswith('<') and text.endswith('>'):
+        return URIRef(text[1:-1])
+    if text.startswith('_:'):
+        return BNode(text[2:])
+    if '://' in text:
+        return URIRef(text)
+    return Literal(text)
+
+def main():
+    ap = argparse.ArgumentParser(description='Export, import and query dictionary-encoded binary graphs')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    e = sub.add_parser('export', help='Encode RDF files as one .mhmb file')
+    e.add_argument('files', nargs='+')
+    e.add_argument('--output', help='Output file (default: build/binary/<first file>.mhmb)')
+    a = sub.add_parser('export-all', help='Encode the ontology, classified-elk, alignments/ and vocab/')
+    a.add_argument('--output-dir', default=os.path.join(REPO_ROOT, 'build', 'binary'))
+    i = sub.add_parser('import', help='Decode a .mhmb file back to RDF')
+    i.add_argument('input')
+    i.add_argument('--output', required=True)
+    i.add_argument('--format', default='turtle')
+    n = sub.add_parser('info', help='Show counts and section sizes')
+    n.add_argument('input')
+    q = sub.add_parser('query', help='Match a triple pattern (? for any term)')
+    q.add_argument('input')
+    q.add_argument('pattern', nargs='*', default=[])
+    for parser in (e, a, i, n, q):
+        add_profile_arg(parser)
+    args = ap.parse_args()
+    configure(args.profile)
+
+    if args.cmd == 'export':
+        name = os.path.splitext(os.path.basename(args.files[0]))[0]
+        export(args.files, args.output or os.path.join(REPO_ROOT, 'build', 'binary', name + '.mhmb'))
+    elif args.cmd == 'export-all':
+        for name, patterns in DEFAULT_SETS.items():
+            files = [f for f in expand(patterns) if os.path.exists(f)]
+            if files:
+                export(files, os.path.join(args.output_dir, name + '.mhmb'))
+            else:
+                print(f"[binary] {name}: no input files, skipped")
+    elif args.cmd == 'import':
+        with BinaryGraph(args.input) as bg:
+            bg.to_graph().serialize(args.output, format=args.format)
+            print(f"[binary] {args.output}: {len(bg)} triples")
+    elif args.cmd == 'info':
+        started = time.perf_counter()
+        with BinaryGraph(args.input) as bg:
+            opened = time.perf_counter() - started
+            print(f"{args.input}: {bg.n_triples} triples, {bg.n_terms} terms, "
+                  f"{os.path.getsize(args.input) / 1024:.1f} KiB, opened in {opened * 1000:.2f} ms, "
+                  f"source key {bg.key[:16]}")
+    else:
+        pattern = [parse_term(t) for t in args.pattern] + [None] * (3 - len(args.pattern))
+        with BinaryGraph(args.input) as bg:
+            for triple in bg.triples(tuple(pattern[:3])):
+                print(' '.join(t.n3() for t in triple))
+
+if __name__ == '__main__':
+    main()
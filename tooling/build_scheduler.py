@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Small dependency-aware build scheduler for the docs artifacts
+
+Each artifact (a DOT file, an SVG per engine, a canonical copy) is a `Task`
+with declared input files and output files. A task depends on whichever
+task produces one of its inputs. Ready tasks run concurrently on a thread
+pool: Python actions share the process (and its parsed graphs), while
+Graphviz layouts run as subprocesses and release the GIL.
+
+A task is skipped when the stamp recorded after its last successful run
+matches the current key (a hash of the task's params and the content of its
+inputs) and its outputs still have the content recorded in the stamp. An
+output overwritten by another command (e.g. `visualize-classes --unflatten`
+writing the same DOT file) is therefore rebuilt. Because upstream outputs are inputs of
+downstream tasks, an edit that leaves a DOT file byte-identical also leaves
+its SVG untouched.
+
+Stamps are stored in `build/cache/stamps/`.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from graph_cache import cache_dir, file_digest
+from profiling import phase
+
+class Task:
+    """One build step: run `action` to turn `inputs` into `outputs`"""
+
+    def __init__(self, name, action, inputs=(), outputs=(), params=''):
+        self.name = name
+        self.action = action
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params
+
+    def key(self):
+        """Hash of params and current input contents"""
+        h = hashlib.sha256()
+        h.update(f"params:{self.params}\n".encode())
+        for path in self.inputs:
+            digest = file_digest(path) if os.path.exists(path) else 'missing'
+            h.update(f"input:{path}:{digest}\n".encode())
+        return h.hexdigest()
+
+def _stamp_path(task):
+    safe = re.sub(r'[^A-Za-z0-9_.-]+', '_', task.name)
+    return os.path.join(cache_dir('stamps'), safe + '.json')
+
+def _output_digests(task):
+    return {path: file_digest(path) if os.path.exists(path) else 'missing' for path in task.outputs}
+
+def is_up_to_date(task, key):
+    if not all(os.path.exists(p) for p in task.outputs):
+        return False
+    try:
+        with open(_stamp_path(task)) as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return stamp.get('key') == key and stamp.get('outputs') == _output_digests(task)
+
+def write_stamp(task, key):
+    with open(_stamp_path(task), 'w') as f:
+        json.dump({'key': key, 'outputs': _output_digests(task)}, f)
+
+def dependencies(tasks):
+    """Map task name -> names of tasks producing its inputs"""
+    producers = {}
+    for task in tasks:
+        for path in task.outputs:
+            producers[os.path.abspath(path)] = task.name
+    deps = {}
+    for task in tasks:
+        deps[task.name] = {producers[os.path.abspath(p)] for p in task.inputs
+                           if os.path.abspath(p) in producers} - {task.name}
+    return deps
+
+def run_tasks(tasks, jobs=os.cpu_count() or 1, force=False):
+    """Run the task graph; returns {name: 'built'|'skipped'|'failed'|'blocked'}"""
+    by_name = {t.name: t for t in tasks}
+    deps = dependencies(tasks)
+    dependents = {name: set() for name in by_name}
+    for name, upstream in deps.items():
+        for up in upstream:
+            dependents[up].add(name)
+    waiting = {name: set(upstream) for name, upstream in deps.items()}
+    status = {}
+
+    def execute(task):
+        key = task.key()
+        if not force and is_up_to_date(task, key):
+            return 'skipped', 0.0
+        started = time.perf_counter()
+        for path in task.outputs:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with phase(task.name, 'task'):
+            task.action()
+        write_stamp(task, key)
+        return 'built', time.perf_counter() - started
+
+    def block(name):
+        for down in dependents[name]:
+            if down not in status:
+                status[down] = 'blocked'
+                print(f"[build] blocked  {down} (upstream failed)")
+                block(down)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        running = {}
+
+        def submit_ready():
+            for name in sorted(waiting):
+                if not waiting[name] and name not in status and name not in running.values():
+                    running[pool.submit(execute, by_name[name])] = name
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    state, seconds = future.result()
+                    status[name] = state
+                    timing = f" ({seconds:.2f}s)" if state == 'built' else ''
+                    print(f"[build] {state:<8} {name}{timing}")
+                except Exception:
+                    status[name] = 'failed'
+                    print(f"[build] failed   {name}", file=sys.stderr)
+                    traceback.print_exc()
+                    block(name)
+                    continue
+                for down in dependents[name]:
+                    waiting[down].discard(name)
+            submit_ready()
+    return status
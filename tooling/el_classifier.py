@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+In-process classifier for the OWL 2 EL subset used by the ontology
+
+Covers what `mhm_ontology.owl` uses: named-class subsumption, equivalence
+with intersections of existential restrictions, object property hierarchy
+and domains, plus disjointness (for unsatisfiable classes). Axioms using
+anything else (unions, universals, cardinalities, ranges) are skipped and
+counted, like ELK skips what it does not support.
+
+Each logical axiom is turned into a canonical form and hashed. The axioms
+are normalized (structurally named fresh concepts `_:<hash>`, so the same
+expression gets the same name in every run) and saturated with the EL
+completion rules:
+  A ∈ S(X), A ⊑ B                          =>  B ∈ S(X)
+  A1, A2 ∈ S(X), A1 ⊓ A2 ⊑ B                =>  B ∈ S(X)
+  A ∈ S(X), A ⊑ ∃r.B                        =>  link X -r-> B
+  X -r-> Y, A ∈ S(Y), r ⊑* s, ∃s.A ⊑ B      =>  B ∈ S(X)
+  X -r-> Y, ⊥ ∈ S(Y)                        =>  ⊥ ∈ S(X)
+
+The saturated state is kept under `build/cache/el/` together with the axiom
+hashes it was computed from. When the ontology only gained axioms the stored
+state is reused and saturation resumes from the facts the new axioms can
+fire on; removed axioms (or a changed property hierarchy) mean a full
+recompute.
+
+The result is written as a taxonomy (direct rdfs:subClassOf edges and
+owl:equivalentClass between named classes, unsatisfiable classes under
+owl:Nothing) that `subsumption_index.py build --inferred` accepts. ROBOT
+with ELK (`run_ontology_tools.sh reason`) stays the authoritative check;
+`--check classified-elk.owl` compares the two hierarchies.
+
+Usage:
+  python3 el_classifier.py mhm_ontology.owl [--output build/classified-el.ttl]
+      [--full] [--check classified-elk.owl] [--index]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from collections import deque
+
+from rdflib import BNode, Graph, OWL, RDF, RDFS, URIRef
+
+from graph_cache import cache_dir, load_graph
+from hierarchy import ClosureIndex
+from profiling import add_profile_arg, configure, phase
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_VERSION = 1
+THING = str(OWL.Thing)
+NOTHING = str(OWL.Nothing)
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, 'build', 'classified-el.ttl')
+
+class Unsupported(Exception):
+    """Class expression outside the supported EL subset"""
+
+def rdf_list(g, node):
+    items = []
+    while node and node != RDF.nil:
+        items.append(g.value(node, RDF.first))
+        node = g.value(node, RDF.rest)
+    return items
+
+def expression(g, node):
+    """Canonical form of a class expression: an IRI string or a nested tuple"""
+    if isinstance(node, URIRef):
+        return str(node)
+    if not isinstance(node, BNode):
+        raise Unsupported(node)
+    members = g.value(node, OWL.intersectionOf)
+    if members is not None:
+        parts = sorted({expression(g, m) for m in rdf_list(g, members)}, key=repr)
+        return parts[0] if len(parts) == 1 else ('and',) + tuple(parts)
+    prop, filler = g.value(node, OWL.onProperty), g.value(node, OWL.someValuesFrom)
+    if isinstance(prop, URIRef) and filler is not None:
+        return ('some', str(prop), expression(g, filler))
+    raise Unsupported(node)
+
+def extract_axioms(g):
+    """Return ({hash: axiom}, named classes, skipped count) for the EL axioms in g"""
+    object_props = set(g.subjects(RDF.type, OWL.ObjectProperty))
+    named = {str(c) for c in g.subjects(RDF.type, OWL.Class) if isinstance(c, URIRef)}
+    found, skipped = [], 0
+
+    def add(kind, *nodes):
+        nonlocal skipped
+        try:
+            found.append((kind,) + tuple(expression(g, n) for n in nodes))
+        except Unsupported:
+            skipped += 1
+
+    for sub, sup in g.subject_objects(RDFS.subClassOf):
+        add('SubClassOf', sub, sup)
+    for a, b in g.subject_objects(OWL.equivalentClass):
+        add('EquivalentClasses', *sorted((a, b), key=repr))
+    for a, b in g.subject_objects(OWL.disjointWith):
+        add('DisjointClasses', *sorted((a, b), key=repr))
+    for r, s in g.subject_objects(RDFS.subPropertyOf):
+        if r in object_props and s in object_props:
+            found.append(('SubObjectPropertyOf', str(r), str(s)))
+    for r, domain in g.subject_objects(RDFS.domain):
+        if r in object_props:
+            add('ObjectPropertyDomain', r, domain)
+
+    axioms = {axiom_hash(axiom): axiom for axiom in found}
+    for axiom in axioms.values():
+        named.update(names_in(axiom))
+    named -= {THING, NOTHING}
+    return axioms, named, skipped
+
+def axiom_hash(axiom):
+    return hashlib.sha256(json.dumps(axiom).encode()).hexdigest()[:16]
+
+def names_in(expr):
+    """Class IRIs mentioned in an axiom or expression (property IRIs excluded)"""
+    if isinstance(expr, str):
+        return {expr}
+    if expr[0] == 'some':
+        return names_in(expr[2])
+    if expr[0] == 'SubObjectPropertyOf':
+        return set()
+    if expr[0] == 'ObjectPropertyDomain':
+        return names_in(expr[2])
+    return set().union(*(names_in(e) for e in expr[1:]))
+
+def fresh(expr):
+    """Structural name for a complex expression"""
+    return expr if isinstance(expr, str) else '_:' + axiom_hash(expr)
+
+def normalize(axiom):
+    """Normal forms for one axiom:
+      ('sub', A, B)  ('and', A1, A2, B)  ('ex+', A, r, B)  ('ex-', r, A, B)  ('role', r, s)
+    """
+    out = []
+
+    def left(expr):  # atom N with expr ⊑ N
+        if isinstance(expr, str):
+            return expr
+        if expr[0] == 'some':
+            out.append(('ex-', expr[1], left(expr[2]), fresh(expr)))
+            return fresh(expr)
+        atoms = [left(e) for e in expr[1:]]
+        current = atoms[0]
+        for i in range(1, len(atoms)):
+            target = fresh(expr) if i == len(atoms) - 1 else fresh(('and',) + tuple(atoms[:i + 1]))
+            out.append(('and', current, atoms[i], target))
+            current = target
+        return current
+
+    def right(expr):  # atom N with N ⊑ expr
+        if isinstance(expr, str):
+            return expr
+        if expr[0] == 'some':
+            out.append(('ex+', fresh(expr), expr[1], right(expr[2])))
+        else:
+            out.extend(('sub', fresh(expr), right(e)) for e in expr[1:])
+        return fresh(expr)
+
+    def subsumption(sub, sup):
+        a, b = left(sub), right(sup)
+        if a != b:
+            out.append(('sub', a, b))
+
+    kind = axiom[0]
+    if kind == 'SubClassOf':
+        subsumption(axiom[1], axiom[2])
+    elif kind == 'EquivalentClasses':
+        subsumption(axiom[1], axiom[2])
+        subsumption(axiom[2], axiom[1])
+    elif kind == 'DisjointClasses':
+        out.append(('and', left(axiom[1]), left(axiom[2]), NOTHING))
+    elif kind == 'ObjectPropertyDomain':
+        out.append(('ex-', axiom[1], THING, right(axiom[2])))
+    elif kind == 'SubObjectPropertyOf':
+        out.append(('role', axiom[1], axiom[2]))
+    return out
+
+def premises(form):
+    """Concepts whose membership in some S(X) lets the normal form fire"""
+    if form[0] in ('sub', 'ex+'):
+        return (form[1],)
+    if form[0] == 'and':
+        return form[1:3]
+    if form[0] == 'ex-':
+        return (form[2],)
+    return ()
+
+class Saturation:
+    """Completion-rule saturation: S(X) per concept and r-links between concepts"""
+
+    def __init__(self, forms):
+        self.subs, self.conj, self.exr, self.exl = {}, {}, {}, {}
+        self.role_axioms = frozenset(f[1:] for f in forms if f[0] == 'role')
+        self.supers = {}
+        for r, s in self.role_axioms:
+            self.supers.setdefault(r, {r}).add(s)
+        changed = True
+        while changed:  # reflexive-transitive closure of the property hierarchy
+            changed = False
+            for r, sups in self.supers.items():
+                closure = set().union(*(self.supers.get(s, {s}) for s in sups))
+                if closure - sups:
+                    sups |= closure
+                    changed = True
+        self.S = {}
+        self.pred = {}  # Y -> {(r, X)} for links X -r-> Y
+        self.queue = deque()
+        self.add_forms(forms)
+
+    def add_forms(self, forms):
+        for form in forms:
+            kind = form[0]
+            if kind == 'sub':
+                self.subs.setdefault(form[1], set()).add(form[2])
+            elif kind == 'and':
+                self.conj.setdefault(form[1], set()).add((form[2], form[3]))
+                self.conj.setdefault(form[2], set()).add((form[1], form[3]))
+            elif kind == 'ex+':
+                self.exr.setdefault(form[1], set()).add((form[2], form[3]))
+            elif kind == 'ex-':
+                self.exl.setdefault((form[1], form[2]), set()).add(form[3])
+
+    def __getstate__(self):
+        return {'S': self.S, 'pred': self.pred, 'role_axioms': self.role_axioms}
+
+    def context(self, x):
+        if x not in self.S:
+            self.S[x] = set()
+            self.pred.setdefault(x, set())
+            self._add(x, x)
+            self._add(x, THING)
+
+    def _add(self, x, c):
+        if c not in self.S[x]:
+            self.S[x].add(c)
+            self.queue.append((x, c))
+
+    def _fire_link(self, x, r, c):
+        """Apply ∃s.c ⊑ D for every super-property s of r"""
+        for s in self.supers.get(r, (r,)):
+            for d in self.exl.get((s, c), ()):
+                self._add(x, d)
+        if c == NOTHING:
+            self._add(x, NOTHING)
+
+    def refire(self, concepts):
+        """Queue every existing fact c ∈ S(x) with c in concepts (after new axioms)"""
+        for x, cs in self.S.items():
+            for c in cs & concepts:
+                self.queue.append((x, c))
+
+    def run(self):
+        queue, S = self.queue, self.S
+        while queue:
+            item = queue.popleft()
+            if len(item) == 3:  # new link x -r-> y
+                x, r, y = item
+                for c in list(S[y]):
+                    self._fire_link(x, r, c)
+                continue
+            x, c = item
+            for d in self.subs.get(c, ()):
+                self._add(x, d)
+            for other, d in self.conj.get(c, ()):
+                if other in S[x]:
+                    self._add(x, d)
+            for r, y in self.exr.get(c, ()):
+                self.context(y)
+                if (r, x) not in self.pred[y]:
+                    self.pred[y].add((r, x))
+                    queue.append((x, r, y))
+            for r, w in list(self.pred[x]):
+                self._fire_link(w, r, c)
+
+def state_path(ontology):
+    key = hashlib.sha256(os.path.abspath(ontology).encode()).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(ontology))[0]
+    return os.path.join(cache_dir('el'), f"{name}-{key}.pickle")
+
+def load_state(path):
+    try:
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        return state if state.get('version') == STATE_VERSION else None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+def save_state(path, axioms, sat):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump({'version': STATE_VERSION, 'axioms': set(axioms), 'saturation': sat.__getstate__()},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+def classify(axioms, named, previous=None):
+    """Saturate; reuse the previous state when axioms were only added.
+
+    Returns (saturation, mode) with mode 'full', 'incremental' or 'unchanged'.
+    """
+    forms = {h: normalize(a) for h, a in axioms.items()}
+    everything = [f for fs in forms.values() for f in fs]
+    sat = Saturation(everything)
+    reusable = (previous is not None and previous['axioms'] <= set(axioms)
+                and previous['saturation']['role_axioms'] == sat.role_axioms)
+    if reusable:
+        sat.S = previous['saturation']['S']
+        sat.pred = previous['saturation']['pred']
+        added = set(axioms) - previous['axioms']
+        sat.refire({c for h in added for f in forms[h] for c in premises(f)})
+        mode = 'incremental' if added else 'unchanged'
+    else:
+        mode = 'full'
+    for cls in sorted(named):
+        sat.context(cls)
+    sat.run()
+    return sat, mode
+
+def taxonomy(sat, named):
+    """Return (direct supers, equivalents, unsatisfiable) over the named classes"""
+    supers = {a: {b for b in sat.S[a] if b in named} for a in named}
+    unsatisfiable = {a for a in named if NOTHING in sat.S[a]}
+    equivalents = {a: {b for b in supers[a] if a in supers[b]} for a in named}
+    direct = {}
+    for a in named:
+        if a in unsatisfiable:
+            continue
+        strict = {b for b in supers[a] if b not in equivalents[a] and b not in unsatisfiable}
+        direct[a] = {b for b in strict
+                     if not any(b in supers[c] and c not in equivalents[b] for c in strict)}
+    return direct, equivalents, unsatisfiable
+
+def write_taxonomy(path, direct, equivalents, unsatisfiable):
+    g = Graph()
+    g.bind('owl', OWL)
+    for a, parents in direct.items():
+        g.add((URIRef(a), RDF.type, OWL.Class))
+        for b in parents:
+            g.add((URIRef(a), RDFS.subClassOf, URIRef(b)))
+        for b in equivalents[a] - {a}:
+            g.add((URIRef(a), OWL.equivalentClass, URIRef(b)))
+    for a in unsatisfiable:
+        g.add((URIRef(a), RDFS.subClassOf, OWL.Nothing))
+    os.makedirs(os.path.dirname(os.path.abspath(path)) or '.', exist_ok=True)
+    g.serialize(path, format='turtle')
+
+def compare(sat, named, reference):
+    """Differences between our entailed subsumptions and a ROBOT-classified file"""
+    from subsumption_index import subclass_edges
+    closure = ClosureIndex(subclass_edges(load_graph(reference)))
+    shared = sorted(named & set(closure.nodes))
+    missing, extra = [], []
+    for a in shared:
+        ours = {b for b in sat.S[a] if b in named and b != a}
+        theirs = closure.ancestors(a)
+        missing += [(a, b) for b in sorted(theirs - ours) if b in named]
+        extra += [(a, b) for b in sorted(ours - theirs) if b in closure]
+    return missing, extra
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Classify the EL subset of an ontology in process')
+    parser.add_argument('ontology')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Taxonomy file (default: build/classified-el.ttl)')
+    parser.add_argument('--full', action='store_true', help='Ignore the stored state and saturate from scratch')
+    parser.add_argument('--check', metavar='CLASSIFIED', help='Compare with a ROBOT-classified ontology; exit 1 on differences')
+    parser.add_argument('--index', action='store_true', help='Also rebuild <ontology>.subsumption.json from the result')
+    add_profile_arg(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    configure(args.profile)
+    started = time.perf_counter()
+    g = load_graph(args.ontology)
+    with phase('extract axioms', 'build'):
+        axioms, named, skipped = extract_axioms(g)
+    path = state_path(args.ontology)
+    previous = None if args.full else load_state(path)
+    with phase('saturate', 'build'):
+        sat, mode = classify(axioms, named, previous)
+    save_state(path, axioms, sat)
+    direct, equivalents, unsatisfiable = taxonomy(sat, named)
+    with phase('write taxonomy', 'write'):
+        write_taxonomy(args.output, direct, equivalents, unsatisfiable)
+    seconds = time.perf_counter() - started
+
+    asserted = {(str(s), str(o)) for s, o in g.subject_objects(RDFS.subClassOf)}
+    for a in sorted(direct):
+        for b in sorted(direct[a]):
+            if (a, b) not in asserted:
+                print(f"[inferred] {a} ⊑ {b}")
+    asserted |= {(str(a), str(b)) for a, b in g.subject_objects(OWL.equivalentClass)}
+    for a in sorted(equivalents):
+        for b in sorted(equivalents[a]):
+            if a < b and (a, b) not in asserted and (b, a) not in asserted:
+                print(f"[inferred] {a} ≡ {b}")
+    for a in sorted(unsatisfiable):
+        print(f"[unsatisfiable] {a}")
+    print(f"[el] {len(axioms)} axioms ({skipped} outside EL skipped), {len(named)} classes, "
+          f"{mode} saturation in {seconds:.2f}s; wrote {args.output}")
+
+    if args.index:
+        from subsumption_index import SubsumptionIndex, index_path
+        index = SubsumptionIndex.build(args.ontology, args.output)
+        index.save(index_path(args.ontology))
+        print(f"[el] wrote {index_path(args.ontology)}")
+
+    status = 1 if unsatisfiable else 0
+    if args.check:
+        missing, extra = compare(sat, named, args.check)
+        for a, b in missing:
+            print(f"[check] only in {args.check}: {a} ⊑ {b}")
+        for a, b in extra:
+            print(f"[check] only here: {a} ⊑ {b}")
+        if missing or extra:
+            status = 1
+        else:
+            print(f"[check] hierarchy matches {args.check}")
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Generate every visualization in one process
+
+All generators share one in-process query session per input file, so the
+core ontology is parsed once for the class, object property, data property
+and layers views, and the merged (core + alignments) file once for the
+external mappings view.
+
+The work is modelled as a task graph (`build_scheduler.py`): one DOT task
+per view and engine, one Graphviz layout task per DOT file (through the
+layout cache in `layout_cache.py`), and a copy to the canonical
+`<view>.svg` for the default engine of each view. Independent tasks run
+concurrently and tasks whose inputs are unchanged are skipped.
+
+Usage:
+  python3 generate_all_viz.py mhm_ontology.owl --merged build/mappings-merged.owl [--render] [--all-engines]
+"""
+import argparse
+import os
+import shutil
+
+from build_scheduler import Task, run_tasks
+from generate_hierarchy_viz import generate_class_hierarchy_dot
+from generate_objprop_viz import generate_object_properties_dot
+from generate_dataprop_viz import generate_data_properties_dot
+from generate_layers_viz import generate_layers_dot, CONNECT
+from generate_external_mappings_viz import generate_external_mappings_dot
+from layout_cache import render as render_layout
+from profiling import add_profile_arg, configure
+
+TOOLING_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# view -> (generator script, default engine, extra engines for --all-engines)
+VIEWS = {
+    'class-hierarchy': ('generate_hierarchy_viz.py', 'dot', ['sfdp']),
+    'object-properties': ('generate_objprop_viz.py', 'sfdp', ['neato', 'dot']),
+    'data-properties': ('generate_dataprop_viz.py', 'dot', ['sfdp']),
+    'layers-overview': ('generate_layers_viz.py', 'dot', []),
+    'external-mappings': ('generate_external_mappings_viz.py', 'dot', []),
+}
+# Modules the generator scripts import; an edit to any of them can change the DOT output
+SHARED_MODULES = ['hierarchy.py', 'sparql_session.py', 'subgraph.py', 'graph_cache.py', 'profiling.py']
+
+def dot_action(view, engine, owl_file, merged_owl, dot_file, namespace):
+    """Return a callable that writes the DOT file for one view/engine"""
+    if view == 'class-hierarchy':
+        # Force-directed engines read better without the reduction
+        return lambda: generate_class_hierarchy_dot(owl_file, dot_file, engine, use_tred=(engine == 'dot'))
+    if view == 'object-properties':
+        return lambda: generate_object_properties_dot(owl_file, dot_file, engine)
+    if view == 'data-properties':
+        return lambda: generate_data_properties_dot(owl_file, dot_file, engine)
+    if view == 'layers-overview':
+        return lambda: generate_layers_dot(owl_file, dot_file, namespace)
+    return lambda: generate_external_mappings_dot(merged_owl, dot_file, namespace)
+
+def layout_action(view, engine, dot_file, svg_file):
+    """Return a callable that lays out one DOT file through the layout cache"""
+    return lambda: render_layout(dot_file, svg_file, engine, name=view)
+
+def copy_action(src, dst):
+    return lambda: shutil.copyfile(src, dst)
+
+def build_tasks(owl_file, output_dir, merged_owl=None, namespace=CONNECT, render=False, all_engines=False):
+    """Return the task graph for the requested views and engines"""
+    tasks = []
+    for view, (script, default_engine, extra_engines) in VIEWS.items():
+        source = merged_owl if view == 'external-mappings' else owl_file
+        if not source:
+            continue
+        engines = [default_engine] + (extra_engines if all_engines else [])
+        for engine in engines:
+            dot_file = os.path.join(output_dir, f"{view}-{engine}.dot")
+            tasks.append(Task(
+                f"dot:{view}-{engine}",
+                dot_action(view, engine, owl_file, merged_owl, dot_file, namespace),
+                inputs=[source] + [os.path.join(TOOLING_DIR, m) for m in [script] + SHARED_MODULES],
+                outputs=[dot_file],
+                params=f"{engine};{namespace}"))
+            if not render:
+                continue
+            svg_file = os.path.join(output_dir, f"{view}-{engine}.svg")
+            tasks.append(Task(
+                f"svg:{view}-{engine}",
+                layout_action(view, engine, dot_file, svg_file),
+                inputs=[dot_file], outputs=[svg_file], params=engine))
+            if engine == default_engine:
+                canonical = os.path.join(output_dir, f"{view}.svg")
+                tasks.append(Task(
+                    f"copy:{view}", copy_action(svg_file, canonical),
+                    inputs=[svg_file], outputs=[canonical]))
+    return tasks
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate all visualizations with one parse per input')
+    parser.add_argument('owl_file', help='Input OWL file')
+    parser.add_argument('--merged', help='Merged ontology file (core + alignments) for the external mappings view')
+    parser.add_argument('--output-dir', default='docs/visualizations', help='Output directory (default: docs/visualizations)')
+    parser.add_argument('--namespace', default=CONNECT, help='ODIM namespace for the layers and mappings views')
+    parser.add_argument('--render', action='store_true', help='Also lay out SVGs and refresh the canonical copies')
+    parser.add_argument('--all-engines', action='store_true', help='Add the alternative engine variants of each view')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Concurrent tasks (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Rebuild even when inputs are unchanged')
+    add_profile_arg(parser)
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    configure(args.profile)
+    tasks = build_tasks(args.owl_file, args.output_dir, args.merged, args.namespace,
+                        args.render, args.all_engines)
+    status = run_tasks(tasks, args.jobs, args.force)
+    built = sum(1 for s in status.values() if s == 'built')
+    skipped = sum(1 for s in status.values() if s == 'skipped')
+    failed = [name for name, s in status.items() if s in ('failed', 'blocked')]
+    print(f"[build] {built} built, {skipped} up to date, {len(failed)} failed")
+    if failed:
+        raise SystemExit(2)
@@ -3,11 +3,11 @@
 Generate data properties visualization from OWL ontology
 """
 import sys
-import subprocess
-import csv
-import io
 import argparse
 from collections import defaultdict
+from profiling import add_profile_arg, configure, phase
+from sparql_session import get_session
+from subgraph import add_selector_args, has_selectors, select_entities, selected
 
 def extract_local_name(uri):
     """Extract local name from URI"""
@@ -18,23 +18,14 @@ def extract_local_name(uri):
     return uri
 
 def run_sparql_query(owl_file, query):
-    """Run SPARQL query and return CSV results"""
-    with open('/tmp/query.rq', 'w') as f:
-        f.write(query)
-    
-    result = subprocess.run([
-        'sparql', '--data', owl_file, '--query', '/tmp/query.rq', '--results=CSV'
-    ], capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        print(f"SPARQL query failed: {result.stderr}", file=sys.stderr)
+    """Run SPARQL query in the shared session and return CSV-style rows"""
+    try:
+        return get_session(owl_file).select(query)
+    except Exception as e:
+        print(f"SPARQL query failed: {e}", file=sys.stderr)
         return []
-    
-    # Parse CSV output
-    csv_reader = csv.DictReader(io.StringIO(result.stdout))
-    return list(csv_reader)
 
-def generate_data_properties_dot(owl_file, output_file, layout_engine='dot', use_clustering=True):
+def generate_data_properties_dot(owl_file, output_file, layout_engine='dot', use_clustering=True, selection=None):
     """Generate DOT file for data properties"""
     
     # Query for data properties and their domains/ranges
@@ -102,6 +93,8 @@ def generate_data_properties_dot(owl_file, output_file, layout_engine='dot', use
     
     for row in results:
         prop_uri = row['prop']
+        if not selected(selection, prop_uri, row.get('domain')):
+            continue
         prop_id = extract_local_name(prop_uri)
         prop_label = row.get('propLabelEn') or row.get('propLabelAny') or prop_id
         
@@ -129,12 +122,14 @@ def generate_data_properties_dot(owl_file, output_file, layout_engine='dot', use
             domain_edges.append((prop_id, domain_id))
     
     for row in subprop_results:
+        if not selected(selection, row['child'], row['parent']):
+            continue
         child_id = extract_local_name(row['child'])
         parent_id = extract_local_name(row['parent'])
         subprop_edges.append((child_id, parent_id))
     
     # Generate DOT file
-    with open(output_file, 'w') as f:
+    with phase('write dot', 'write'), open(output_file, 'w') as f:
         f.write('digraph "Data Properties" {\n')
         
         # Graph-level attributes based on layout engine
@@ -176,12 +171,12 @@ def generate_data_properties_dot(owl_file, output_file, layout_engine='dot', use
                 cluster_id += 1
         
         # Add property nodes
-        for prop_id, prop_label in properties.items():
+        for prop_id, prop_label in sorted(properties.items()):
             label = prop_label.replace('"', '\\"')
             f.write(f'  "{prop_id}" [label="{label}", shape=ellipse, style=filled, fillcolor=lightyellow];\n')
         
         # Add class nodes (domains)
-        for class_id, class_label in classes.items():
+        for class_id, class_label in sorted(classes.items()):
             label = class_label.replace('"', '\\"')
             if len(label) > 20:
                 # Break long labels
@@ -206,11 +201,11 @@ def generate_data_properties_dot(owl_file, output_file, layout_engine='dot', use
         f.write('  \n')
         
         # Add domain edges
-        for prop_id, domain_id in domain_edges:
+        for prop_id, domain_id in sorted(set(domain_edges)):
             f.write(f'  "{domain_id}" -> "{prop_id}" [label="domain", style=dashed, color=blue];\n')
         
         # Add subPropertyOf edges
-        for child_id, parent_id in subprop_edges:
+        for child_id, parent_id in sorted(set(subprop_edges)):
             f.write(f'  "{child_id}" -> "{parent_id}" [label="subPropertyOf", color=darkgreen];\n')
         
         f.write('}\n')
@@ -223,11 +218,16 @@ def parse_args():
                         default='dot', help='Layout engine (default: dot)')
     parser.add_argument('--no-clustering', dest='clustering', action='store_false', default=True,
                         help='Disable subgraph clustering')
+    add_selector_args(parser)
+    add_profile_arg(parser)
     return parser.parse_args()
 
 if __name__ == '__main__':
     args = parse_args()
+    configure(args.profile)
     
-    generate_data_properties_dot(args.owl_file, args.output_file, 
-                                args.engine, args.clustering)
+    selection = select_entities(get_session(args.owl_file).graph, args) if has_selectors(args) else None
+    with phase('generate data properties', 'build'):
+        generate_data_properties_dot(args.owl_file, args.output_file, 
+                                    args.engine, args.clustering, selection)
     print(f"Generated data properties visualization: {args.output_file} (engine: {args.engine})")
@@ -2,7 +2,10 @@
 """
 Generate External mappings DOT showing ODIM classes/properties mapped to external standards.
 """
-import sys, subprocess, csv, io, argparse
+import sys, argparse
+from profiling import add_profile_arg, configure, phase
+from sparql_session import get_session
+from subgraph import add_selector_args, has_selectors, select_entities, selected
 
 EXTERNAL_PREFIXES = [
   'http://www.w3.org/ns/prov#',
@@ -14,25 +17,17 @@ EXTERNAL_PREFIXES = [
 ]
 
 def run_sparql(data_file, query):
-    with open('/tmp/query_map.rq','w') as f:
-        f.write(query)
-    p = subprocess.run(['sparql','--data',data_file,'--query','/tmp/query_map.rq','--results=CSV'], capture_output=True, text=True)
-    if p.returncode != 0:
-        print(p.stderr, file=sys.stderr)
+    try:
+        return get_session(data_file).select(query)
+    except Exception as e:
+        print(e, file=sys.stderr)
         sys.exit(2)
-    return list(csv.DictReader(io.StringIO(p.stdout)))
 
 def local(u):
     return u.split('#')[-1].split('/')[-1]
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument('merged_owl', help='Merged ontology file (core + alignments)')
-    ap.add_argument('dot_out')
-    ap.add_argument('--namespace', help='ODIM namespace (to detect internal terms)')
-    args = ap.parse_args()
-
-    ns = args.namespace or 'http://connectdigitalstudy.com/ontology#'
+def generate_external_mappings_dot(merged_owl, dot_out, namespace=None, selection=None):
+    ns = namespace or 'http://connectdigitalstudy.com/ontology#'
     extern_filters = ' || '.join([f"STRSTARTS(STR(?ext), \"{p}\")" for p in EXTERNAL_PREFIXES])
 
     q = f"""
@@ -50,18 +45,20 @@ def main():
       OPTIONAL {{ ?ext rdfs:label ?extLabelAny }}
     }}
     """
-    rows = run_sparql(args.merged_owl, q)
+    rows = run_sparql(merged_owl, q)
 
     odim_nodes = set(); ext_nodes = set(); edges = []
     labels = {}
     for r in rows:
         o = r['odim']; e = r['ext']; kind = r['kind']
+        if not selected(selection, o, e):
+            continue
         odim_nodes.add(o); ext_nodes.add(e)
         labels[o] = r.get('odimLabelEn') or r.get('odimLabelAny') or local(o)
         labels[e] = r.get('extLabelEn') or r.get('extLabelAny') or local(e)
         edges.append((o,e,kind))
 
-    with open(args.dot_out,'w') as f:
+    with phase('write dot', 'write'), open(dot_out,'w') as f:
         f.write('digraph "External Mappings" {\n')
         f.write('  rankdir=LR;\n')
         f.write('  graph [splines=true, nodesep=0.9, ranksep=1.2];\n')
@@ -80,11 +77,24 @@ def main():
             f.write(f'    "{local(e)}" [label="{lbl}"];\n')
         f.write('  }\n')
         # Edges
-        for o,e,kind in edges:
+        for o,e,kind in sorted(set(edges)):
             style = 'solid' if kind=='class' else 'dashed'
             f.write(f'  "{local(o)}" -> "{local(e)}" [style={style}];\n')
         f.write('}\n')
 
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('merged_owl', help='Merged ontology file (core + alignments)')
+    ap.add_argument('dot_out')
+    ap.add_argument('--namespace', help='ODIM namespace (to detect internal terms)')
+    add_selector_args(ap)
+    add_profile_arg(ap)
+    args = ap.parse_args()
+    configure(args.profile)
+    selection = select_entities(get_session(args.merged_owl).graph, args) if has_selectors(args) else None
+    with phase('generate external mappings', 'build'):
+        generate_external_mappings_dot(args.merged_owl, args.dot_out, args.namespace, selection)
+
 if __name__ == '__main__':
     main()
 
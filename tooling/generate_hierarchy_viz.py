@@ -3,11 +3,12 @@
 Generate class hierarchy visualization from OWL ontology
 """
 import sys
-import subprocess
-import csv
-import io
 import argparse
 from collections import defaultdict
+from profiling import add_profile_arg, configure, phase
+from sparql_session import get_session
+from hierarchy import transitive_reduction, stagger_leaves
+from subgraph import add_selector_args, has_selectors, select_entities, selected
 
 def extract_local_name(uri):
     """Extract local name from URI"""
@@ -18,23 +19,14 @@ def extract_local_name(uri):
     return uri
 
 def run_sparql_query(owl_file, query):
-    """Run SPARQL query and return CSV results"""
-    with open('/tmp/query.rq', 'w') as f:
-        f.write(query)
-    
-    result = subprocess.run([
-        'sparql', '--data', owl_file, '--query', '/tmp/query.rq', '--results=CSV'
-    ], capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        print(f"SPARQL query failed: {result.stderr}", file=sys.stderr)
+    """Run SPARQL query in the shared session and return CSV-style rows"""
+    try:
+        return get_session(owl_file).select(query)
+    except Exception as e:
+        print(f"SPARQL query failed: {e}", file=sys.stderr)
         return []
-    
-    # Parse CSV output
-    csv_reader = csv.DictReader(io.StringIO(result.stdout))
-    return list(csv_reader)
 
-def generate_class_hierarchy_dot(owl_file, output_file, layout_engine='dot', use_tred=True, use_unflatten=False):
+def generate_class_hierarchy_dot(owl_file, output_file, layout_engine='dot', use_tred=True, use_unflatten=False, selection=None):
     """Generate DOT file for class hierarchy"""
     
     query = """
@@ -64,6 +56,8 @@ def generate_class_hierarchy_dot(owl_file, output_file, layout_engine='dot', use
     for row in results:
         child_uri = row['child']
         parent_uri = row['parent']
+        if not (selected(selection, child_uri) and selected(selection, parent_uri)):
+            continue
         child_label = row.get('childLabelEn') or row.get('childLabelAny') or extract_local_name(child_uri)
         parent_label = row.get('parentLabelEn') or row.get('parentLabelAny') or extract_local_name(parent_uri)
         
@@ -93,16 +87,22 @@ def generate_class_hierarchy_dot(owl_file, output_file, layout_engine='dot', use
     for row in extra:
         uri = row['cls']
         node_id = extract_local_name(uri)
-        if node_id not in all_nodes:
+        if node_id not in all_nodes and selected(selection, uri):
             all_nodes.add(node_id)
             lbl = row.get('clsLabelEn') or row.get('clsLabelAny') or node_id
             labels[node_id] = lbl
 
+    # Drop edges implied by longer paths (replaces Graphviz tred) and spread
+    # wide rows of leaves over several ranks (replaces Graphviz unflatten)
+    if use_tred:
+        children = transitive_reduction(children)
+    edge_minlen = stagger_leaves(children) if use_unflatten else {}
+    
     # Find root nodes (nodes that are not children of others)
     root_nodes = all_nodes - {child for parent_children in children.values() for child in parent_children}
     
     # Generate DOT file
-    with open(output_file, 'w') as f:
+    with phase('write dot', 'write'), open(output_file, 'w') as f:
         f.write('digraph "Class Hierarchy" {\n')
         
         # Graph-level attributes for better layout
@@ -123,7 +123,7 @@ def generate_class_hierarchy_dot(owl_file, output_file, layout_engine='dot', use
         f.write('  \n')
         
         # Add all nodes with labels
-        for node_id in all_nodes:
+        for node_id in sorted(all_nodes):
             label = labels.get(node_id, node_id)
             # Escape quotes and wrap long labels
             label = label.replace('"', '\\"')
@@ -150,9 +150,13 @@ def generate_class_hierarchy_dot(owl_file, output_file, layout_engine='dot', use
         f.write('  \n')
         
         # Add edges
-        for parent_id, child_set in children.items():
-            for child_id in child_set:
-                f.write(f'  "{child_id}" -> "{parent_id}";\n')
+        for parent_id, child_set in sorted(children.items()):
+            for child_id in sorted(child_set):
+                minlen = edge_minlen.get((parent_id, child_id), 1)
+                if minlen > 1:
+                    f.write(f'  "{child_id}" -> "{parent_id}" [minlen={minlen}];\n')
+                else:
+                    f.write(f'  "{child_id}" -> "{parent_id}";\n')
         
         # Add ranking to improve layout for hierarchical engines
         if layout_engine == 'dot' and root_nodes:
@@ -177,11 +181,16 @@ def parse_args():
                         help='Skip transitive reduction')
     parser.add_argument('--unflatten', action='store_true', 
                         help='Apply unflatten preprocessing')
+    add_selector_args(parser)
+    add_profile_arg(parser)
     return parser.parse_args()
 
 if __name__ == '__main__':
     args = parse_args()
+    configure(args.profile)
     
-    generate_class_hierarchy_dot(args.owl_file, args.output_file, 
-                                args.engine, args.tred, args.unflatten)
+    selection = select_entities(get_session(args.owl_file).graph, args) if has_selectors(args) else None
+    with phase('generate class hierarchy', 'build'):
+        generate_class_hierarchy_dot(args.owl_file, args.output_file, 
+                                    args.engine, args.tred, args.unflatten, selection)
     print(f"Generated class hierarchy visualization: {args.output_file} (engine: {args.engine})")
@@ -2,30 +2,25 @@
 """
 Generate a Layers overview DOT from OWL by grouping classes annotated with connect:belongsToLayer.
 """
-import sys, subprocess, csv, io, argparse
+import sys, argparse
+from profiling import add_profile_arg, configure, phase
+from sparql_session import get_session
+from subgraph import add_selector_args, has_selectors, select_entities, selected
 
 CONNECT = "http://connectdigitalstudy.com/ontology#"
 
 def run_sparql(data_file, query):
-    with open('/tmp/query_layers.rq', 'w') as f:
-        f.write(query)
-    p = subprocess.run(['sparql','--data',data_file,'--query','/tmp/query_layers.rq','--results=CSV'], capture_output=True, text=True)
-    if p.returncode != 0:
-        print(p.stderr, file=sys.stderr)
+    try:
+        return get_session(data_file).select(query)
+    except Exception as e:
+        print(e, file=sys.stderr)
         sys.exit(2)
-    return list(csv.DictReader(io.StringIO(p.stdout)))
 
 def local(name):
     return name.split('#')[-1].split('/')[-1]
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument('owl_file')
-    ap.add_argument('dot_out')
-    ap.add_argument('--namespace', help='Restrict to IRIs under this namespace')
-    args = ap.parse_args()
-
-    ns = args.namespace
+def generate_layers_dot(owl_file, dot_out, namespace=None, selection=None):
+    ns = namespace
     filter_ns = f"FILTER(STRSTARTS(STR(?cls), \"{ns}\"))" if ns else ""
 
     q = f"""
@@ -41,7 +36,7 @@ def main():
       OPTIONAL {{ ?layer rdfs:label ?layerLabelAny }}
     }}
     """
-    rows = run_sparql(args.owl_file, q)
+    rows = run_sparql(owl_file, q)
 
     # Group classes by layer
     clusters = {}
@@ -49,11 +44,13 @@ def main():
     for r in rows:
         layer = r['layer']
         cls = r['cls']
+        if not selected(selection, cls):
+            continue
         clusters.setdefault(layer, set()).add(cls)
         ll = r.get('layerLabelEn') or r.get('layerLabelAny') or local(layer)
         layer_labels[layer] = ll
     
-    with open(args.dot_out, 'w') as f:
+    with phase('write dot', 'write'), open(dot_out, 'w') as f:
         f.write('digraph "Layers Overview" {\n')
         f.write('  rankdir=LR;\n')
         f.write('  graph [splines=true, nodesep=0.8, ranksep=1.2];\n')
@@ -80,6 +77,19 @@ def main():
             cid += 1
         f.write('}\n')
 
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('owl_file')
+    ap.add_argument('dot_out')
+    ap.add_argument('--namespace', help='Restrict to IRIs under this namespace')
+    add_selector_args(ap)
+    add_profile_arg(ap)
+    args = ap.parse_args()
+    configure(args.profile)
+    selection = select_entities(get_session(args.owl_file).graph, args) if has_selectors(args) else None
+    with phase('generate layers', 'build'):
+        generate_layers_dot(args.owl_file, args.dot_out, args.namespace, selection)
+
 if __name__ == '__main__':
     main()
 
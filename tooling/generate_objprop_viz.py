@@ -3,11 +3,11 @@
 Generate object properties visualization from OWL ontology
 """
 import sys
-import subprocess
-import csv
-import io
 import argparse
 from collections import defaultdict
+from profiling import add_profile_arg, configure, phase
+from sparql_session import get_session
+from subgraph import add_selector_args, has_selectors, select_entities, selected
 
 def extract_local_name(uri):
     """Extract local name from URI"""
@@ -18,23 +18,14 @@ def extract_local_name(uri):
     return uri
 
 def run_sparql_query(owl_file, query):
-    """Run SPARQL query and return CSV results"""
-    with open('/tmp/query.rq', 'w') as f:
-        f.write(query)
-    
-    result = subprocess.run([
-        'sparql', '--data', owl_file, '--query', '/tmp/query.rq', '--results=CSV'
-    ], capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        print(f"SPARQL query failed: {result.stderr}", file=sys.stderr)
+    """Run SPARQL query in the shared session and return CSV-style rows"""
+    try:
+        return get_session(owl_file).select(query)
+    except Exception as e:
+        print(f"SPARQL query failed: {e}", file=sys.stderr)
         return []
-    
-    # Parse CSV output
-    csv_reader = csv.DictReader(io.StringIO(result.stdout))
-    return list(csv_reader)
 
-def generate_object_properties_dot(owl_file, output_file, layout_engine='sfdp', use_clustering=True):
+def generate_object_properties_dot(owl_file, output_file, layout_engine='sfdp', use_clustering=True, selection=None):
     """Generate DOT file for object properties"""
     
     # Query for object properties with domains, ranges, and subproperties
@@ -87,6 +78,8 @@ def generate_object_properties_dot(owl_file, output_file, layout_engine='sfdp',
     
     for row in results:
         prop_uri = row['property']
+        if not selected(selection, prop_uri, row.get('domain'), row.get('range'), row.get('subprop')):
+            continue
         prop_id = extract_local_name(prop_uri)
         prop_label = row.get('propLabelEn') or row.get('propLabelAny') or prop_id
         
@@ -112,7 +105,7 @@ def generate_object_properties_dot(owl_file, output_file, layout_engine='sfdp',
             labels[super_id] = super_label
     
     # Generate DOT file
-    with open(output_file, 'w') as f:
+    with phase('write dot', 'write'), open(output_file, 'w') as f:
         f.write('digraph "Object Properties" {\n')
         
         # Graph-level attributes based on layout engine
@@ -162,13 +155,13 @@ def generate_object_properties_dot(owl_file, output_file, layout_engine='sfdp',
         for prop_ranges in ranges.values():
             all_classes.update(prop_ranges)
         
-        for class_id in all_classes:
+        for class_id in sorted(all_classes):
             label = labels.get(class_id, class_id)
             label = label.replace('"', '\\"')
             f.write(f'  "{class_id}" [shape=box, style=filled, fillcolor=lightblue, label="{label}"];\n')
         
         # Add property nodes
-        for prop_id in properties:
+        for prop_id in sorted(properties):
             label = labels.get(prop_id, prop_id)
             label = label.replace('"', '\\"')
             f.write(f'  "{prop_id}" [shape=ellipse, style=filled, fillcolor=lightyellow, label="{label}"];\n')
@@ -176,21 +169,21 @@ def generate_object_properties_dot(owl_file, output_file, layout_engine='sfdp',
         f.write('  \n')
         
         # Add domain/range relationships
-        for prop_id in properties:
+        for prop_id in sorted(properties):
             prop_domains = domains.get(prop_id, set())
             prop_ranges = ranges.get(prop_id, set())
             
             # Domain to property edges
-            for domain_id in prop_domains:
+            for domain_id in sorted(prop_domains):
                 f.write(f'  "{domain_id}" -> "{prop_id}" [color=blue, label="domain"];\n')
             
             # Property to range edges
-            for range_id in prop_ranges:
+            for range_id in sorted(prop_ranges):
                 f.write(f'  "{prop_id}" -> "{range_id}" [color=green, label="range"];\n')
         
         # Add subproperty relationships
-        for super_prop, sub_props in subproperties.items():
-            for sub_prop in sub_props:
+        for super_prop, sub_props in sorted(subproperties.items()):
+            for sub_prop in sorted(sub_props):
                 f.write(f'  "{sub_prop}" -> "{super_prop}" [color=red, style=dashed, label="subPropertyOf"];\n')
         
         f.write('}\n')
@@ -203,11 +196,16 @@ def parse_args():
                         default='sfdp', help='Layout engine (default: sfdp)')
     parser.add_argument('--no-clustering', dest='clustering', action='store_false', default=True,
                         help='Disable subgraph clustering')
+    add_selector_args(parser)
+    add_profile_arg(parser)
     return parser.parse_args()
 
 if __name__ == '__main__':
     args = parse_args()
+    configure(args.profile)
     
-    generate_object_properties_dot(args.owl_file, args.output_file, 
-                                  args.engine, args.clustering)
+    selection = select_entities(get_session(args.owl_file).graph, args) if has_selectors(args) else None
+    with phase('generate object properties', 'build'):
+        generate_object_properties_dot(args.owl_file, args.output_file, 
+                                      args.engine, args.clustering, selection)
     print(f"Generated object properties visualization: {args.output_file} (engine: {args.engine})")
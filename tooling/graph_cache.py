@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk snapshots of parsed RDFLib graphs
+
+`load_graph` parses RDF/XML or Turtle once and stores a pickled snapshot of
+the resulting graph. The snapshot key is a SHA-256 over the bytes of every
+input file plus the bytes of the imports they declare, resolved through the
+XML catalog (`catalog-v001.xml`), so any edit to the ontology or to a
+locally resolved import produces a new key. Warm runs load the snapshot
+instead of re-parsing.
+
+Snapshots live under `build/cache/graphs/` (override with `MHM_CACHE_DIR`).
+The directory is kept under a size bound (`MHM_GRAPH_CACHE_MAX_MB`, default
+512) by evicting the least recently used snapshots. Set `MHM_GRAPH_CACHE=0`
+to always parse.
+
+Usage:
+  python3 graph_cache.py info
+  python3 graph_cache.py clear
+  python3 graph_cache.py warm FILE [FILE ...]
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import re
+import sys
+import xml.etree.ElementTree as ET
+
+import rdflib
+from rdflib import Graph
+
+from profiling import phase
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG_NAME = 'catalog-v001.xml'
+SNAPSHOT_VERSION = '1'
+DEFAULT_MAX_MB = 512
+
+IMPORT_PATTERNS = [
+    re.compile(rb'<owl:imports\s+rdf:resource="([^"]+)"'),
+    re.compile(rb'owl:imports\s+<([^>]+)>'),
+]
+
+def cache_dir(kind='graphs'):
+    """Return (and create) the cache directory for the given artifact kind"""
+    base = os.environ.get('MHM_CACHE_DIR') or os.path.join(REPO_ROOT, 'build', 'cache')
+    path = os.path.join(base, kind)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def cache_enabled():
+    """Snapshot caching is on unless MHM_GRAPH_CACHE=0"""
+    return os.environ.get('MHM_GRAPH_CACHE', '1') != '0'
+
+def max_cache_bytes():
+    """Size bound for the snapshot directory"""
+    return int(float(os.environ.get('MHM_GRAPH_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+
+def file_digest(path):
+    """SHA-256 hex digest of a file's bytes"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def find_catalog(sources, catalog=None):
+    """Return the catalog path to use, or None if there is none"""
+    if catalog:
+        return os.path.abspath(catalog)
+    candidates = [os.path.join(os.path.dirname(os.path.abspath(s)), CATALOG_NAME) for s in sources]
+    candidates += [os.path.abspath(CATALOG_NAME), os.path.join(REPO_ROOT, CATALOG_NAME)]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+def catalog_mappings(catalog):
+    """Map import IRIs to local file paths using an OASIS XML catalog"""
+    mappings = {}
+    if not catalog:
+        return mappings
+    base = os.path.dirname(catalog)
+    for element in ET.parse(catalog).getroot().iter():
+        if element.tag.endswith('}uri') or element.tag == 'uri':
+            name, uri = element.get('name'), element.get('uri')
+            if name and uri:
+                mappings[name] = os.path.normpath(os.path.join(base, uri))
+    return mappings
+
+def declared_imports(path):
+    """Return the owl:imports IRIs declared in an RDF/XML or Turtle file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    iris = []
+    for pattern in IMPORT_PATTERNS:
+        iris.extend(m.group(1).decode('utf-8') for m in pattern.finditer(data))
+    return iris
+
+def resolved_imports(sources, catalog=None):
+    """Return sorted (IRI, local path or None) pairs for the import closure"""
+    mappings = catalog_mappings(find_catalog(sources, catalog))
+    seen = {}
+    pending = [os.path.abspath(s) for s in sources]
+    visited = set()
+    while pending:
+        path = pending.pop()
+        if path in visited:
+            continue
+        visited.add(path)
+        for iri in declared_imports(path):
+            local = mappings.get(iri)
+            if local and not os.path.isfile(local):
+                local = None
+            seen[iri] = local
+            if local:
+                pending.append(local)
+    return sorted(seen.items())
+
+def source_key(sources, catalog=None):
+    """Content hash of the inputs and their catalog-resolved imports"""
+    h = hashlib.sha256()
+    h.update(f"snapshot:{SNAPSHOT_VERSION};rdflib:{rdflib.__version__}\n".encode())
+    for path in sources:
+        h.update(f"source:{file_digest(path)}\n".encode())
+    for iri, local in resolved_imports(sources, catalog):
+        digest = file_digest(local) if local else 'remote'
+        h.update(f"import:{iri}:{digest}\n".encode())
+    return h.hexdigest()
+
+def parse_sources(sources):
+    """Parse the source files into one graph without consulting the cache"""
+    g = Graph()
+    for path in sources:
+        with phase(f"parse {os.path.basename(path)}", 'parse'):
+            g.parse(path)
+    return g
+
+def evict(directory, max_bytes):
+    """Delete least recently used snapshots until the directory fits max_bytes"""
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if '.tmp' in name or not os.path.isfile(path):
+            continue  # in-progress write or subdirectory
+        st = os.stat(path)
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+def load_graph(sources, catalog=None):
+    """Return the parsed graph for one or more files, using a snapshot when warm"""
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    sources = [os.fspath(s) for s in sources]
+    if not cache_enabled():
+        return parse_sources(sources)
+
+    directory = cache_dir()
+    snapshot = os.path.join(directory, source_key(sources, catalog) + '.pickle')
+    if os.path.exists(snapshot):
+        try:
+            with phase('load snapshot', 'load'), open(snapshot, 'rb') as f:
+                g = pickle.load(f)
+            os.utime(snapshot)  # mark as recently used
+            return g
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass  # unreadable or stale snapshot; rebuild below
+
+    g = parse_sources(sources)
+    tmp = f"{snapshot}.{os.getpid()}.tmp"
+    with phase('write snapshot', 'write'), open(tmp, 'wb') as f:
+        pickle.dump(g, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, snapshot)
+    evict(directory, max_cache_bytes())
+    return g
+
+def main():
+    ap = argparse.ArgumentParser(description='Manage parsed-graph snapshots')
+    sub = ap.add_subparsers(dest='command', required=True)
+    sub.add_parser('info', help='Show snapshot count and size')
+    sub.add_parser('clear', help='Delete all snapshots')
+    warm = sub.add_parser('warm', help='Parse files and store their snapshot')
+    warm.add_argument('files', nargs='+')
+    warm.add_argument('--catalog', help='XML catalog for resolving imports')
+    args = ap.parse_args()
+
+    directory = cache_dir()
+    if args.command == 'info':
+        sizes = [os.path.getsize(os.path.join(directory, n)) for n in os.listdir(directory)]
+        print(f"{directory}: {len(sizes)} snapshot(s), {sum(sizes) / 1024:.1f} KiB "
+              f"(limit {max_cache_bytes() / 1024 / 1024:.0f} MiB)")
+    elif args.command == 'clear':
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        print(f"Cleared {directory}")
+    elif args.command == 'warm':
+        g = load_graph(args.files, args.catalog)
+        print(f"Snapshot ready for {', '.join(args.files)} ({len(g)} triples)", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Graph algorithms on the `children` adjacency map used by the hierarchy generator
+
+`children` maps a parent id to the set of its direct child ids (the shape
+built by `generate_hierarchy_viz.py` from rdfs:subClassOf rows).
+
+- `transitive_reduction` is the in-process replacement for Graphviz `tred`:
+  it walks a topological order once and keeps one Python-int bitset of
+  descendants per node, so an edge is dropped exactly when its child is
+  already reachable through an earlier sibling. Cost is O(E * V / 64) word
+  operations, which stays fast for tens of thousands of classes.
+- `stagger_leaves` is the replacement for `unflatten -l N`: leaf children of
+  a wide parent get edge `minlen` values cycling through 1..N so they spread
+  over several ranks instead of one very wide row.
+- `ClosureIndex` precomputes every node's ancestors and descendants as
+  bitsets so closure queries are set lookups rather than graph walks.
+- `strongly_connected_components` is an iterative Tarjan pass (linear in
+  nodes + edges, no recursion limit) used to find and report cycles.
+"""
+
+import sys
+from collections import defaultdict
+
+def all_nodes(children):
+    """Every id that appears as a parent or a child"""
+    nodes = set(children)
+    for kids in children.values():
+        nodes.update(kids)
+    return nodes
+
+def topological_order(children):
+    """Kahn's algorithm, parents before children; returns None if there is a cycle"""
+    indegree = defaultdict(int)
+    nodes = all_nodes(children)
+    for kids in children.values():
+        for child in kids:
+            indegree[child] += 1
+    ready = sorted(n for n in nodes if indegree[n] == 0)
+    order = []
+    while ready:
+        node = ready.pop()
+        order.append(node)
+        for child in sorted(children.get(node, ())):
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    if len(order) != len(nodes):
+        return None
+    return order
+
+def transitive_reduction(children):
+    """Return a new children map without edges implied by longer paths"""
+    order = topological_order(children)
+    if order is None:
+        print("Warning: class hierarchy has a cycle; skipping transitive reduction", file=sys.stderr)
+        return {parent: set(kids) for parent, kids in children.items()}
+
+    position = {node: i for i, node in enumerate(order)}
+    descendants = {}  # node -> bitset of positions reachable below it
+    reduced = {}
+    for node in reversed(order):
+        covered = 0
+        kept = set()
+        # Visit children nearest to `node` first: a child that is an ancestor
+        # of another child precedes it in topological order.
+        for child in sorted(children.get(node, ()), key=position.__getitem__):
+            bit = 1 << position[child]
+            if covered & bit:
+                continue  # already reachable through an earlier child
+            kept.add(child)
+            covered |= bit | descendants[child]
+        descendants[node] = covered
+        if kept:
+            reduced[node] = kept
+    return reduced
+
+def stagger_leaves(children, chain=3):
+    """Return {(parent, child): minlen} spreading leaf children over `chain` ranks"""
+    parents_of = defaultdict(int)
+    for kids in children.values():
+        for child in kids:
+            parents_of[child] += 1
+    minlen = {}
+    for parent, kids in children.items():
+        leaves = sorted(c for c in kids if not children.get(c) and parents_of[c] == 1)
+        if len(leaves) < 2:
+            continue
+        for i, leaf in enumerate(leaves):
+            minlen[(parent, leaf)] = i % chain + 1
+    return minlen
+
+def strongly_connected_components(edges):
+    """Tarjan's algorithm without recursion; returns a list of components (lists of nodes)"""
+    index, low = {}, {}
+    on_stack, stack, components = set(), [], []
+    counter = 0
+    for root in all_nodes(edges):
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(edges.get(root, ())))]
+        while work:
+            node, successors = work[-1]
+            for nxt in successors:
+                if nxt not in index:
+                    index[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, iter(edges.get(nxt, ()))))
+                    break
+                if nxt in on_stack:
+                    low[node] = min(low[node], index[nxt])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+def _bits_to_nodes(bits, nodes):
+    """Expand a bitset of node positions into a set of nodes"""
+    found = set()
+    while bits:
+        low = bits & -bits
+        found.add(nodes[low.bit_length() - 1])
+        bits ^= low
+    return found
+
+class ClosureIndex:
+    """Precomputed ancestor/descendant closure over a children map"""
+
+    def __init__(self, children):
+        self.children = {parent: set(kids) for parent, kids in children.items()}
+        self.parents = defaultdict(set)
+        for parent, kids in self.children.items():
+            for child in kids:
+                self.parents[child].add(parent)
+        order = topological_order(self.children)
+        self.acyclic = order is not None
+        if order is None:
+            order = sorted(all_nodes(self.children))
+        self.nodes = order
+        self.position = {node: i for i, node in enumerate(order)}
+        if self.acyclic:
+            self._descendants = self._close(reversed(order), self.children)
+            self._ancestors = self._close(order, self.parents)
+        else:
+            self._descendants = {n: self._walk(n, self.children) for n in order}
+            self._ancestors = {n: self._walk(n, self.parents) for n in order}
+
+    def _close(self, order, edges):
+        """One pass in dependency order: closure(n) = OR of neighbours and their closures"""
+        closure = {}
+        for node in order:
+            bits = 0
+            for other in edges.get(node, ()):
+                bits |= (1 << self.position[other]) | closure[other]
+            closure[node] = bits
+        return closure
+
+    def _walk(self, node, edges):
+        """Bitset closure by graph walk (used only when the graph has cycles)"""
+        bits, stack = 0, [node]
+        while stack:
+            for other in edges.get(stack.pop(), ()):
+                bit = 1 << self.position[other]
+                if not bits & bit:
+                    bits |= bit
+                    stack.append(other)
+        return bits
+
+    def __contains__(self, node):
+        return node in self.position
+
+    def _limited(self, node, edges, depth):
+        """Nodes within `depth` steps along edges"""
+        found, frontier = set(), {node}
+        for _ in range(depth):
+            frontier = {o for n in frontier for o in edges.get(n, ())} - found - {node}
+            if not frontier:
+                break
+            found |= frontier
+        return found
+
+    def descendants(self, node, depth=None):
+        """All (or up to `depth` levels of) nodes below `node`"""
+        if node not in self.position:
+            return set()
+        if depth is not None:
+            return self._limited(node, self.children, depth)
+        return _bits_to_nodes(self._descendants[node], self.nodes)
+
+    def ancestors(self, node, depth=None):
+        """All (or up to `depth` levels of) nodes above `node`"""
+        if node not in self.position:
+            return set()
+        if depth is not None:
+            return self._limited(node, self.parents, depth)
+        return _bits_to_nodes(self._ancestors[node], self.nodes)
+
+    def is_descendant(self, node, ancestor):
+        """True if `node` is strictly below `ancestor`"""
+        if node not in self.position or ancestor not in self.position:
+            return False
+        return bool(self._descendants[ancestor] >> self.position[node] & 1)
+
+    def to_dict(self):
+        """JSON-serializable form: node order, direct parents and hex bitsets"""
+        return {
+            'nodes': self.nodes,
+            'acyclic': self.acyclic,
+            'parents': [sorted(self.position[p] for p in self.parents.get(n, ())) for n in self.nodes],
+            'ancestors': [format(self._ancestors[n], 'x') for n in self.nodes],
+            'descendants': [format(self._descendants[n], 'x') for n in self.nodes],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an index saved with to_dict without recomputing the closure"""
+        index = cls.__new__(cls)
+        index.nodes = list(data['nodes'])
+        index.acyclic = data['acyclic']
+        index.position = {node: i for i, node in enumerate(index.nodes)}
+        index.parents = defaultdict(set)
+        index.children = {}
+        for node, parents in zip(index.nodes, data['parents']):
+            for i in parents:
+                parent = index.nodes[i]
+                index.parents[node].add(parent)
+                index.children.setdefault(parent, set()).add(node)
+        index._ancestors = {n: int(h, 16) for n, h in zip(index.nodes, data['ancestors'])}
+        index._descendants = {n: int(h, 16) for n, h in zip(index.nodes, data['descendants'])}
+        return index
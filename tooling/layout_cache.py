@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Graphviz layout cache with incremental position reuse
+
+`render` lays out a DOT file to SVG through a cache keyed by the engine,
+the Graphviz version and the normalized DOT text (comments and whitespace
+removed). A hit copies the cached SVG; no layout runs.
+
+On a miss, force-directed engines (neato, fdp, sfdp) are seeded with the
+node positions of the previous layout of the same view (`--name`, stored in
+`build/cache/layouts/positions/`). When only a few nodes changed, the
+unchanged nodes are pinned (`pos="x,y!"`) so only the delta is placed;
+otherwise they are used as starting coordinates. Either way the diagram
+stays visually stable between revisions. The `dot` engine is ranked and
+cannot be seeded, so it only uses the cache.
+
+Usage:
+  python3 layout_cache.py ENGINE FILE.dot FILE.svg [--name VIEW] [--no-incremental]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from graph_cache import cache_dir, evict, max_cache_bytes
+from profiling import add_profile_arg, configure, run
+
+SEEDABLE_ENGINES = {'neato', 'fdp', 'sfdp'}
+PINNABLE_ENGINES = {'neato', 'fdp'}
+MAX_PINNED_DELTA = 0.25  # pin when at most this share of nodes is new
+
+NODE_STATEMENT = re.compile(r'^\s*"((?:[^"\\]|\\.)+)"\s*\[', re.M)
+COMMENT = re.compile(r'^\s*//.*$', re.M)
+
+_GRAPHVIZ_VERSION = None
+
+def graphviz_version():
+    """Version banner of the installed Graphviz (part of the cache key)"""
+    global _GRAPHVIZ_VERSION
+    if _GRAPHVIZ_VERSION is None:
+        try:
+            p = subprocess.run(['dot', '-V'], capture_output=True, text=True)
+            _GRAPHVIZ_VERSION = (p.stderr or p.stdout).strip()
+        except OSError:
+            _GRAPHVIZ_VERSION = 'unknown'
+    return _GRAPHVIZ_VERSION
+
+def normalize_dot(text):
+    """Strip comments and insignificant whitespace from DOT text"""
+    text = COMMENT.sub('', text)
+    return '\n'.join(' '.join(line.split()) for line in text.splitlines() if line.strip())
+
+def layout_key(dot_text, engine):
+    h = hashlib.sha256()
+    h.update(f"engine:{engine}\ngraphviz:{graphviz_version()}\n".encode())
+    h.update(normalize_dot(dot_text).encode('utf-8'))
+    return h.hexdigest()
+
+def dot_node_ids(dot_text):
+    """Quoted node ids that carry an attribute statement"""
+    return set(NODE_STATEMENT.findall(dot_text))
+
+def parse_plain_positions(plain_text):
+    """Node positions (inches) from Graphviz -Tplain output"""
+    positions = {}
+    for line in plain_text.splitlines():
+        if line.startswith('node '):
+            fields = shlex.split(line)
+            positions[fields[1]] = (float(fields[2]), float(fields[3]))
+    return positions
+
+def seed_positions(dot_text, positions, pin):
+    """Append pos attributes for known nodes just before the closing brace"""
+    suffix = '!' if pin else ''
+    lines = [f'  "{node}" [pos="{x:.4f},{y:.4f}{suffix}"];'
+             for node, (x, y) in sorted(positions.items())]
+    end = dot_text.rstrip().rfind('}')
+    return dot_text[:end] + '  // seeded from previous layout\n' + '\n'.join(lines) + '\n}\n'
+
+def _positions_file(name, engine):
+    safe = re.sub(r'[^A-Za-z0-9_.-]+', '_', f"{name}-{engine}")
+    return os.path.join(cache_dir(os.path.join('layouts', 'positions')), safe + '.json')
+
+def load_positions(name, engine):
+    try:
+        with open(_positions_file(name, engine)) as f:
+            return {node: tuple(xy) for node, xy in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+def save_positions(name, engine, positions):
+    with open(_positions_file(name, engine), 'w') as f:
+        json.dump(positions, f)
+
+def render(dot_file, svg_file, engine, name=None, incremental=True):
+    """Lay out dot_file to svg_file; returns 'cached', 'pinned', 'seeded' or 'full'"""
+    with open(dot_file) as f:
+        dot_text = f.read()
+    name = name or os.path.splitext(os.path.basename(svg_file))[0]
+    directory = cache_dir('layouts')
+    cached_svg = os.path.join(directory, layout_key(dot_text, engine) + '.svg')
+    os.makedirs(os.path.dirname(os.path.abspath(svg_file)) or '.', exist_ok=True)
+
+    if os.path.exists(cached_svg):
+        os.utime(cached_svg)  # mark as recently used
+        shutil.copyfile(cached_svg, svg_file)
+        return 'cached'
+
+    mode = 'full'
+    layout_text = dot_text
+    if incremental and engine in SEEDABLE_ENGINES:
+        nodes = dot_node_ids(dot_text)
+        previous = {n: xy for n, xy in load_positions(name, engine).items() if n in nodes}
+        if previous:
+            delta = len(nodes - set(previous)) / max(1, len(nodes))
+            pin = engine in PINNABLE_ENGINES and delta <= MAX_PINNED_DELTA
+            layout_text = seed_positions(dot_text, previous, pin)
+            mode = 'pinned' if pin else 'seeded'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'layout.dot')
+        plain = os.path.join(tmp, 'layout.plain')
+        svg = os.path.join(tmp, 'layout.svg')
+        with open(src, 'w') as f:
+            f.write(layout_text)
+        run([engine, '-Tsvg', '-o', svg, '-Tplain', '-o', plain, src], f"{engine} {name}", 'layout', check=True)
+        with open(plain) as f:
+            save_positions(name, engine, parse_plain_positions(f.read()))
+        shutil.copyfile(svg, svg_file)
+        shutil.copyfile(svg, cached_svg)
+    evict(directory, max_cache_bytes())
+    return mode
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Lay out a DOT file through the layout cache')
+    parser.add_argument('engine', help='Graphviz layout engine (dot, sfdp, neato, fdp, ...)')
+    parser.add_argument('dot_file', help='Input DOT file')
+    parser.add_argument('svg_file', help='Output SVG file')
+    parser.add_argument('--name', help='View name for position reuse (default: SVG file stem)')
+    parser.add_argument('--no-incremental', dest='incremental', action='store_false',
+                        help='Do not seed with positions from the previous layout')
+    add_profile_arg(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    configure(args.profile)
+    try:
+        mode = render(args.dot_file, args.svg_file, args.engine, args.name, args.incremental)
+    except subprocess.CalledProcessError as e:
+        print(f"[layout] {args.engine} failed: {e}", file=sys.stderr)
+        sys.exit(e.returncode or 1)
+    print(f"[layout] {mode}: {args.dot_file} -> {args.svg_file} ({args.engine})")
+
+if __name__ == '__main__':
+    main()
@@ -2,279 +2,440 @@
 """
 Convert OWL ontology to DOT format for Graphviz visualization
 
+The ontology is loaded once however many views are requested. With
+several views or formats, the Graphviz conversions (one per view and
+format) run concurrently on a process pool.
+
 Usage:
   python3 owl2dot.py --input FILE.owl --output FILE.dot [--type TYPE] [--format FORMAT]
+  python3 owl2dot.py --input FILE.owl --output DIR --type all --format svg,png [--merge ALIGN.owl]
 
 Options:
   --input FILE.owl   Input OWL file
-  --output FILE.dot  Output DOT file
-  --type TYPE        Type of visualization: classes (default), objproperties, dataproperties, all
-  --format FORMAT    Output format: dot (default), svg, png, pdf
+  --output PATH      Output file for one view and format; otherwise a directory
+                     receiving <view>.<format> (class-hierarchy, object-properties,
+                     data-properties, layers-overview, external-mappings)
+  --type TYPES       Comma-separated views: classes (default), objproperties,
+                     dataproperties, layers, mappings, or all
+  --format FORMATS   Comma-separated output formats: dot (default), svg, png, pdf
+  --merge FILE       Extra file (e.g. alignments) read by the mappings view (repeatable)
+  --jobs N           Parallel Graphviz conversions (default: CPU count)
+  --lang LANGS       Label language preference, comma-separated; "none" means
+                     untagged literals (default: en,none)
+  --root, --depth, --ancestors, --descendants, --layer, --skos-tag
+                     Render only a focused subgraph (see subgraph.py)
+  --profile FILE     Write a Chrome trace of the load/build/write/layout phases
 
 Examples:
   python3 owl2dot.py --input mhm_ontology.owl --output class-hierarchy.dot --type classes
   python3 owl2dot.py --input mhm_ontology.owl --output obj-properties.dot --type objproperties
+  python3 owl2dot.py --input mhm_ontology.owl --merge alignments/mhm-prov-align.owl \\
+      --type all --format svg,pdf --output build/owl2dot
 """
 
 import argparse
 import os
 import subprocess
 import tempfile
-from rdflib import Graph, RDF, RDFS, OWL, URIRef
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from rdflib import RDF, RDFS, OWL, SKOS, URIRef
+from generate_external_mappings_viz import EXTERNAL_PREFIXES
+from graph_cache import load_graph
+from profiling import add_profile_arg, configure, flush, phase, run
+from subgraph import BELONGS_TO_LAYER, CONNECT, add_selector_args, select_entities
+
+# --type value -> output file stem (the names used in docs/visualizations)
+VIEWS = {
+    'classes': 'class-hierarchy',
+    'objproperties': 'object-properties',
+    'dataproperties': 'data-properties',
+    'layers': 'layers-overview',
+    'mappings': 'external-mappings',
+}
+FORMATS = ('dot', 'svg', 'png', 'pdf')
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Convert OWL ontology to DOT format for visualization')
     parser.add_argument('--input', required=True, help='Input OWL file')
     parser.add_argument('--output', required=True, help='Output DOT file (or SVG/PNG/PDF with --format)')
-    parser.add_argument('--type', choices=['classes', 'objproperties', 'dataproperties', 'all'], 
-                        default='classes', help='Type of visualization')
-    parser.add_argument('--format', choices=['dot', 'svg', 'png', 'pdf'], 
-                        default='dot', help='Output format')
-    return parser.parse_args()
+    parser.add_argument('--type', default='classes',
+                        help=f"Comma-separated views: {', '.join(VIEWS)} or all (default: classes)")
+    parser.add_argument('--format', default='dot', help=f"Comma-separated formats: {', '.join(FORMATS)} (default: dot)")
+    parser.add_argument('--merge', action='append', default=[], help='Extra file for the mappings view (repeatable)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Parallel Graphviz conversions')
+    parser.add_argument('--lang', default='en,none',
+                        help='Label language preference, comma-separated; "none" means untagged (default: en,none)')
+    add_selector_args(parser)
+    add_profile_arg(parser)
+    args = parser.parse_args()
+    args.views = split_choices(parser, 'type', args.type, VIEWS, {'all': list(VIEWS)})
+    args.formats = split_choices(parser, 'format', args.format, FORMATS)
+    return args
+
+def split_choices(parser, option, value, choices, aliases=None):
+    """Parse a comma-separated option into a de-duplicated list of valid choices"""
+    picked = []
+    for item in (v.strip() for v in value.split(',') if v.strip()):
+        for choice in (aliases or {}).get(item, [item]):
+            if choice not in choices:
+                parser.error(f"--{option}: unknown value {choice!r} (choose from {', '.join(choices)})")
+            if choice not in picked:
+                picked.append(choice)
+    if not picked:
+        parser.error(f"--{option} needs a value")
+    return picked
+
+def parse_lang_preference(value):
+    """Turn 'en,none' into ('en', '') for build_label_index"""
+    return tuple('' if lang.strip().lower() == 'none' else lang.strip().lower()
+                 for lang in value.split(',') if lang.strip())
 
 def load_ontology(input_file):
-    """Load an OWL ontology into an RDFLib graph"""
-    g = Graph()
+    """Load an OWL ontology into an RDFLib graph (from a cached snapshot when warm)"""
     print(f"Loading ontology: {input_file}")
-    g.parse(input_file)
+    g = load_graph(input_file)
     print(f"Loaded {len(g)} triples")
     return g
 
-def get_label(g, entity, default=""):
-    """Get label for an entity, or return the URI fragment if no label exists"""
-    for label in g.objects(entity, RDFS.label):
-        return str(label)
-    
-    # No label found, extract fragment from URI
+LABEL_PREDICATES = (RDFS.label, SKOS.prefLabel)
+
+def _lang_rank(lang, langs):
+    """Position of a literal's language in the preference list (prefix match, e.g. en matches en-GB)"""
+    lang = (lang or '').lower()
+    for rank, preferred in enumerate(langs):
+        if lang == preferred or (preferred and lang.startswith(preferred + '-')):
+            return rank
+    return len(langs)
+
+def build_label_index(g, langs=('en', '')):
+    """Build an entity -> label map in one pass over rdfs:label and skos:prefLabel
+
+    Labels are ranked by language preference first, then by predicate
+    (rdfs:label before skos:prefLabel), then lexically so the choice is stable.
+    """
+    best = {}
+    for pred_rank, pred in enumerate(LABEL_PREDICATES):
+        for entity, label in g.subject_objects(pred):
+            key = (_lang_rank(getattr(label, 'language', None), langs), pred_rank, str(label))
+            current = best.get(entity)
+            if current is None or key < current:
+                best[entity] = key
+    return {entity: key[2] for entity, key in best.items()}
+
+def local_name(entity):
+    """Extract the fragment or last path segment of an IRI"""
     uri = str(entity)
     if '#' in uri:
         return uri.split('#')[-1]
-    return uri.split('/')[-1] if default == "" else default
+    return uri.split('/')[-1]
 
-def get_class_hierarchy(g):
-    """Extract class hierarchy as list of (parent, child) tuples"""
-    hierarchy = []
-    
-    # Find all owl:Class entities
-    for cls in g.subjects(RDF.type, OWL.Class):
-        if isinstance(cls, URIRef):  # Skip blank nodes
-            # Add subclass relationships
-            for parent in g.objects(cls, RDFS.subClassOf):
-                if isinstance(parent, URIRef):  # Skip blank nodes & restrictions
-                    hierarchy.append((parent, cls))
-    
+def get_label(labels, entity):
+    """Look up an entity's label in the index, falling back to its local name"""
+    return labels.get(entity) or local_name(entity)
+
+class TermTable:
+    """Interns IRIs as dense ints so each term is held once, however many edges use it
+
+    Node IDs in the DOT output are short tokens derived from the int (n0,
+    n1, ...); the IRI itself goes into the node tooltip.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.terms = []
+
+    def __len__(self):
+        return len(self.terms)
+
+    def intern(self, term):
+        i = self.ids.get(term)
+        if i is None:
+            i = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+        return i
+
+    def mask(self, selection):
+        """bytearray with 1 for every selected ID, or None when nothing is filtered"""
+        if selection is None:
+            return None
+        return bytearray(str(term) in selection for term in self.terms)
+
+class EdgeList:
+    """Directed edges between interned IDs, stored as two uint32 columns"""
+
+    def __init__(self):
+        self.src = array('I')
+        self.dst = array('I')
+
+    def __len__(self):
+        return len(self.src)
+
+    def __iter__(self):
+        return zip(self.src, self.dst)
+
+    def add(self, a, b):
+        self.src.append(a)
+        self.dst.append(b)
+
+    def select(self, mask, both=False):
+        """Edges with either (or, with both=True, both) endpoints set in mask"""
+        if mask is None:
+            return self
+        kept = EdgeList()
+        for a, b in self:
+            if (mask[a] and mask[b]) if both else (mask[a] or mask[b]):
+                kept.add(a, b)
+        return kept
+
+def _uri_objects(g, subject, predicate):
+    return (o for o in g.objects(subject, predicate) if isinstance(o, URIRef))
+
+def get_class_hierarchy(g, terms):
+    """Extract the class hierarchy as (parent, child) ID edges"""
+    classes = {c for c in g.subjects(RDF.type, OWL.Class) if isinstance(c, URIRef)}  # skip blank nodes
+    hierarchy = EdgeList()
+    intern = terms.intern
+    for child, parent in g.subject_objects(RDFS.subClassOf):
+        if child in classes and isinstance(parent, URIRef):  # skips restrictions
+            hierarchy.add(intern(parent), intern(child))
     return hierarchy
 
-def get_object_properties(g):
-    """Extract object property hierarchy and domain/range information"""
-    props = []
-    domains_ranges = []
-    
-    # Find all owl:ObjectProperty entities
+def get_object_properties(g, terms):
+    """Extract (parent, child) subproperty, (domain, prop) and (prop, range) ID edges"""
+    props, domains, ranges = EdgeList(), EdgeList(), EdgeList()
     for prop in g.subjects(RDF.type, OWL.ObjectProperty):
         if isinstance(prop, URIRef):
-            # Add subproperty relationships
-            for parent in g.objects(prop, RDFS.subPropertyOf):
-                if isinstance(parent, URIRef):
-                    props.append((parent, prop))
-            
-            # Add domain and range information
-            for domain in g.objects(prop, RDFS.domain):
-                if isinstance(domain, URIRef):
-                    domains_ranges.append((domain, prop, "domain"))
-            
-            for range_cls in g.objects(prop, RDFS.range):
-                if isinstance(range_cls, URIRef):
-                    domains_ranges.append((prop, range_cls, "range"))
-    
-    return props, domains_ranges
+            p = terms.intern(prop)
+            for parent in _uri_objects(g, prop, RDFS.subPropertyOf):
+                props.add(terms.intern(parent), p)
+            for domain in _uri_objects(g, prop, RDFS.domain):
+                domains.add(terms.intern(domain), p)
+            for range_cls in _uri_objects(g, prop, RDFS.range):
+                ranges.add(p, terms.intern(range_cls))
+    return props, domains, ranges
 
-def get_data_properties(g):
-    """Extract data property hierarchy and domain information"""
-    props = []
-    domains = []
-    
-    # Find all owl:DatatypeProperty entities
+def get_data_properties(g, terms):
+    """Extract (parent, child) subproperty and (domain, prop) ID edges"""
+    props, domains = EdgeList(), EdgeList()
     for prop in g.subjects(RDF.type, OWL.DatatypeProperty):
         if isinstance(prop, URIRef):
-            # Add subproperty relationships
-            for parent in g.objects(prop, RDFS.subPropertyOf):
-                if isinstance(parent, URIRef):
-                    props.append((parent, prop))
-            
-            # Add domain information
-            for domain in g.objects(prop, RDFS.domain):
-                if isinstance(domain, URIRef):
-                    domains.append((domain, prop))
-    
+            p = terms.intern(prop)
+            for parent in _uri_objects(g, prop, RDFS.subPropertyOf):
+                props.add(terms.intern(parent), p)
+            for domain in _uri_objects(g, prop, RDFS.domain):
+                domains.add(terms.intern(domain), p)
     return props, domains
 
-def generate_class_dot(g, class_hierarchy):
+class DotWriter:
+    """Accumulates DOT lines; each interned node is declared at most once"""
+
+    def __init__(self, title, labels, terms, node_style):
+        self.labels = labels
+        self.terms = terms
+        self.declared = bytearray(len(terms))
+        self.lines = [f'digraph "{title}" {{', '  rankdir=BT;', f'  node [{node_style}];']
+
+    def node(self, i, fill=None):
+        if self.declared[i]:
+            return
+        self.declared[i] = 1
+        term = self.terms.terms[i]
+        fill = f', fillcolor={fill}' if fill else ''
+        self.lines.append(f'  n{i} [label="{get_label(self.labels, term)}", tooltip="{term}"{fill}];')
+
+    def edges(self, edges, label, style=''):
+        style = f', style="{style}"' if style else ''
+        self.lines.extend(f'  n{a} -> n{b} [label="{label}"{style}];' for a, b in edges)
+
+    def text(self):
+        return '\n'.join(self.lines + ['}'])
+
+def generate_class_dot(labels, terms, class_hierarchy):
     """Generate DOT format for class hierarchy"""
-    dot = []
-    dot.append('digraph "Class Hierarchy" {')
-    dot.append('  rankdir=BT;')
-    dot.append('  node [shape=box, style=filled, fillcolor=lightblue];')
-    
-    # Add nodes (classes)
-    added_classes = set()
+    dot = DotWriter('Class Hierarchy', labels, terms, 'shape=box, style=filled, fillcolor=lightblue')
     for parent, child in class_hierarchy:
-        if parent not in added_classes:
-            parent_label = get_label(g, parent)
-            dot.append(f'  "{parent}" [label="{parent_label}"];')
-            added_classes.add(parent)
-        
-        if child not in added_classes:
-            child_label = get_label(g, child)
-            dot.append(f'  "{child}" [label="{child_label}"];')
-            added_classes.add(child)
-    
-    # Add edges (subclass relationships)
-    for parent, child in class_hierarchy:
-        dot.append(f'  "{child}" -> "{parent}" [label="rdfs:subClassOf"];')
-    
-    dot.append('}')
-    return '\n'.join(dot)
+        dot.node(parent)
+        dot.node(child)
+    # Edges point from subclass to superclass
+    dot.edges(((c, p) for p, c in class_hierarchy), 'rdfs:subClassOf')
+    return dot.text()
 
-def generate_objprop_dot(g, prop_hierarchy, domains_ranges):
+def generate_objprop_dot(labels, terms, prop_hierarchy, domains, ranges):
     """Generate DOT format for object property hierarchy"""
-    dot = []
-    dot.append('digraph "Object Properties" {')
-    dot.append('  rankdir=BT;')
-    dot.append('  node [shape=box, style=filled];')
-    
-    # Add nodes (properties)
-    added_props = set()
+    dot = DotWriter('Object Properties', labels, terms, 'shape=box, style=filled')
     for parent, child in prop_hierarchy:
-        if parent not in added_props:
-            parent_label = get_label(g, parent)
-            dot.append(f'  "{parent}" [label="{parent_label}", fillcolor=lightgreen];')
-            added_props.add(parent)
-        
-        if child not in added_props:
-            child_label = get_label(g, child)
-            dot.append(f'  "{child}" [label="{child_label}", fillcolor=lightgreen];')
-            added_props.add(child)
-    
-    # Add class nodes for domains and ranges
-    added_classes = set()
-    for item1, item2, rel_type in domains_ranges:
-        if rel_type == "domain":
-            domain, prop = item1, item2
-            if domain not in added_classes:
-                domain_label = get_label(g, domain)
-                dot.append(f'  "{domain}" [label="{domain_label}", fillcolor=lightblue];')
-                added_classes.add(domain)
-        elif rel_type == "range":
-            prop, range_cls = item1, item2
-            if range_cls not in added_classes:
-                range_label = get_label(g, range_cls)
-                dot.append(f'  "{range_cls}" [label="{range_label}", fillcolor=lightblue];')
-                added_classes.add(range_cls)
-    
-    # Add edges (subproperty relationships)
-    for parent, child in prop_hierarchy:
-        dot.append(f'  "{child}" -> "{parent}" [label="rdfs:subPropertyOf"];')
-    
-    # Add domain/range edges
-    for item1, item2, rel_type in domains_ranges:
-        if rel_type == "domain":
-            domain, prop = item1, item2
-            dot.append(f'  "{prop}" -> "{domain}" [label="rdfs:domain", style="dashed"];')
-        elif rel_type == "range":
-            prop, range_cls = item1, item2
-            dot.append(f'  "{prop}" -> "{range_cls}" [label="rdfs:range", style="dotted"];')
-    
-    dot.append('}')
-    return '\n'.join(dot)
+        dot.node(parent, 'lightgreen')
+        dot.node(child, 'lightgreen')
+    for domain, prop in domains:
+        dot.node(prop, 'lightgreen')
+        dot.node(domain, 'lightblue')
+    for prop, range_cls in ranges:
+        dot.node(prop, 'lightgreen')
+        dot.node(range_cls, 'lightblue')
+    dot.edges(((c, p) for p, c in prop_hierarchy), 'rdfs:subPropertyOf')
+    dot.edges(((p, d) for d, p in domains), 'rdfs:domain', 'dashed')
+    dot.edges(ranges, 'rdfs:range', 'dotted')
+    return dot.text()
 
-def generate_dataprop_dot(g, prop_hierarchy, domains):
+def generate_dataprop_dot(labels, terms, prop_hierarchy, domains):
     """Generate DOT format for data property hierarchy"""
-    dot = []
-    dot.append('digraph "Data Properties" {')
-    dot.append('  rankdir=BT;')
-    dot.append('  node [shape=box, style=filled];')
-    
-    # Add nodes (properties)
-    added_props = set()
+    dot = DotWriter('Data Properties', labels, terms, 'shape=box, style=filled')
     for parent, child in prop_hierarchy:
-        if parent not in added_props:
-            parent_label = get_label(g, parent)
-            dot.append(f'  "{parent}" [label="{parent_label}", fillcolor=lightyellow];')
-            added_props.add(parent)
-        
-        if child not in added_props:
-            child_label = get_label(g, child)
-            dot.append(f'  "{child}" [label="{child_label}", fillcolor=lightyellow];')
-            added_props.add(child)
-    
-    # Add class nodes for domains
-    added_classes = set()
+        dot.node(parent, 'lightyellow')
+        dot.node(child, 'lightyellow')
     for domain, prop in domains:
-        if domain not in added_classes:
-            domain_label = get_label(g, domain)
-            dot.append(f'  "{domain}" [label="{domain_label}", fillcolor=lightblue];')
-            added_classes.add(domain)
-    
-    # Add edges (subproperty relationships)
-    for parent, child in prop_hierarchy:
-        dot.append(f'  "{child}" -> "{parent}" [label="rdfs:subPropertyOf"];')
-    
-    # Add domain edges
-    for domain, prop in domains:
-        dot.append(f'  "{prop}" -> "{domain}" [label="rdfs:domain", style="dashed"];')
-    
+        dot.node(prop, 'lightyellow')
+        dot.node(domain, 'lightblue')
+    dot.edges(((c, p) for p, c in prop_hierarchy), 'rdfs:subPropertyOf')
+    dot.edges(((p, d) for d, p in domains), 'rdfs:domain', 'dashed')
+    return dot.text()
+
+def get_layers(g, terms):
+    """Extract (layer, class) ID edges from connect:belongsToLayer"""
+    members = EdgeList()
+    for cls, layer in g.subject_objects(BELONGS_TO_LAYER):
+        if isinstance(cls, URIRef) and isinstance(layer, URIRef) and (cls, RDF.type, OWL.Class) in g:
+            members.add(terms.intern(layer), terms.intern(cls))
+    return members
+
+def get_external_mappings(graphs, terms, namespace=CONNECT):
+    """Extract (term, external) ID edges for subclass and subproperty links to external vocabularies"""
+    classes, props = EdgeList(), EdgeList()
+    for g in graphs:
+        for pred, edges in ((RDFS.subClassOf, classes), (RDFS.subPropertyOf, props)):
+            for term, ext in g.subject_objects(pred):
+                if (isinstance(ext, URIRef) and str(term).startswith(namespace)
+                        and str(ext).startswith(tuple(EXTERNAL_PREFIXES))):
+                    edges.add(terms.intern(term), terms.intern(ext))
+    return classes, props
+
+def _quoted(text):
+    return text.replace('"', '\\"')
+
+def generate_layers_dot(labels, terms, members, exemplars=6):
+    """Generate DOT with one cluster per layer, showing up to `exemplars` classes each"""
+    clusters = {}
+    for layer, cls in members:
+        clusters.setdefault(layer, set()).add(cls)
+    label = lambda i: get_label(labels, terms.terms[i])
+    dot = ['digraph "Layers Overview" {', '  rankdir=LR;', '  graph [splines=true, nodesep=0.8, ranksep=1.2];',
+           '  node [shape=box, style=filled, fillcolor=white, fontname="Helvetica"];']
+    for cid, layer in enumerate(sorted(clusters, key=label)):
+        classes = sorted(clusters[layer], key=lambda i: local_name(terms.terms[i]))
+        dot.append(f'  subgraph cluster_{cid} {{')
+        dot.append(f'    label="{_quoted(label(layer))}"; style=filled; color=lightgrey; fillcolor="#f7f7f7";')
+        for i in classes[:exemplars]:
+            dot.append(f'    n{i} [label="{_quoted(label(i))}", tooltip="{terms.terms[i]}"];')
+        if len(classes) > exemplars:
+            dot.append(f'    n{layer}_more [label="+{len(classes) - exemplars} more", shape=plaintext, fontcolor=gray50];')
+        dot.append('  }')
+    dot.append('}')
+    return '\n'.join(dot)
+
+def generate_mappings_dot(labels, terms, class_links, prop_links):
+    """Generate DOT with internal terms on the left, external terms on the right"""
+    label = lambda i: _quoted(get_label(labels, terms.terms[i]))
+    by_local = lambda i: local_name(terms.terms[i])
+    internal = {a for a, _ in class_links} | {a for a, _ in prop_links}
+    external = {b for _, b in class_links} | {b for _, b in prop_links}
+    dot = ['digraph "External Mappings" {', '  rankdir=LR;', '  graph [splines=true, nodesep=0.9, ranksep=1.2];',
+           '  node [fontname="Helvetica", shape=box, style=filled, fillcolor=white];',
+           '  edge [fontname="Helvetica", fontsize=10];']
+    for name, title, nodes in (('odim', 'ODIM-MH', internal), ('ext', 'External', external)):
+        dot.append(f'  subgraph cluster_{name} {{')
+        dot.append(f'    label="{title}"; style=filled; color=lightgrey; fillcolor="#f7f7f7";')
+        dot.extend(f'    n{i} [label="{label(i)}", tooltip="{terms.terms[i]}"];' for i in sorted(nodes, key=by_local))
+        dot.append('  }')
+    for edges, style in ((class_links, 'solid'), (prop_links, 'dashed')):
+        dot.extend(f'  n{a} -> n{b} [style={style}];' for a, b in sorted(set(edges)))
     dot.append('}')
     return '\n'.join(dot)
 
+def build_view(view, g, labels, terms, selection, extra_graphs=()):
+    """DOT text for one view of the loaded ontology"""
+    if view == 'classes':
+        hierarchy = get_class_hierarchy(g, terms)
+        return generate_class_dot(labels, terms, hierarchy.select(terms.mask(selection), both=True))
+    if view == 'objproperties':
+        edges = get_object_properties(g, terms)
+        mask = terms.mask(selection)
+        return generate_objprop_dot(labels, terms, *(e.select(mask) for e in edges))
+    if view == 'dataproperties':
+        edges = get_data_properties(g, terms)
+        mask = terms.mask(selection)
+        return generate_dataprop_dot(labels, terms, *(e.select(mask) for e in edges))
+    if view == 'layers':
+        members = get_layers(g, terms)
+        return generate_layers_dot(labels, terms, members.select(terms.mask(selection)))
+    links = get_external_mappings([g, *extra_graphs], terms)
+    mask = terms.mask(selection)
+    return generate_mappings_dot(labels, terms, *(e.select(mask) for e in links))
+
+def output_paths(output, views, formats):
+    """(view, format) -> path; one view and format write to `output` itself"""
+    if len(views) == 1 and len(formats) == 1:
+        return {(views[0], formats[0]): output}
+    return {(view, fmt): os.path.join(output, f"{VIEWS[view]}.{fmt}") for view in views for fmt in formats}
+
 def save_dot(dot_content, output_file):
     """Save DOT content to file"""
-    with open(output_file, 'w') as f:
+    with phase('write dot', 'write'), open(output_file, 'w') as f:
         f.write(dot_content)
     print(f"DOT file saved to: {output_file}")
 
 def convert_dot_to_format(dot_file, output_file, format_type):
     """Convert DOT to specified format using Graphviz"""
     try:
-        subprocess.run(["dot", f"-T{format_type}", dot_file, "-o", output_file], check=True)
+        run(["dot", f"-T{format_type}", dot_file, "-o", output_file], f"dot -T{format_type}", 'layout', check=True)
         print(f"{format_type.upper()} file saved to: {output_file}")
         return True
-    except subprocess.CalledProcessError as e:
+    except (OSError, subprocess.CalledProcessError) as e:
         print(f"Error converting DOT to {format_type}: {e}")
         return False
 
+def _convert_job(dot_file, output_file, format_type):
+    """Process-pool entry point; flushes the worker's trace events itself"""
+    try:
+        return convert_dot_to_format(dot_file, output_file, format_type)
+    finally:
+        flush()
+
+def convert_all(jobs, workers):
+    """Run (dot file, output, format) conversions concurrently; True if all succeeded"""
+    if len(jobs) <= 1 or workers <= 1:
+        return all([convert_dot_to_format(*job) for job in jobs])
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return all([f.result() for f in [pool.submit(_convert_job, *job) for job in jobs]])
+
 def main():
     args = parse_args()
+    configure(args.profile)
     
-    # Load ontology
+    # Load ontology and index labels once
     g = load_ontology(args.input)
+    with phase('index labels', 'build'):
+        labels = build_label_index(g, parse_lang_preference(args.lang))
+    with phase('select subgraph', 'query'):
+        selection = select_entities(g, args)
     
-    # Create output directories if they don't exist
-    os.makedirs(os.path.dirname(os.path.abspath(args.output)) or '.', exist_ok=True)
-    
-    # Determine visualization type and create DOT content
-    dot_content = None
-    if args.type == 'classes' or args.type == 'all':
-        hierarchy = get_class_hierarchy(g)
-        dot_content = generate_class_dot(g, hierarchy)
-    elif args.type == 'objproperties':
-        prop_hierarchy, domains_ranges = get_object_properties(g)
-        dot_content = generate_objprop_dot(g, prop_hierarchy, domains_ranges)
-    elif args.type == 'dataproperties':
-        prop_hierarchy, domains = get_data_properties(g)
-        dot_content = generate_dataprop_dot(g, prop_hierarchy, domains)
-    
-    # Output based on format
-    if args.format == 'dot':
-        save_dot(dot_content, args.output)
-    else:
-        # For SVG/PNG/PDF, create temp DOT file and convert
-        with tempfile.NamedTemporaryFile(suffix='.dot', delete=False) as tmp:
-            tmp.write(dot_content.encode('utf-8'))
-            tmp_name = tmp.name
-        
-        convert_dot_to_format(tmp_name, args.output, args.format)
-        os.unlink(tmp_name)  # Clean up temp file
+    paths = output_paths(args.output, args.views, args.formats)
+    for path in set(paths.values()):
+        os.makedirs(os.path.dirname(os.path.abspath(path)) or '.', exist_ok=True)
+    extra_graphs = [load_graph(f) for f in args.merge] if 'mappings' in args.views else []
+
+    terms = TermTable()
+    with tempfile.TemporaryDirectory(prefix='owl2dot-') as tmp:
+        jobs = []
+        for view in args.views:
+            with phase(f'build {view}', 'build'):
+                dot_content = build_view(view, g, labels, terms, selection, extra_graphs)
+            dot_file = paths.get((view, 'dot')) or os.path.join(tmp, f"{VIEWS[view]}.dot")
+            save_dot(dot_content, dot_file)
+            jobs += [(dot_file, paths[(view, fmt)], fmt) for fmt in args.formats if fmt != 'dot']
+        ok = convert_all(jobs, args.jobs)
+    if not ok:
+        raise SystemExit(1)
 
 if __name__ == '__main__':
     main()
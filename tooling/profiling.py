@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Phase-level profiling written as Chrome trace-event JSON
+
+Profiling is off unless MHM_PROFILE names a trace file (the scripts'
+`--profile FILE` option sets it, and `run_ontology_tools.sh --profile FILE`
+forwards it into the container). When on, `phase(name, cat)` records a
+complete ("X") event per phase with its duration and peak RSS, and every
+process merges its events into the trace file on exit, so one trace covers
+the shell target, each Python script and each wrapped JVM/Graphviz call.
+Open the file in chrome://tracing or https://ui.perfetto.dev.
+
+Categories used by the tooling: load, parse, query, build, write, layout,
+subprocess and jvm.
+
+Peak RSS is per phase on Linux (the kernel high-water mark is reset at each
+phase start via /proc/self/clear_refs); elsewhere it is the process peak so
+far. When phases run concurrently in threads (generate_all_viz.py --jobs)
+the per-phase figure is approximate. Subprocess phases report the child's
+own peak RSS.
+
+Usage:
+  python3 profiling.py run [--cat jvm] NAME -- COMMAND [ARGS...]
+  python3 profiling.py summary build/trace.json
+"""
+
+import argparse
+import atexit
+import contextlib
+import fcntl
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+ENV_VAR = 'MHM_PROFILE'
+
+_EVENTS = []
+_LOCAL = threading.local()
+_REGISTERED = False
+
+def trace_file():
+    """Path of the trace file, or None when profiling is off"""
+    return os.environ.get(ENV_VAR) or None
+
+def enabled():
+    return trace_file() is not None
+
+def add_profile_arg(parser):
+    """Register --profile FILE on an argparse parser"""
+    parser.add_argument('--profile', metavar='FILE',
+                        help=f'Write a Chrome trace of the phases to FILE (or set {ENV_VAR})')
+
+def configure(path):
+    """Turn profiling on for this process (and its children) when path is given"""
+    if path:
+        os.environ[ENV_VAR] = os.path.abspath(path)
+
+def _now_us():
+    return time.time_ns() // 1000
+
+def _read_hwm_kb():
+    """Kernel RSS high-water mark in kB, or None when unavailable"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def _reset_hwm():
+    """Reset the RSS high-water mark; returns False where the kernel does not allow it"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def _maxrss_kb(who=resource.RUSAGE_SELF):
+    rss = resource.getrusage(who).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss  # bytes on macOS
+
+def _peak_kb():
+    hwm = _read_hwm_kb()
+    return hwm if hwm is not None else _maxrss_kb()
+
+def _stack():
+    stack = getattr(_LOCAL, 'stack', None)
+    if stack is None:
+        stack = _LOCAL.stack = []
+    return stack
+
+def _record(name, cat, start_us, dur_us, peak_kb, args=None):
+    global _REGISTERED
+    event = {
+        'name': name, 'cat': cat, 'ph': 'X',
+        'ts': start_us, 'dur': dur_us,
+        'pid': os.getpid(), 'tid': threading.get_ident() % 2**31,
+        'args': dict(args or {}, peak_rss_mb=round(peak_kb / 1024, 1)),
+    }
+    _EVENTS.append(event)
+    if not _REGISTERED:
+        _REGISTERED = True
+        atexit.register(flush)
+
+@contextlib.contextmanager
+def phase(name, cat='build', **args):
+    """Record the enclosed block as one trace event (no-op unless profiling is on)"""
+    if not enabled():
+        yield
+        return
+    stack = _stack()
+    if stack:
+        stack[-1]['peak'] = max(stack[-1]['peak'], _peak_kb())
+    frame = {'peak': 0}
+    stack.append(frame)
+    _reset_hwm()
+    start_us = _now_us()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        dur_us = int((time.perf_counter() - started) * 1e6)
+        frame['peak'] = max(frame['peak'], _peak_kb())
+        stack.pop()
+        if stack:
+            stack[-1]['peak'] = max(stack[-1]['peak'], frame['peak'])
+        _record(name, cat, start_us, dur_us, frame['peak'], args)
+
+def run(cmd, name=None, cat='subprocess', check=False, **kwargs):
+    """subprocess.run that records the command as a phase with the child's peak RSS
+
+    Output capture is not supported while profiling; pass check=True to raise
+    CalledProcessError like subprocess.run.
+    """
+    if not enabled():
+        return subprocess.run(cmd, check=check, **kwargs)
+    name = name or os.path.basename(str(cmd[0]))
+    start_us = _now_us()
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, **kwargs)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    dur_us = int((time.perf_counter() - started) * 1e6)
+    child_kb = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+    _record(name, cat, start_us, dur_us, child_kb,
+            {'command': ' '.join(str(c) for c in cmd), 'returncode': proc.returncode})
+    if check and proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    return subprocess.CompletedProcess(cmd, proc.returncode)
+
+def flush():
+    """Merge this process's events into the trace file"""
+    path = trace_file()
+    # Forked workers inherit the parent's pending events; only write our own
+    events = [e for e in _EVENTS if e['pid'] == os.getpid()]
+    del _EVENTS[:]
+    if not path or not events:
+        return
+    events.append({'name': 'process_name', 'ph': 'M', 'pid': os.getpid(),
+                   'args': {'name': ' '.join([os.path.basename(sys.argv[0] or 'python')] + sys.argv[1:3])}})
+    os.makedirs(os.path.dirname(os.path.abspath(path)) or '.', exist_ok=True)
+    with open(path, 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)  # several processes may finish at once
+        f.seek(0)
+        text = f.read()
+        try:
+            trace = json.loads(text) if text.strip() else {}
+        except ValueError:
+            trace = {}
+        trace.setdefault('traceEvents', []).extend(events)
+        trace.setdefault('displayTimeUnit', 'ms')
+        f.seek(0)
+        f.truncate()
+        json.dump(trace, f)
+
+def summarize(path):
+    """Total time, call count and max peak RSS per (category, phase)"""
+    with open(path) as f:
+        events = [e for e in json.load(f).get('traceEvents', []) if e.get('ph') == 'X']
+    totals = {}
+    for e in events:
+        entry = totals.setdefault((e.get('cat', ''), e['name']), [0, 0, 0.0])
+        entry[0] += e['dur']
+        entry[1] += 1
+        entry[2] = max(entry[2], e.get('args', {}).get('peak_rss_mb', 0.0))
+    return sorted(totals.items(), key=lambda item: -item[1][0])
+
+def main():
+    ap = argparse.ArgumentParser(description='Chrome trace profiling helpers')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    r = sub.add_parser('run', help='Run a command as one traced phase')
+    r.add_argument('name', help='Phase name')
+    r.add_argument('--cat', default='subprocess', help='Trace category (default: subprocess)')
+    r.add_argument('command', nargs=argparse.REMAINDER, help='Command after --')
+    s = sub.add_parser('summary', help='Print per-phase totals from a trace file')
+    s.add_argument('trace', nargs='?', default=trace_file())
+    args = ap.parse_args()
+
+    if args.cmd == 'run':
+        command = args.command[1:] if args.command[:1] == ['--'] else args.command
+        if not command:
+            ap.error('run needs a command after --')
+        sys.exit(run(command, args.name, args.cat).returncode)
+
+    if not args.trace:
+        ap.error(f'summary needs a trace file (or {ENV_VAR})')
+    print(f"{'seconds':>9} {'calls':>5} {'peak MB':>8}  phase")
+    for (cat, name), (dur, calls, peak) in summarize(args.trace):
+        print(f"{dur / 1e6:9.3f} {calls:5d} {peak:8.1f}  {cat}:{name}")
+
+if __name__ == '__main__':
+    main()
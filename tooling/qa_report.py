@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Incremental native QA report for the per-entity ROBOT report rules
+
+Implements the rules that make up `report.tsv` for this ontology, with
+ROBOT's levels and scope (entities declared and described in the file,
+not bare declarations of external terms; deprecated entities are only
+checked by missing_obsolete_label):
+  ERROR  missing_label           no rdfs:label
+  WARN   missing_definition      no IAO:0000115 definition
+  WARN   missing_obsolete_label  deprecated, label not starting with "obsolete"
+  INFO   missing_superclass      class without a named superclass
+
+Results are cached per entity under `build/cache/qa/`, keyed by a hash of
+the entity's own axioms (its outgoing triples, blank-node objects expanded).
+A run re-checks only entities whose hash changed, writes `report.tsv` in the
+ROBOT format (Level, Rule Name, Subject, Property, Value) and a delta
+report of new and fixed rows against the previous `report.tsv`.
+
+Exits 1 when an ERROR row is reported, like `robot report`. ROBOT's full
+report (`run_ontology_tools.sh report`) stays the reference.
+
+Usage:
+  python3 qa_report.py mhm_ontology.owl [--output report.tsv]
+      [--delta build/report-delta.tsv] [--full]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from rdflib import BNode, Literal, OWL, RDF, RDFS, URIRef
+
+from graph_cache import cache_dir, load_graph
+from profiling import add_profile_arg, configure, phase
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_VERSION = 1
+HEADER = ['Level', 'Rule Name', 'Subject', 'Property', 'Value']
+LEVELS = {'ERROR': 0, 'WARN': 1, 'INFO': 2}
+ENTITY_TYPES = (OWL.Class, OWL.ObjectProperty, OWL.DatatypeProperty, OWL.AnnotationProperty)
+DEFINITION = URIRef('http://purl.obolibrary.org/obo/IAO_0000115')
+
+def labels(g, entity):
+    return [str(o) for o in g.objects(entity, RDFS.label)]
+
+def deprecated(g, entity):
+    return any(str(o).lower() == 'true' for o in g.objects(entity, OWL.deprecated))
+
+def missing_label(g, entity):
+    if not labels(g, entity):
+        yield 'rdfs:label', ''
+
+def missing_definition(g, entity):
+    if not deprecated(g, entity) and (entity, DEFINITION, None) not in g:
+        yield 'IAO:0000115', ''
+
+def missing_obsolete_label(g, entity):
+    if deprecated(g, entity):
+        for label in labels(g, entity):
+            if not label.lower().startswith('obsolete'):
+                yield 'rdfs:label', label
+
+def missing_superclass(g, entity):
+    if (entity, RDF.type, OWL.Class) not in g or deprecated(g, entity):
+        return
+    if not any(isinstance(o, URIRef) and o != OWL.Thing for o in g.objects(entity, RDFS.subClassOf)):
+        yield 'rdfs:subClassOf', ''
+
+RULES = [
+    ('ERROR', 'missing_label', missing_label),
+    ('WARN', 'missing_definition', missing_definition),
+    ('WARN', 'missing_obsolete_label', missing_obsolete_label),
+    ('INFO', 'missing_superclass', missing_superclass),
+]
+RULES_KEY = hashlib.sha256(repr([(level, name) for level, name, _ in RULES]).encode()).hexdigest()[:12]
+
+def entities(g):
+    """Entities in report scope: declared here with at least one other axiom"""
+    found = set()
+    for kind in ENTITY_TYPES:
+        for entity in g.subjects(RDF.type, kind):
+            if isinstance(entity, URIRef) and any(p != RDF.type for p in g.predicates(entity)):
+                found.add(entity)
+    return found
+
+def describe(g, node, seen=()):
+    """Sorted lines for the triples of node, blank-node objects expanded in place"""
+    lines = []
+    for p, o in g.predicate_objects(node):
+        if isinstance(o, BNode):
+            inner = '' if o in seen else ' '.join(describe(g, o, seen + (o,)))
+            lines.append(f"{p} [{inner}]")
+        elif isinstance(o, Literal):
+            lines.append(f"{p} {o.n3()}")
+        else:
+            lines.append(f"{p} <{o}>")
+    return sorted(lines)
+
+def entity_hash(g, entity):
+    return hashlib.sha256('\n'.join(describe(g, entity)).encode()).hexdigest()[:16]
+
+def check_entity(g, entity):
+    return [[level, name, str(entity), prop, value]
+            for level, name, rule in RULES for prop, value in rule(g, entity)]
+
+def cache_path(ontology):
+    key = hashlib.sha256(os.path.abspath(ontology).encode()).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(ontology))[0]
+    return os.path.join(cache_dir('qa'), f"{name}-{key}.json")
+
+def load_cache(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != CACHE_VERSION or data.get('rules') != RULES_KEY:
+        return {}
+    return data.get('entities', {})
+
+def save_cache(path, results):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'rules': RULES_KEY, 'entities': results}, f)
+    os.replace(tmp, path)
+
+def run_report(g, cached):
+    """Return ({iri: {'hash', 'rows'}}, number of entities re-checked)"""
+    results, checked = {}, 0
+    for entity in entities(g):
+        digest = entity_hash(g, entity)
+        entry = cached.get(str(entity))
+        if entry is None or entry['hash'] != digest:
+            entry = {'hash': digest, 'rows': check_entity(g, entity)}
+            checked += 1
+        results[str(entity)] = entry
+    return results, checked
+
+def sort_rows(rows):
+    return sorted(rows, key=lambda r: (LEVELS.get(r[0], 9), r[1], r[2], r[3], r[4]))
+
+def read_report(path):
+    """Rows of an existing report.tsv (without header), or None if absent"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        rows = [line.rstrip('\n').split('\t') for line in f if line.strip()]
+    return [(r + [''] * 5)[:5] for r in rows[1:]]
+
+def write_tsv(path, header, rows):
+    os.makedirs(os.path.dirname(os.path.abspath(path)) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        for row in [header] + rows:
+            f.write('\t'.join(row) + '\n')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Incremental per-entity QA report (ROBOT report format)')
+    parser.add_argument('ontology')
+    parser.add_argument('--output', default='report.tsv', help='Report file (default: report.tsv)')
+    parser.add_argument('--delta', default=os.path.join(REPO_ROOT, 'build', 'report-delta.tsv'),
+                        help='New/fixed rows against the previous report (default: build/report-delta.tsv)')
+    parser.add_argument('--full', action='store_true', help='Ignore the per-entity cache')
+    add_profile_arg(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    configure(args.profile)
+    started = time.perf_counter()
+    g = load_graph(args.ontology)
+    path = cache_path(args.ontology)
+    with phase('qa rules', 'query'):
+        results, checked = run_report(g, {} if args.full else load_cache(path))
+    save_cache(path, results)
+
+    rows = sort_rows(row for entry in results.values() for row in entry['rows'])
+    previous = read_report(args.output)
+    write_tsv(args.output, HEADER, rows)
+    old = {tuple(r) for r in previous or []}
+    new = {tuple(r) for r in rows}
+    delta = [['new'] + list(r) for r in sort_rows(new - old)] + [['fixed'] + list(r) for r in sort_rows(old - new)]
+    write_tsv(args.delta, ['Change'] + HEADER, delta)
+    seconds = time.perf_counter() - started
+
+    for row in delta:
+        print(f"[{row[0]}] {row[1]} {row[2]} {row[3]} {row[5]}".rstrip())
+    counts = {level: sum(1 for r in rows if r[0] == level) for level in LEVELS}
+    baseline = f"{len(new - old)} new, {len(old - new)} fixed" if previous is not None else 'no previous report'
+    print(f"[qa] {len(rows)} rows ({', '.join(f'{n} {level}' for level, n in counts.items())}); "
+          f"{checked}/{len(results)} entities re-checked in {seconds * 1000:.0f} ms; {baseline}; "
+          f"wrote {args.output} and {args.delta}")
+    return 1 if counts['ERROR'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
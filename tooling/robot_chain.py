@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Profile check, QA report and reasoning in one chained ROBOT invocation
+
+Runs
+  robot validate-profile ... report ... reason ...
+so the JVM starts once and the ontology (with its catalog imports) is
+loaded once; each command passes the loaded ontology on to the next.
+validate-profile and report leave the ontology unchanged, and reason runs
+last because it adds the inferred axioms. The chain stops at the first
+failing step: a profile violation or an ERROR-level report row, like the
+separate `profile` and `report` targets.
+
+ROBOT does not report per-command times, so they are derived from when
+each step finished writing its output (same clock, same container):
+  startup+load+validate-profile  start -> profile.txt written
+  report                         profile.txt -> report.tsv written
+  reason                         report.tsv -> classified ontology written
+Timings are printed and written as JSON (default build/qa-timings.json).
+
+Usage:
+  python3 robot_chain.py mhm_ontology.owl [--owl-profile DL] [--reasoner elk]
+      [--catalog catalog-v001.xml] [--timings build/qa-timings.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from profiling import add_profile_arg, configure, run
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def chain_command(args):
+    """The chained ROBOT command line and the (step, output file) pairs in order"""
+    cmd = ['robot', 'validate-profile']
+    if args.catalog:
+        cmd += ['--catalog', args.catalog]
+    cmd += ['--input', args.ontology, '--profile', args.owl_profile, '--output', args.profile_output,
+            'report', '--output', args.report_output,
+            'reason', '--reasoner', args.reasoner, '--consistency', 'true', '--output', args.classified]
+    steps = [('startup+load+validate-profile', args.profile_output),
+             ('report', args.report_output),
+             ('reason', args.classified)]
+    return cmd, steps
+
+def mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+def step_timings(steps, before, started, finished):
+    """Seconds per step from output write times; steps that did not write are omitted"""
+    timings, previous = [], started
+    for name, path in steps:
+        written = mtime(path)
+        if written is None or written == before[path] or written < previous:
+            break
+        timings.append({'step': name, 'output': path, 'seconds': round(written - previous, 3)})
+        previous = written
+    return timings, round(finished - started, 3)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='validate-profile, report and reason in one ROBOT run')
+    parser.add_argument('ontology')
+    parser.add_argument('--owl-profile', default='DL', help='OWL 2 profile (default: DL)')
+    parser.add_argument('--reasoner', default='elk', help='ROBOT reasoner (default: elk)')
+    parser.add_argument('--catalog', help='XML catalog (default: catalog-v001.xml if present)')
+    parser.add_argument('--profile-output', default='profile.txt')
+    parser.add_argument('--report-output', default='report.tsv')
+    parser.add_argument('--classified', help='Reasoned ontology (default: classified-<reasoner>.owl)')
+    parser.add_argument('--timings', default=os.path.join(REPO_ROOT, 'build', 'qa-timings.json'),
+                        help='Per-step timings JSON (default: build/qa-timings.json)')
+    add_profile_arg(parser)
+    args = parser.parse_args()
+    if args.catalog is None and os.path.isfile('catalog-v001.xml'):
+        args.catalog = 'catalog-v001.xml'
+    args.classified = args.classified or f"classified-{args.reasoner.lower()}.owl"
+    return args
+
+def main():
+    args = parse_args()
+    configure(args.profile)
+    cmd, steps = chain_command(args)
+    before = {path: mtime(path) for _, path in steps}
+    started = time.time()
+    status = run(cmd, 'robot validate-profile+report+reason', 'jvm').returncode
+    timings, total = step_timings(steps, before, started, time.time())
+
+    for t in timings:
+        print(f"[qa] {t['step']:<31} {t['seconds']:7.2f}s  wrote {t['output']}")
+    if len(timings) < len(steps):
+        print(f"[qa] stopped before {steps[len(timings)][0]} (robot exit {status})")
+    print(f"[qa] total {total:.2f}s in one JVM")
+    os.makedirs(os.path.dirname(os.path.abspath(args.timings)) or '.', exist_ok=True)
+    with open(args.timings, 'w') as f:
+        json.dump({'ontology': args.ontology, 'command': cmd, 'returncode': status,
+                   'steps': timings, 'seconds': total}, f, indent=2)
+        f.write('\n')
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
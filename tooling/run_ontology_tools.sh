@@ -36,41 +36,182 @@ build_image() {
   fi
 }
 
+# Fills CONTAINER_ENV with the -e flags for docker run/exec
+container_env() {
+  CONTAINER_ENV=()
+  # Forward the profiling trace path, mapped into the /work mount
+  if [[ -n "${MHM_PROFILE:-}" ]]; then
+    CONTAINER_ENV+=(-e "MHM_PROFILE=${MHM_PROFILE/#$REPO_ROOT//work}")
+  fi
+  # Forward the local SPARQL endpoint; localhost inside the container is the container
+  if [[ -n "${MHM_SPARQL_ENDPOINT:-}" ]]; then
+    local endpoint=${MHM_SPARQL_ENDPOINT/:\/\/localhost/://host.docker.internal}
+    CONTAINER_ENV+=(-e "MHM_SPARQL_ENDPOINT=${endpoint/:\/\/127.0.0.1/://host.docker.internal}")
+  fi
+}
+
+# Fills CONTAINER_HOSTS with the --add-host flags for docker run
+container_hosts() {
+  CONTAINER_HOSTS=()
+  # host.docker.internal for the SPARQL endpoint (built in on Docker Desktop, not on Linux)
+  if [[ -n "${MHM_SPARQL_ENDPOINT:-}" ]]; then
+    CONTAINER_HOSTS+=(--add-host host.docker.internal:host-gateway)
+  fi
+}
+
+# Session mode (MHM_TOOLS_SESSION=1): one long-lived tools container per
+# workspace, steps dispatched with docker exec. The container's main process
+# exits (and --rm removes it) once no step has run for
+# MHM_TOOLS_SESSION_IDLE seconds and none is still running.
+SESSION_DIR=/tmp/mhm-session
+SESSION_LOOP='
+  trap "exit 0" TERM INT
+  mkdir -p '"$SESSION_DIR"' && touch '"$SESSION_DIR"'/heartbeat
+  while :; do
+    sleep 15 & wait $!
+    busy=0
+    for f in '"$SESSION_DIR"'/busy.*; do
+      [ -e "$f" ] || continue
+      if [ -d "/proc/${f##*.}" ]; then busy=1; else rm -f "$f"; fi
+    done
+    if [ "$busy" = 1 ]; then touch '"$SESSION_DIR"'/heartbeat; continue; fi
+    [ $(( $(date +%s) - $(stat -c %Y '"$SESSION_DIR"'/heartbeat) )) -ge "$1" ] && exit 0
+  done'
+SESSION_EXEC='
+  touch '"$SESSION_DIR"'/heartbeat '"$SESSION_DIR"'/busy.$$
+  trap "rm -f '"$SESSION_DIR"'/busy.$$; touch '"$SESSION_DIR"'/heartbeat" EXIT
+  "$@"'
+
+session_name() {
+  echo "mhm-tools-$(printf '%s' "$REPO_ROOT" | cksum | cut -d' ' -f1)"
+}
+
+session_enabled() {
+  [[ ${MHM_TOOLS_SESSION:-0} == 1 ]] && [[ -z ${MHM_TOOLS_SESSION_DISABLED:-} ]]
+}
+
+# Prints the session's image ID when its container is running
+session_image() {
+  docker inspect -f '{{if .State.Running}}{{.Image}}{{end}}' "$(session_name)" 2>/dev/null || true
+}
+
+session_start() {
+  local name image
+  name=$(session_name)
+  ensure_image
+  image=$(docker image inspect -f '{{.Id}}' "$IMAGE_NAME")
+  case "$(session_image)" in
+    "$image") return 0 ;;
+    "") ;;
+    *) echo "[tools] Image changed; restarting session $name" >&2; docker stop "$name" > /dev/null 2>&1 || true ;;
+  esac
+  docker rm -f "$name" > /dev/null 2>&1 || true
+  echo "[tools] Starting session container $name (idle timeout ${MHM_TOOLS_SESSION_IDLE:-900}s)" >&2
+  docker run -d --rm --name "$name" \
+    --label "mhm.workspace=$REPO_ROOT" \
+    --add-host host.docker.internal:host-gateway \
+    -v "$REPO_ROOT":/work \
+    -w /work \
+    "$IMAGE_NAME" sh -c "$SESSION_LOOP" sh "${MHM_TOOLS_SESSION_IDLE:-900}" > /dev/null \
+    || [[ -n "$(session_image)" ]]  # lost a start race to a concurrent step
+}
+
+session_stop() {
+  docker stop "$(session_name)" > /dev/null 2>&1 && echo "[tools] Stopped $(session_name)" || echo "[tools] No session running"
+}
+
+# docker exec flags ($1, e.g. -it) then the command
+session_exec() {
+  local flags=$1; shift
+  container_env
+  docker exec ${flags:+"$flags"} -w /work ${CONTAINER_ENV[@]+"${CONTAINER_ENV[@]}"} \
+    "$(session_name)" sh -c "$SESSION_EXEC" sh "$@"
+}
+
 run_in_container() {
+  if session_enabled; then
+    if session_start; then
+      session_exec "" "$@"
+      return
+    fi
+    echo "[tools] Session unavailable; falling back to docker run" >&2
+    export MHM_TOOLS_SESSION_DISABLED=1
+  fi
   ensure_image
+  container_env
+  container_hosts
   docker run --rm \
     -v "$REPO_ROOT":/work \
     -w /work \
+    ${CONTAINER_HOSTS[@]+"${CONTAINER_HOSTS[@]}"} \
+    ${CONTAINER_ENV[@]+"${CONTAINER_ENV[@]}"} \
     "$IMAGE_NAME" "$@"
 }
 
+# Run a JVM tool (robot, riot, openllet) as one traced phase when profiling
+run_jvm() {
+  local name=$1; shift
+  if [[ -n "${MHM_PROFILE:-}" ]]; then
+    run_in_container python3 /work/tooling/profiling.py run --cat jvm "$name" -- "$@"
+  else
+    run_in_container "$@"
+  fi
+}
+
 run_interactive() {
+  if session_enabled && session_start; then
+    session_exec -it "$@"
+    return
+  fi
   ensure_image
+  container_env
+  container_hosts
   docker run --rm -it \
     -v "$REPO_ROOT":/work \
     -w /work \
+    ${CONTAINER_HOSTS[@]+"${CONTAINER_HOSTS[@]}"} \
+    ${CONTAINER_ENV[@]+"${CONTAINER_ENV[@]}"} \
     "$IMAGE_NAME" "$@"
 }
 
 usage() {
   cat <<'USAGE'
-Usage: tooling/run_ontology_tools.sh <command> [args]
+Usage: tooling/run_ontology_tools.sh [--profile FILE] <command> [args]
+
+  --profile FILE                Write a Chrome trace of the load/parse/query/build/
+                                write/layout/JVM phases to FILE (same as MHM_PROFILE)
 
 Commands:
   build                         Build the Docker image (caches for reuse)
+  session start|stop|status     Long-lived tools container for this workspace; with
+                                MHM_TOOLS_SESSION=1 every step runs in it via docker exec
   shell                         Start interactive shell in the tools container
 
   check-syntax <file.owl>       Validate RDF/XML syntax with Jena riot
   profile <file.owl> [DL|EL]    OWL 2 profile validation via ROBOT
   reason <file.owl> [elk|hermit]Consistency + classification via ROBOT
   report <file.owl>             ROBOT QA report (report.tsv in CWD)
+  qa <file.owl> [DL|EL] [elk|hermit]
+                                validate-profile + report + reason chained in one ROBOT JVM
+                                (profile.txt, report.tsv, classified-<reasoner>.owl, build/qa-timings.json)
+  report-native <file.owl>      Incremental per-entity QA report (report.tsv + build/report-delta.tsv)
+  classify <file.owl>           Fast in-process EL classification (build/classified-el.ttl)
+  export-binary                 Write memory-mappable .mhmb graphs to build/binary/
+  subsumption-index <file.owl> [classified.owl]
+                                Persist the is-a index (<file>.subsumption.json)
   openllet-consistency <file>   Openllet consistency check (if installed)
 
   visualize-classes [--engine ENGINE] [--tred|--no-tred] [--unflatten] Generate class hierarchy visualization (SVG)
+                                Focus options for visualize-classes/objproperties/dataproperties:
+                                  --root IRI [--depth N] [--ancestors|--descendants] --layer VALUE --skos-tag CONCEPT
   visualize-objproperties [--engine ENGINE] [--no-clustering] Generate object properties visualization (SVG)
   visualize-dataproperties [--engine ENGINE] [--no-clustering] Generate data properties visualization (SVG)
   visualize-all <file.owl>      Generate all visualizations (class, obj/data properties)
 
+  validate-abox <data...>       Stream-check measurement individuals (.ttl/.nt) in bounded memory
+  watch [--format svg]          Keep the sources loaded; re-run affected checks/views on every save
+  sparql-endpoint [--port N]    Serve the merged ontology over SPARQL on localhost:N (default 3030)
+
   exec -- <args...>             Run arbitrary command in the container
 
 Examples:
@@ -79,6 +220,7 @@ Examples:
   tooling/run_ontology_tools.sh profile mhm_ontology.owl DL
   tooling/run_ontology_tools.sh reason mhm_ontology.owl elk
   tooling/run_ontology_tools.sh report mhm_ontology.owl
+  tooling/run_ontology_tools.sh qa mhm_ontology.owl DL elk
   tooling/run_ontology_tools.sh visualize-classes mhm_ontology.owl
   tooling/run_ontology_tools.sh visualize-all mhm_ontology.owl
   tooling/run_ontology_tools.sh shell
@@ -86,6 +228,12 @@ Examples:
 USAGE
 }
 
+if [[ ${1:-} == "--profile" ]]; then
+  [[ ${2:-} ]] || { echo "--profile needs a trace file"; exit 1; }
+  export MHM_PROFILE="$2"
+  shift 2
+fi
+
 cmd=${1:-}
 case "$cmd" in
   build)
@@ -94,36 +242,76 @@ case "$cmd" in
   shell)
     run_interactive bash
     ;;
+  session)
+    case "${2:-status}" in
+      start) session_start ;;
+      stop) session_stop ;;
+      status)
+        if [[ -n "$(session_image)" ]]; then
+          echo "[tools] Session $(session_name) running (started $(docker inspect -f '{{.State.StartedAt}}' "$(session_name)"))"
+        else
+          echo "[tools] No session running for $REPO_ROOT"
+        fi
+        ;;
+      *) echo "Usage: $0 session start|stop|status" >&2; exit 1 ;;
+    esac
+    ;;
   check-syntax)
     [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
-    run_in_container bash -lc "riot --validate '${2}'"
+    run_jvm "riot validate" bash -lc "riot --validate '${2}'"
     ;;
   profile)
     [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
     profile=${3:-DL}
     if [[ -f catalog-v001.xml ]]; then
-      run_in_container robot validate-profile --catalog catalog-v001.xml --input "$2" --profile "$profile" --output profile.txt && echo "Wrote profile.txt"
+      run_jvm "robot validate-profile" robot validate-profile --catalog catalog-v001.xml --input "$2" --profile "$profile" --output profile.txt && echo "Wrote profile.txt"
     else
-      run_in_container robot validate-profile --input "$2" --profile "$profile" --output profile.txt && echo "Wrote profile.txt"
+      run_jvm "robot validate-profile" robot validate-profile --input "$2" --profile "$profile" --output profile.txt && echo "Wrote profile.txt"
     fi
     ;;
   reason)
     [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
     reasoner=${3:-elk}
     out="classified-${reasoner}.owl"
-    run_in_container robot reason --reasoner "$reasoner" --input "$2" --consistency true --output "$out" && echo "Wrote $out"
+    run_jvm "robot reason" robot reason --reasoner "$reasoner" --input "$2" --consistency true --output "$out" || exit $?
+    echo "Wrote $out"
+    # Refresh the persisted subsumption index with the inferred edges
+    run_in_container python3 /work/tooling/subsumption_index.py build "$2" --inferred "$out"
+    ;;
+  classify)
+    [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
+    run_in_container python3 /work/tooling/el_classifier.py "$2" --output build/classified-el.ttl --index
+    ;;
+  export-binary)
+    run_in_container python3 /work/tooling/binary_graph.py export-all
+    ;;
+  subsumption-index)
+    [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
+    run_in_container python3 /work/tooling/subsumption_index.py build "$2" --inferred "${3:-classified-elk.owl}"
     ;;
   report)
     [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
     if [[ -f catalog-v001.xml ]]; then
-      run_in_container robot report --catalog catalog-v001.xml --input "$2" --output report.tsv && echo "Wrote report.tsv"
+      run_jvm "robot report" robot report --catalog catalog-v001.xml --input "$2" --output report.tsv && echo "Wrote report.tsv"
     else
-      run_in_container robot report --input "$2" --output report.tsv && echo "Wrote report.tsv"
+      run_jvm "robot report" robot report --input "$2" --output report.tsv && echo "Wrote report.tsv"
     fi
     ;;
+  qa)
+    # One JVM, one ontology load: profile check, report, then reasoning
+    [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
+    reasoner=${4:-elk}
+    mkdir -p "$REPO_ROOT/build"
+    run_in_container python3 /work/tooling/robot_chain.py "$2" --owl-profile "${3:-DL}" --reasoner "$reasoner" || exit $?
+    run_in_container python3 /work/tooling/subsumption_index.py build "$2" --inferred "classified-${reasoner}.owl"
+    ;;
+  report-native)
+    [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
+    run_in_container python3 /work/tooling/qa_report.py "$2" --output report.tsv
+    ;;
   openllet-consistency)
     [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
-    run_in_container bash -lc 'command -v openllet >/dev/null 2>&1 || { echo "Openllet is not installed in this image."; exit 127; }; openllet consistency -i '"$2"''
+    run_jvm "openllet consistency" bash -lc 'command -v openllet >/dev/null 2>&1 || { echo "Openllet is not installed in this image."; exit 127; }; openllet consistency -i '"$2"''
     ;;
   exec)
     shift || true
@@ -133,6 +321,7 @@ case "$cmd" in
   visualize-classes)
     shift  # Remove the command name
     owl_file=""
+    select_args=()
     engine="dot"
     tred_flag="--tred"
     unflatten_flag=""
@@ -144,6 +333,14 @@ case "$cmd" in
           engine="$2"
           shift 2
           ;;
+        --root|--depth|--layer|--skos-tag|--vocab)
+          select_args+=("$1" "$2")
+          shift 2
+          ;;
+        --ancestors|--descendants)
+          select_args+=("$1")
+          shift
+          ;;
         --no-tred)
           tred_flag="--no-tred"
           shift
@@ -173,8 +370,11 @@ case "$cmd" in
     output_dir="docs/visualizations"
     mkdir -p "$output_dir"
     
-    dot_file="$output_dir/class-hierarchy-$engine.dot"
-    svg_file="$output_dir/class-hierarchy-$engine.svg"
+    # Focused renders get their own file names so they never replace full views
+    suffix=""
+    if [[ ${#select_args[@]} -gt 0 ]]; then suffix="-focus"; fi
+    dot_file="$output_dir/class-hierarchy-$engine$suffix.dot"
+    svg_file="$output_dir/class-hierarchy-$engine$suffix.svg"
     
     # Generate DOT file with specified engine and options
     python_args=("python3" "/work/tooling/generate_hierarchy_viz.py" "$owl_file" "$dot_file" "--engine" "$engine")
@@ -184,30 +384,20 @@ case "$cmd" in
     if [[ "$unflatten_flag" != "" ]]; then
       python_args+=("$unflatten_flag")
     fi
+    # Transitive reduction (--tred) and leaf staggering (--unflatten) happen
+    # inside the generator, so the DOT file is ready for layout as written
+    python_args+=(${select_args[@]+"${select_args[@]}"})
     run_in_container "${python_args[@]}"
     
-    # Apply graph preprocessing if requested
-    processed_dot="$dot_file"
-    if [[ "$unflatten_flag" == "--unflatten" ]]; then
-      temp_dot="$output_dir/class-hierarchy-$engine.unflatten.dot"
-      run_in_container unflatten -l 3 "$dot_file" > "$temp_dot"
-      processed_dot="$temp_dot"
-    fi
-    
-    if [[ "$tred_flag" == "--tred" ]]; then
-      temp_dot2="$output_dir/class-hierarchy-$engine.tred.dot"
-      run_in_container tred "$processed_dot" > "$temp_dot2"
-      processed_dot="$temp_dot2"
-    fi
-    
     # Generate SVG using the specified engine
-    run_in_container "$engine" -Tsvg "$processed_dot" -o "$svg_file"
+    run_in_container python3 /work/tooling/layout_cache.py "$engine" "$dot_file" "$svg_file"
     
     echo "[tools] Created class hierarchy visualization ($engine): $svg_file"
     ;;
   visualize-objproperties)
     shift  # Remove the command name
     owl_file=""
+    select_args=()
     engine="sfdp"
     clustering_flag=""
     
@@ -218,6 +408,14 @@ case "$cmd" in
           engine="$2"
           shift 2
           ;;
+        --root|--depth|--layer|--skos-tag|--vocab)
+          select_args+=("$1" "$2")
+          shift 2
+          ;;
+        --ancestors|--descendants)
+          select_args+=("$1")
+          shift
+          ;;
         --no-clustering)
           clustering_flag="--no-clustering"
           shift
@@ -239,24 +437,29 @@ case "$cmd" in
     output_dir="docs/visualizations"
     mkdir -p "$output_dir"
     
-    dot_file="$output_dir/object-properties-$engine.dot"
-    svg_file="$output_dir/object-properties-$engine.svg"
+    # Focused renders get their own file names so they never replace full views
+    suffix=""
+    if [[ ${#select_args[@]} -gt 0 ]]; then suffix="-focus"; fi
+    dot_file="$output_dir/object-properties-$engine$suffix.dot"
+    svg_file="$output_dir/object-properties-$engine$suffix.svg"
     
     # Generate DOT file with specified engine and options
     python_args=("python3" "/work/tooling/generate_objprop_viz.py" "$owl_file" "$dot_file" "--engine" "$engine")
     if [[ "$clustering_flag" != "" ]]; then
       python_args+=("$clustering_flag")
     fi
+    python_args+=(${select_args[@]+"${select_args[@]}"})
     run_in_container "${python_args[@]}"
     
     # Generate SVG using the specified engine
-    run_in_container "$engine" -Tsvg "$dot_file" -o "$svg_file"
+    run_in_container python3 /work/tooling/layout_cache.py "$engine" "$dot_file" "$svg_file"
     
     echo "[tools] Created object properties visualization ($engine): $svg_file"
     ;;
   visualize-dataproperties)
     shift  # Remove the command name
     owl_file=""
+    select_args=()
     engine="dot"
     clustering_flag=""
     
@@ -267,6 +470,14 @@ case "$cmd" in
           engine="$2"
           shift 2
           ;;
+        --root|--depth|--layer|--skos-tag|--vocab)
+          select_args+=("$1" "$2")
+          shift 2
+          ;;
+        --ancestors|--descendants)
+          select_args+=("$1")
+          shift
+          ;;
         --no-clustering)
           clustering_flag="--no-clustering"
           shift
@@ -288,41 +499,35 @@ case "$cmd" in
     output_dir="docs/visualizations"
     mkdir -p "$output_dir"
     
-    dot_file="$output_dir/data-properties-$engine.dot"
-    svg_file="$output_dir/data-properties-$engine.svg"
+    # Focused renders get their own file names so they never replace full views
+    suffix=""
+    if [[ ${#select_args[@]} -gt 0 ]]; then suffix="-focus"; fi
+    dot_file="$output_dir/data-properties-$engine$suffix.dot"
+    svg_file="$output_dir/data-properties-$engine$suffix.svg"
     
     # Generate DOT file with specified engine and options
     python_args=("python3" "/work/tooling/generate_dataprop_viz.py" "$owl_file" "$dot_file" "--engine" "$engine")
     if [[ "$clustering_flag" != "" ]]; then
       python_args+=("$clustering_flag")
     fi
+    python_args+=(${select_args[@]+"${select_args[@]}"})
     run_in_container "${python_args[@]}"
     
     # Generate SVG using the specified engine
-    run_in_container "$engine" -Tsvg "$dot_file" -o "$svg_file"
+    run_in_container python3 /work/tooling/layout_cache.py "$engine" "$dot_file" "$svg_file"
     
     echo "[tools] Created data properties visualization ($engine): $svg_file"
     ;;
   visualize-all)
     [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
     output_dir="docs/visualizations"
-    mkdir -p "$output_dir"
+    mkdir -p "$output_dir" build
     echo "[tools] Generating all visualizations with optimized engines..."
-    "$0" visualize-classes "$2" --engine dot --tred
-    "$0" visualize-objproperties "$2" --engine sfdp
-    "$0" visualize-dataproperties "$2" --engine dot
-    if [[ -f "$output_dir/class-hierarchy-dot.svg" ]]; then
-      cp "$output_dir/class-hierarchy-dot.svg" "$output_dir/class-hierarchy.svg"
-    fi
-    if [[ -f "$output_dir/object-properties-sfdp.svg" ]]; then
-      cp "$output_dir/object-properties-sfdp.svg" "$output_dir/object-properties.svg"
-    fi
-    if [[ -f "$output_dir/data-properties-dot.svg" ]]; then
-      cp "$output_dir/data-properties-dot.svg" "$output_dir/data-properties.svg"
-    fi
-    # Also layers + mappings with default namespace
-    "$0" visualize-layers "$2"
-    "$0" visualize-mappings "$2"
+    # Merge core + alignments (PROV) for the external mappings view
+    run_in_container python3 /work/tooling/merge_cache.py --catalog catalog-v001.xml --input "$2" --input alignments/mhm-prov-align.owl --output build/mappings-merged.owl
+    # One Python process schedules DOT generation, layouts and canonical copies
+    # concurrently, skipping artifacts whose inputs are unchanged
+    run_in_container python3 /work/tooling/generate_all_viz.py "$2" --merged build/mappings-merged.owl --output-dir "$output_dir" --render
     echo "[tools] Canonical SVGs refreshed: class-hierarchy.svg, object-properties.svg, data-properties.svg, layers-overview.svg, external-mappings.svg"
     echo "[tools] All visualizations created in $output_dir/"
     ;;
@@ -343,7 +548,7 @@ case "$cmd" in
     if [[ -z "${ns_flag:-}" ]]; then ns_flag=("--namespace" "http://connectdigitalstudy.com/ontology#"); fi
     py=("python3" "/work/tooling/generate_layers_viz.py" "$owl_file" "$dot_file" "${ns_flag[@]}")
     run_in_container "${py[@]}"
-    run_in_container "$engine" -Tsvg "$dot_file" -o "$svg_file"
+    run_in_container python3 /work/tooling/layout_cache.py "$engine" "$dot_file" "$svg_file"
     cp "$svg_file" "$output_dir/layers-overview.svg"
     echo "[tools] Created layers overview: $output_dir/layers-overview.svg"
     ;;
@@ -359,36 +564,24 @@ case "$cmd" in
     done
     [[ -n "$owl_file" ]] || { echo "Need OWL file"; exit 1; }
     output_dir="docs/visualizations"; mkdir -p "$output_dir"; mkdir -p build
-    # Merge core + alignments (PROV)
-    run_in_container robot merge --catalog catalog-v001.xml --input "$owl_file" --input alignments/mhm-prov-align.owl --output "$merged"
+    # Merge core + alignments (PROV); reuses a cached merge when inputs are unchanged
+    run_in_container python3 /work/tooling/merge_cache.py --catalog catalog-v001.xml --input "$owl_file" --input alignments/mhm-prov-align.owl --output "$merged"
     dot_file="$output_dir/external-mappings-$engine.dot"; svg_file="$output_dir/external-mappings-$engine.svg"
     # Default namespace if none provided
     if [[ -z "${ns_flag:-}" ]]; then ns_flag=("--namespace" "http://connectdigitalstudy.com/ontology#"); fi
     py=("python3" "/work/tooling/generate_external_mappings_viz.py" "$merged" "$dot_file" "${ns_flag[@]}")
     run_in_container "${py[@]}"
-    run_in_container "$engine" -Tsvg "$dot_file" -o "$svg_file"
+    run_in_container python3 /work/tooling/layout_cache.py "$engine" "$dot_file" "$svg_file"
     cp "$svg_file" "$output_dir/external-mappings.svg"
     echo "[tools] Created external mappings: $output_dir/external-mappings.svg"
     ;;
   visualize-all-engines)
     [[ ${2:-} ]] || { echo "Need OWL file"; exit 1; }
     output_dir="docs/visualizations"
-    mkdir -p "$output_dir"
+    mkdir -p "$output_dir" build
     echo "[tools] Generating visualizations with multiple engines for comparison..."
-    
-    # Class hierarchy with different engines
-    "$0" visualize-classes "$2" --engine dot --tred
-    "$0" visualize-classes "$2" --engine sfdp --no-tred
-    
-    # Object properties with different engines  
-    "$0" visualize-objproperties "$2" --engine sfdp
-    "$0" visualize-objproperties "$2" --engine neato
-    "$0" visualize-objproperties "$2" --engine dot
-    
-    # Data properties with different engines
-    "$0" visualize-dataproperties "$2" --engine dot
-    "$0" visualize-dataproperties "$2" --engine sfdp
-    
+    run_in_container python3 /work/tooling/merge_cache.py --catalog catalog-v001.xml --input "$2" --input alignments/mhm-prov-align.owl --output build/mappings-merged.owl
+    run_in_container python3 /work/tooling/generate_all_viz.py "$2" --merged build/mappings-merged.owl --output-dir "$output_dir" --render --all-engines
     echo "[tools] All engine variations created in $output_dir/"
     ;;
   validate-prov)
@@ -396,26 +589,13 @@ case "$cmd" in
     run_in_container bash -lc '
       set -euo pipefail
       mkdir -p build
-      robot merge --catalog catalog-v001.xml \
+      python3 tooling/merge_cache.py --catalog catalog-v001.xml \
         --input alignments/mhm-prov-align.owl \
         --input examples.ttl \
         --output build/prov-merged.owl
-      failures=0
-      for q in queries/prov_*.rq; do
-        echo "[check] $q"
-        out=$(sparql --data build/prov-merged.owl --query "$q" 2>&1 | tr -d "\r")
-        if echo "$out" | grep -q "Ask => Yes"; then
-          echo "[OK]   $q"
-        else
-          echo "[FAIL] $q"
-          echo "$out" | tail -n 2
-          failures=$((failures+1))
-        fi
-      done
-      if [[ $failures -gt 0 ]]; then
-        echo "[validate-prov] $failures failure(s)"; exit 2; 
-      fi
-      echo "[validate-prov] all checks passed"
+      python3 tooling/validate_queries.py --name validate-prov --prefix prov \
+        --data build/prov-merged.owl \
+        --json build/validate-prov.json --junit build/validate-prov.xml
     ' 
     ;;
   validate-units)
@@ -423,22 +603,13 @@ case "$cmd" in
     run_in_container bash -lc '
       set -euo pipefail
       mkdir -p build
-      robot merge --catalog catalog-v001.xml \
+      python3 tooling/merge_cache.py --catalog catalog-v001.xml \
         --input mhm_ontology.owl \
         --input examples.ttl \
         --output build/units-merged.owl
-      failures=0
-      for q in queries/units_*.rq; do
-        echo "[check] $q"
-        out=$(sparql --data build/units-merged.owl --query "$q" 2>&1 | tr -d "\r")
-        if echo "$out" | grep -q "Ask => Yes"; then
-          echo "[OK]   $q"
-        else
-          echo "[FAIL] $q"; echo "$out" | tail -n 2; failures=$((failures+1))
-        fi
-      done
-      if [[ $failures -gt 0 ]]; then echo "[validate-units] $failures failure(s)"; exit 2; fi
-      echo "[validate-units] all checks passed"
+      python3 tooling/validate_queries.py --name validate-units --prefix units \
+        --data build/units-merged.owl \
+        --json build/validate-units.json --junit build/validate-units.xml
     ' 
     ;;
   validate-sosa)
@@ -446,22 +617,13 @@ case "$cmd" in
     run_in_container bash -lc '
       set -euo pipefail
       mkdir -p build
-      robot merge --catalog catalog-v001.xml \
+      python3 tooling/merge_cache.py --catalog catalog-v001.xml \
         --input mhm_ontology.owl \
         --input examples.ttl \
         --output build/sosa-merged.owl
-      failures=0
-      for q in queries/sosa_*.rq; do
-        echo "[check] $q"
-        out=$(sparql --data build/sosa-merged.owl --query "$q" 2>&1 | tr -d "\r")
-        if echo "$out" | grep -q "Ask => Yes"; then
-          echo "[OK]   $q"
-        else
-          echo "[FAIL] $q"; echo "$out" | tail -n 2; failures=$((failures+1))
-        fi
-      done
-      if [[ $failures -gt 0 ]]; then echo "[validate-sosa] $failures failure(s)"; exit 2; fi
-      echo "[validate-sosa] all checks passed"
+      python3 tooling/validate_queries.py --name validate-sosa --prefix sosa \
+        --data build/sosa-merged.owl \
+        --json build/validate-sosa.json --junit build/validate-sosa.xml
     ' 
     ;;
   validate-skos)
@@ -469,27 +631,54 @@ case "$cmd" in
     run_in_container bash -lc '
       set -euo pipefail
       mkdir -p build
-      robot merge --catalog catalog-v001.xml \
+      python3 tooling/merge_cache.py --catalog catalog-v001.xml \
         --input mhm_ontology.owl \
         --input vocab/property-categories.ttl \
         --input vocab/question-domains.ttl \
         --input vocab/skos-tags.ttl \
         --input examples.ttl \
         --output build/skos-merged.owl
-      failures=0
-      for q in queries/skos_*.rq; do
-        echo "[check] $q"
-        out=$(sparql --data build/skos-merged.owl --query "$q" 2>&1 | tr -d "\r")
-        if echo "$out" | grep -q "Ask => Yes"; then
-          echo "[OK]   $q"
-        else
-          echo "[FAIL] $q"; echo "$out" | tail -n 2; failures=$((failures+1))
-        fi
-      done
-      if [[ $failures -gt 0 ]]; then echo "[validate-skos] $failures failure(s)"; exit 2; fi
-      echo "[validate-skos] all checks passed"
+      status=0
+      python3 tooling/validate_queries.py --name validate-skos --prefix skos \
+        --data build/skos-merged.owl \
+        --json build/validate-skos.json --junit build/validate-skos.xml || status=$?
+      # broader cycles: strongly connected components instead of skos:broader+
+      python3 tooling/skos_cycles.py build/skos-merged.owl --json build/skos-cycles.json || status=$?
+      exit $status
     '
     ;;
+  validate-abox)
+    # Stream measurement data through the per-measurement rules (bounded memory)
+    shift
+    [[ ${1:-} ]] || { echo "Need one or more data files (.ttl or .nt)"; exit 1; }
+    mkdir -p "$REPO_ROOT/build"
+    run_in_container python3 /work/tooling/validate_abox_stream.py "$@" \
+      --output build/abox-violations.tsv --json build/abox-violations.json
+    ;;
+  watch)
+    # Long-running: one warm process, interactive so Ctrl-C stops it
+    shift
+    run_interactive python3 /work/tooling/watch.py "$@"
+    ;;
+  sparql-endpoint)
+    # Long-running; point the tooling at it with MHM_SPARQL_ENDPOINT=http://localhost:<port>/sparql
+    shift
+    port=3030
+    args=("$@")
+    for ((i = 0; i < ${#args[@]}; i++)); do
+      [[ ${args[$i]} == "--port" ]] && port=${args[$((i + 1))]:-3030}
+    done
+    ensure_image
+    container_env
+    container_hosts
+    docker run --rm -it \
+      -v "$REPO_ROOT":/work \
+      -w /work \
+      -p "127.0.0.1:$port:$port" \
+      ${CONTAINER_HOSTS[@]+"${CONTAINER_HOSTS[@]}"} \
+      ${CONTAINER_ENV[@]+"${CONTAINER_ENV[@]}"} \
+      "$IMAGE_NAME" python3 /work/tooling/sparql_endpoint.py --host 0.0.0.0 "$@"
+    ;;
   -h|--help|help|"")
     usage
     ;;
@@ -499,3 +688,7 @@ case "$cmd" in
     exit 1
     ;;
 esac
+
+if [[ -n "${MHM_PROFILE:-}" ]]; then
+  echo "[profile] Trace written to $MHM_PROFILE (summary: python3 tooling/profiling.py summary $MHM_PROFILE)"
+fi
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Semantic diff between two revisions of the ontology, examples or vocabularies
+
+Both sides are parsed into graphs and canonicalized, so blank-node labels
+no longer depend on how the parser numbered them:
+  - a blank node that is the only blank object of its subject and predicate
+    (the QUDT quantity value of a measurement, an OWL restriction used as
+    the one equivalent class) is labelled by that path, so an edited
+    numeric value or unit shows up as one changed triple;
+  - other blank nodes (several restrictions on one class) get a label
+    from a hash of their own triples, recursively. Nodes with identical
+    content share a label; their triples are identical, so nothing is lost.
+Each canonical triple is hashed once and the two hash sets are compared,
+which is linear in the number of triples.
+
+The change set groups the added and removed triples into classes,
+properties, concepts, subclass/subproperty/broader edges, labels and layer
+annotations, lists the rest as other triples, and names the affected
+entities (blank-node changes are attributed to the entity that owns the
+node). That list is what downstream tooling needs to rebuild only what
+changed.
+
+Exits 1 when the graphs differ (like diff).
+
+Usage:
+  python3 semantic_diff.py [--from REV] [--to REV] FILE [FILE ...] [--json OUT]
+      (default: HEAD against the working tree)
+  python3 semantic_diff.py --between OLD.owl NEW.owl [--json OUT]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+from rdflib import BNode, Graph, OWL, RDF, RDFS, SKOS, URIRef
+from rdflib.util import guess_format
+
+from graph_cache import load_graph
+from profiling import add_profile_arg, configure, phase
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYER = URIRef('http://connectdigitalstudy.com/ontology#belongsToLayer')
+DECLARATIONS = {
+    OWL.Class: 'classes',
+    OWL.ObjectProperty: 'object_properties',
+    OWL.DatatypeProperty: 'data_properties',
+    OWL.AnnotationProperty: 'annotation_properties',
+    SKOS.Concept: 'concepts',
+}
+EDGES = {RDFS.subClassOf: 'subclass_edges', RDFS.subPropertyOf: 'subproperty_edges', SKOS.broader: 'broader_edges'}
+LABELS = {RDFS.label, SKOS.prefLabel, SKOS.altLabel}
+
+def git_graph(rev, path):
+    """Parse a file as of a git revision; an empty graph if it did not exist"""
+    relative = os.path.relpath(os.path.abspath(path), REPO_ROOT)
+    try:
+        data = subprocess.run(['git', 'show', f'{rev}:{relative}'], cwd=REPO_ROOT,
+                              capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError:
+        return Graph()
+    g = Graph()
+    with phase(f"parse {rev}:{os.path.basename(path)}", 'parse'):
+        g.parse(data=data, format=guess_format(path) or 'turtle', publicID=os.path.abspath(path))
+    return g
+
+def load_side(files, rev=None):
+    """Graph of files at rev (working tree when rev is None)"""
+    if rev is None:
+        present = [f for f in files if os.path.exists(f)]
+        return load_graph(present) if present else Graph()
+    g = Graph()
+    for path in files:
+        for triple in git_graph(rev, path):
+            g.add(triple)
+    return g
+
+class Canonical:
+    """Deterministic labels for blank nodes and hashes for triples"""
+
+    def __init__(self, g):
+        self.g = g
+        self.labels = {}
+        self.paths = {}
+
+    def path(self, node):
+        """'<subject> <predicate> ...' when node is the only blank object on a chain from a named subject"""
+        if node not in self.paths:
+            self.paths[node] = None  # guards blank-node cycles
+            incoming = list(self.g.subject_predicates(node))
+            if len(incoming) == 1:
+                s, p = incoming[0]
+                if sum(1 for o in self.g.objects(s, p) if isinstance(o, BNode)) == 1:
+                    base = s.n3() if not isinstance(s, BNode) else self.path(s)
+                    if base is not None:
+                        self.paths[node] = f"{base} {p.n3()}"
+        return self.paths[node]
+
+    def term(self, node, visiting=()):
+        if not isinstance(node, BNode):
+            return node.n3()
+        label = self.labels.get(node)
+        if label is None:
+            if node in visiting:
+                return '_:cycle'  # only reached through a blank-node cycle
+            key = self.path(node)
+            if key is None:
+                key = '\n'.join(sorted(f"{p.n3()} {self.term(o, visiting + (node,))}"
+                                       for p, o in self.g.predicate_objects(node)))
+            label = '_:' + hashlib.sha256(key.encode()).hexdigest()[:16]
+            self.labels[node] = label
+        return label
+
+    def triples(self):
+        """{hash: (s, p, o) canonical N3 terms} for the whole graph"""
+        out = {}
+        for s, p, o in self.g:
+            triple = (self.term(s), p.n3(), self.term(o))
+            out[hashlib.blake2b(' '.join(triple).encode(), digest_size=8).digest()] = triple
+        return out
+
+    def owner(self, node, seen=()):
+        """The named subject a blank node hangs off (or its own label)"""
+        if not isinstance(node, BNode):
+            return node
+        for s in self.g.subjects(None, node):
+            if s not in seen:
+                found = self.owner(s, seen + (node,))
+                if not isinstance(found, BNode):
+                    return found
+        return node
+
+def group(changes, triples, canonical, kind, affected):
+    """Sort the added or removed triples of one side into the change set"""
+    by_label = {label: node for node, label in canonical.labels.items()}
+    for s, p, o in sorted(triples):
+        subject = s
+        if s.startswith('_:') and s in by_label:
+            owner = canonical.owner(by_label[s])
+            subject = canonical.term(owner)
+        if not subject.startswith('_:'):
+            affected.add(subject.strip('<>'))
+        predicate = URIRef(p.strip('<>'))
+        obj = URIRef(o.strip('<>')) if o.startswith('<') else None
+        if predicate == RDF.type and obj in DECLARATIONS:
+            changes[DECLARATIONS[obj]][kind].append(s.strip('<>'))
+        elif predicate in EDGES:
+            changes[EDGES[predicate]][kind].append([s.strip('<>'), o.strip('<>') if obj else o])
+        elif predicate in LABELS:
+            changes['labels'][kind].append([s.strip('<>'), p.strip('<>'), o])
+        elif predicate == LAYER:
+            changes['layers'][kind].append([s.strip('<>'), o.strip('<>')])
+        else:
+            changes['other'][kind].append([s, p, o])
+
+def diff_graphs(old, new):
+    """Structured change set between two graphs"""
+    old_c, new_c = Canonical(old), Canonical(new)
+    with phase('canonicalize', 'build'):
+        old_t, new_t = old_c.triples(), new_c.triples()
+    with phase('compare', 'build'):
+        removed = [old_t[h] for h in old_t.keys() - new_t.keys()]
+        added = [new_t[h] for h in new_t.keys() - old_t.keys()]
+    categories = sorted(set(DECLARATIONS.values()) | set(EDGES.values()) | {'labels', 'layers', 'other'})
+    changes = {name: {'added': [], 'removed': []} for name in categories}
+    affected = set()
+    group(changes, removed, old_c, 'removed', affected)
+    group(changes, added, new_c, 'added', affected)
+    return {
+        'triples': {'old': len(old_t), 'new': len(new_t), 'added': len(added), 'removed': len(removed)},
+        'changes': changes,
+        'affected': sorted(affected),
+    }
+
+def print_summary(result, limit=20):
+    for name, sides in result['changes'].items():
+        for kind, sign in (('removed', '-'), ('added', '+')):
+            items = sides[kind]
+            for item in items[:limit]:
+                print(f"{sign} {name}: {' '.join(item) if isinstance(item, list) else item}")
+            if len(items) > limit:
+                print(f"{sign} {name}: ... {len(items) - limit} more")
+    t = result['triples']
+    print(f"[diff] {t['old']} -> {t['new']} triples: +{t['added']} -{t['removed']}, "
+          f"{len(result['affected'])} affected entities")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Semantic (triple-level) diff between two revisions')
+    parser.add_argument('files', nargs='*', help='Files to compare between --from and --to')
+    parser.add_argument('--from', dest='old_rev', default='HEAD', help='Old git revision (default: HEAD)')
+    parser.add_argument('--to', dest='new_rev', help='New git revision (default: working tree)')
+    parser.add_argument('--between', nargs=2, metavar=('OLD', 'NEW'), help='Compare two files instead of revisions')
+    parser.add_argument('--json', help='Write the change set as JSON')
+    parser.add_argument('--limit', type=int, default=20, help='Items printed per category (default: 20)')
+    add_profile_arg(parser)
+    args = parser.parse_args()
+    if not args.files and not args.between:
+        parser.error('give FILE(s) or --between OLD NEW')
+    return args
+
+def main():
+    args = parse_args()
+    configure(args.profile)
+    started = time.perf_counter()
+    if args.between:
+        old, new = load_graph(args.between[0]), load_graph(args.between[1])
+        sides = {'old': args.between[0], 'new': args.between[1]}
+    else:
+        old, new = load_side(args.files, args.old_rev), load_side(args.files, args.new_rev)
+        sides = {'old': args.old_rev, 'new': args.new_rev or 'working tree', 'files': args.files}
+    result = dict(sides, **diff_graphs(old, new))
+    result['seconds'] = round(time.perf_counter() - started, 6)
+
+    print_summary(result, args.limit)
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)) or '.', exist_ok=True)
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+    t = result['triples']
+    return 1 if t['added'] or t['removed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
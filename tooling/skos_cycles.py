@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Find cycles in the SKOS broader hierarchy with strongly connected components
+
+Replaces the `skos:broader+` property-path check, which walks the closure
+from every concept, with one linear pass: broader edges (skos:broader, plus
+skos:narrower read in reverse) are collected into an adjacency map and
+split into strongly connected components (`hierarchy.strongly_connected_components`).
+Every component with more than one concept, and every concept that is
+broader than itself, is a cycle. For each one the members, the edges
+inside it (with the asserting predicate) and one concrete cycle path are
+reported.
+
+Exits 2 when a cycle is found.
+
+Usage:
+  python3 skos_cycles.py [FILE ...] [--json build/skos-cycles.json]
+  (default files: vocab/*.ttl)
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import deque
+
+from rdflib import SKOS, URIRef
+
+from graph_cache import load_graph
+from hierarchy import strongly_connected_components
+from profiling import add_profile_arg, configure, phase
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def broader_edges(g):
+    """Return (edges, asserted): narrower -> {broader} and (narrower, broader) -> predicates"""
+    edges, asserted = {}, {}
+    pairs = [(c, b, 'skos:broader') for c, b in g.subject_objects(SKOS.broader)]
+    pairs += [(c, b, 'skos:narrower') for b, c in g.subject_objects(SKOS.narrower)]
+    for child, parent, pred in pairs:
+        if not (isinstance(child, URIRef) and isinstance(parent, URIRef)):
+            continue
+        child, parent = str(child), str(parent)
+        edges.setdefault(child, set()).add(parent)
+        asserted.setdefault((child, parent), set()).add(pred)
+    return edges, asserted
+
+def cycle_path(edges, members):
+    """One closed path through the component, starting at its smallest member"""
+    start = min(members)
+    if start in edges.get(start, ()):
+        return [start, start]
+    inside = set(members)
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for nxt in sorted(edges.get(node, ())):
+            if nxt == start:
+                path = [node]
+                while previous[path[-1]] is not None:
+                    path.append(previous[path[-1]])
+                return list(reversed(path)) + [start]
+            if nxt in inside and nxt not in previous:
+                previous[nxt] = node
+                queue.append(nxt)
+    return [start]
+
+def find_cycles(edges, asserted):
+    """List of cycle reports (members, edges, path), sorted by first member"""
+    cycles = []
+    for component in strongly_connected_components(edges):
+        members = sorted(component)
+        if len(members) == 1 and members[0] not in edges.get(members[0], ()):
+            continue
+        inside = set(members)
+        cycle_edges = [{'narrower': c, 'broader': b, 'asserted_by': sorted(asserted[(c, b)])}
+                       for c in members for b in sorted(edges.get(c, ())) if b in inside]
+        cycles.append({'members': members, 'edges': cycle_edges, 'path': cycle_path(edges, members)})
+    return sorted(cycles, key=lambda c: c['members'][0])
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Report cycles in the SKOS broader hierarchy')
+    parser.add_argument('files', nargs='*', help='Vocabulary/data files (default: vocab/*.ttl)')
+    parser.add_argument('--json', help='Write the cycle report as JSON')
+    add_profile_arg(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    configure(args.profile)
+    files = args.files or sorted(glob.glob(os.path.join(REPO_ROOT, 'vocab', '*.ttl')))
+    if not files:
+        print("[skos-cycles] no input files", file=sys.stderr)
+        sys.exit(1)
+    g = load_graph(files)
+
+    started = time.perf_counter()
+    with phase('broader cycles', 'query'):
+        edges, asserted = broader_edges(g)
+        cycles = find_cycles(edges, asserted)
+    seconds = time.perf_counter() - started
+
+    for cycle in cycles:
+        print(f"[FAIL] broader cycle with {len(cycle['members'])} concept(s): {' -> '.join(cycle['path'])}")
+        for edge in cycle['edges']:
+            print(f"  {edge['narrower']} -> {edge['broader']} ({', '.join(edge['asserted_by'])})")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'files': files, 'edges': len(asserted), 'seconds': round(seconds, 6),
+                       'cycles': cycles}, f, indent=2)
+
+    if cycles:
+        print(f"[skos-cycles] {len(cycles)} cycle(s) in {len(asserted)} broader edges")
+        sys.exit(2)
+    print(f"[skos-cycles] no cycles in {len(asserted)} broader edges ({seconds * 1000:.1f} ms)")
+
+if __name__ == '__main__':
+    main()
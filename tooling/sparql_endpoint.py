@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Local SPARQL endpoint over the ontology files, from one warm process
+
+Serves the SPARQL 1.1 protocol (query operation only) on `/sparql`:
+  GET  /sparql?query=...                     results as SPARQL JSON
+  POST /sparql  (form `query=...` or an application/sparql-query body)
+Results are CSV instead with `Accept: text/csv` or `format=csv`.
+
+The default graph is the merged core ontology, PROV alignment, `vocab/*.ttl`
+and `examples.ttl`. A query can name other files with `default-graph-uri`
+(repeatable): a path relative to the repository, e.g.
+`default-graph-uri=mhm_ontology.owl` or `build/units-merged.owl`. Those are
+loaded on first use (through the snapshot cache) and kept. Files are only
+read, never written, and must lie inside the repository.
+
+Queries run concurrently on a thread per request. Results are kept in an
+LRU cache keyed by (files, query, format). `POST /admin/reload` re-reads
+every loaded file and empties the cache; `GET /admin/status` reports files,
+triples and cache hits.
+
+`sparql_session.py` (the generate_*_viz.py scripts) and `validate_queries.py`
+send their queries here when `MHM_SPARQL_ENDPOINT` is set, e.g.
+`MHM_SPARQL_ENDPOINT=http://localhost:3030/sparql`.
+
+Usage:
+  python3 sparql_endpoint.py [--host 127.0.0.1] [--port 3030] [--cache-size 256]
+"""
+
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from rdflib import Graph
+
+from graph_cache import load_graph
+from profiling import add_profile_arg, configure, phase
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FILES = ['mhm_ontology.owl', 'alignments/mhm-prov-align.owl'] + sorted(
+    os.path.relpath(p, REPO_ROOT) for p in glob.glob(os.path.join(REPO_ROOT, 'vocab', '*.ttl'))) + ['examples.ttl']
+FORMATS = {'json': 'application/sparql-results+json', 'csv': 'text/csv; charset=utf-8'}
+
+class UnknownGraph(Exception):
+    pass
+
+def repo_path(name):
+    """Absolute path of a repository-relative file name, or UnknownGraph"""
+    path = os.path.normpath(os.path.join(REPO_ROOT, name))
+    if os.path.commonpath([path, REPO_ROOT]) != REPO_ROOT or not os.path.isfile(path):
+        raise UnknownGraph(name)
+    return path
+
+def graph_key(names):
+    """Canonical (sorted, repository-relative) form of a default-graph-uri list"""
+    return tuple(sorted({os.path.relpath(repo_path(name), REPO_ROOT) for name in names}))
+
+class Store:
+    """Parsed files and their merged combinations; replaced as a whole on reload"""
+
+    def __init__(self, files=()):
+        self.files = {}
+        self.merged = {}
+        self.lock = threading.Lock()
+        for name in files:
+            self.file(name)
+
+    def file(self, name):
+        graph = self.files.get(name)
+        if graph is None:
+            graph = load_graph(repo_path(name))
+            self.files[name] = graph
+        return graph
+
+    def graph(self, key):
+        """Union of the files in a graph_key (a merged copy, built once per combination)"""
+        with self.lock:
+            merged = self.merged.get(key)
+            if merged is None:
+                if len(key) == 1:
+                    merged = self.file(key[0])
+                else:
+                    merged = Graph()
+                    with phase(f"merge {len(key)} files", 'build'):
+                        for name in key:
+                            for triple in self.file(name):
+                                merged.add(triple)
+                self.merged[key] = merged
+        return merged
+
+class ResultCache:
+    """Thread-safe LRU of serialized query results"""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self.lock:
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+class Endpoint:
+    """Query answering and reload, shared by all request threads"""
+
+    def __init__(self, cache_size):
+        self.current = (1, Store(DEFAULT_FILES))
+        self.cache = ResultCache(cache_size)
+        self.reload_lock = threading.Lock()
+
+    def answer(self, query, names, fmt):
+        generation, store = self.current  # a concurrent reload swaps both at once
+        names = graph_key(names)
+        key = (generation, names, query, fmt)
+        body = self.cache.get(key)
+        if body is None:
+            graph = store.graph(names)
+            with phase('query', 'query'):
+                body = graph.query(query).serialize(format=fmt)
+            self.cache.put(key, body)
+        return body
+
+    def reload(self):
+        """Re-read every loaded file; queries keep the old store until the new one is ready"""
+        with self.reload_lock:
+            started = time.perf_counter()
+            generation, store = self.current
+            names = [n for n in store.files if os.path.isfile(os.path.join(REPO_ROOT, n))]
+            self.current = (generation + 1, Store(names))
+            self.cache.clear()
+            return dict(self.status(), seconds=round(time.perf_counter() - started, 6))
+
+    def status(self):
+        generation, store = self.current
+        cache = self.cache
+        return {
+            'generation': generation,
+            'files': {name: len(g) for name, g in store.files.items()},
+            'cache': {'entries': len(cache.entries), 'size': cache.size, 'hits': cache.hits, 'misses': cache.misses},
+        }
+
+class Handler(BaseHTTPRequestHandler):
+    endpoint = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/admin/status':
+            return self.send_json(200, self.endpoint.status())
+        if url.path != '/sparql':
+            return self.send_text(404, 'not found')
+        self.query(parse_qs(url.query))
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        if url.path == '/admin/reload':
+            return self.send_json(200, self.endpoint.reload())
+        if url.path != '/sparql':
+            return self.send_text(404, 'not found')
+        params = parse_qs(url.query)
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip()
+        if content_type == 'application/sparql-query':
+            params['query'] = [body]
+        else:
+            for name, values in parse_qs(body).items():
+                params.setdefault(name, []).extend(values)
+        self.query(params)
+
+    def query(self, params):
+        if not params.get('query'):
+            return self.send_text(400, 'missing query parameter')
+        fmt = (params.get('format') or [''])[0]
+        if fmt not in FORMATS:
+            fmt = 'csv' if 'text/csv' in (self.headers.get('Accept') or '') else 'json'
+        names = params.get('default-graph-uri') or DEFAULT_FILES
+        try:
+            body = self.endpoint.answer(params['query'][0], names, fmt)
+        except UnknownGraph as e:
+            return self.send_text(404, f"unknown graph: {e}")
+        except Exception as e:  # parse errors, update requests
+            return self.send_text(400, f"{type(e).__name__}: {e}")
+        self.send(200, FORMATS[fmt], body)
+
+    def send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, data):
+        self.send(status, 'application/json', json.dumps(data, indent=2).encode() + b'\n')
+
+    def send_text(self, status, text):
+        self.send(status, 'text/plain; charset=utf-8', text.encode() + b'\n')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Local SPARQL endpoint over the ontology files')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=3030, help='Port (default: 3030)')
+    parser.add_argument('--cache-size', type=int, default=256, help='Cached results (default: 256)')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    add_profile_arg(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    configure(args.profile)
+    started = time.perf_counter()
+    Handler.endpoint = Endpoint(args.cache_size)
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    server.verbose = args.verbose
+    triples = sum(Handler.endpoint.status()['files'].values())
+    print(f"[sparql] {len(DEFAULT_FILES)} files ({triples} triples) loaded in {time.perf_counter() - started:.2f}s; "
+          f"serving http://{args.host}:{args.port}/sparql")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+In-process SPARQL query session shared by the visualization generators
+
+A session parses its ontology files once with RDFLib and answers every
+SELECT/ASK query from memory. Rows are returned as dicts of strings with
+unbound variables as empty strings, i.e. the same shape that
+`csv.DictReader` produced from Jena's `sparql --results=CSV` output, so the
+generators keep their row handling unchanged.
+
+Sessions are cached per process by their (absolute) source paths: every
+generator that asks for the same file gets the same parsed graph. Across
+processes, the graph itself comes from the snapshot cache in
+`graph_cache.py`, so a warm run skips RDF/XML parsing entirely.
+
+When `MHM_SPARQL_ENDPOINT` names a running `sparql_endpoint.py`, sessions
+over files inside the repository send their queries there instead (the
+files go along as `default-graph-uri`), and nothing is parsed locally unless
+a caller asks for `.graph`.
+
+SELECT and ASK answers of local sessions are also kept on disk under
+`build/cache/sparql/`, keyed by a hash of the normalized query text
+(comments dropped, whitespace outside literals and IRIs collapsed), the
+content of the data files and their resolved imports (`source_key`), and the
+RDFLib version. An unchanged docs build therefore reads its answers back
+without loading the graph at all. The directory is bounded
+(`MHM_SPARQL_CACHE_MAX_MB`, default 64) by evicting the least recently used
+answers; `MHM_SPARQL_CACHE=0` turns the cache off. Hits, misses and the
+bytes and query time they saved are counted in memory and added to
+`build/cache/sparql-stats/` once, when the process exits.
+
+Usage:
+  python3 sparql_session.py stats
+  python3 sparql_session.py clear
+"""
+
+import argparse
+import atexit
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+import rdflib
+
+from graph_cache import cache_dir, evict, load_graph, source_key
+from profiling import phase
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_CACHE_VERSION = '1'
+DEFAULT_RESULT_CACHE_MB = 64
+# Literals and IRIs are kept verbatim; comments and whitespace runs are not
+QUERY_TOKEN = re.compile('|'.join([
+    r'"""[\s\S]*?"""', r"'''[\s\S]*?'''", r'"(?:[^"\\\n]|\\.)*"', r"'(?:[^'\\\n]|\\.)*'",
+    r'<[^<>"{}|^`\\\s]*>', r'#[^\n]*', r'\s+', r'''[^\s"'<#]+''', r'.',
+]))
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+STAT_NAMES = ('hits', 'misses', 'bytes_saved', 'seconds_saved')
+_STATS = {}  # this process's lookups, added to the stats file at exit
+_STATS_LOCK = threading.Lock()
+_STATS_PID = None
+
+def normalize_sources(sources):
+    """Return a tuple of absolute paths for one path or a list of paths"""
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    return tuple(os.path.abspath(os.fspath(s)) for s in sources)
+
+def normalize_query(query):
+    """Query text with comments removed and whitespace collapsed outside literals and IRIs"""
+    parts = []
+    for token in QUERY_TOKEN.findall(query):
+        if token.isspace() or token.startswith('#'):
+            if parts and parts[-1] != ' ':
+                parts.append(' ')
+        else:
+            parts.append(token)
+    return ''.join(parts).strip()
+
+def result_cache_enabled():
+    return os.environ.get('MHM_SPARQL_CACHE', '1') != '0'
+
+def result_cache_bytes():
+    return int(float(os.environ.get('MHM_SPARQL_CACHE_MAX_MB', DEFAULT_RESULT_CACHE_MB)) * 1024 * 1024)
+
+def stats_path():
+    return os.path.join(cache_dir('sparql-stats'), 'stats.json')
+
+def record(hit, size, seconds):
+    """Count one lookup in memory; flush_stats writes the totals once at exit"""
+    global _STATS_PID
+    with _STATS_LOCK:
+        if _STATS_PID != os.getpid():
+            # First lookup here, or a forked child holding its parent's counts
+            if _STATS_PID is None:
+                atexit.register(flush_stats)
+            _STATS_PID = os.getpid()
+            _STATS.update(dict.fromkeys(STAT_NAMES, 0))
+        _STATS['hits' if hit else 'misses'] += 1
+        if hit:
+            _STATS['bytes_saved'] += size
+            _STATS['seconds_saved'] += seconds
+
+def flush_stats():
+    """Add this process's lookup counts to the shared statistics file"""
+    with _STATS_LOCK:
+        if _STATS_PID != os.getpid() or not (_STATS['hits'] or _STATS['misses']):
+            return
+        counts = dict(_STATS)
+        _STATS.update(dict.fromkeys(STAT_NAMES, 0))
+    with open(stats_path(), 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)  # several generators may finish at once
+        f.seek(0)
+        try:
+            stats = json.loads(f.read() or '{}')
+        except ValueError:
+            stats = {}
+        for name in STAT_NAMES:
+            stats[name] = stats.get(name, 0) + counts[name]
+        stats['seconds_saved'] = round(stats['seconds_saved'], 6)
+        f.seek(0)
+        f.truncate()
+        json.dump(stats, f)
+
+class QuerySession:
+    """One parsed graph answering SPARQL queries in the current process"""
+
+    def __init__(self, sources):
+        self.sources = normalize_sources(sources)
+        self._graph = None
+        self._lock = threading.Lock()
+        self._data_key = None
+
+    def result_path(self, kind, query):
+        """Cache file for a query's answer over this session's data"""
+        if self._data_key is None:
+            self._data_key = source_key(self.sources)
+        h = hashlib.sha256()
+        h.update(f"results:{RESULT_CACHE_VERSION};rdflib:{rdflib.__version__};{kind}\n".encode())
+        h.update(f"data:{self._data_key}\n".encode())
+        h.update(normalize_query(query).encode())
+        return os.path.join(cache_dir('sparql'), h.hexdigest() + '.json')
+
+    def cached(self, kind, query, compute):
+        """Answer from the result cache, or compute it and store it
+
+        Bypassed when MHM_SPARQL_CACHE=0; benchmark.py sets that so its query
+        phase times evaluation rather than cache reads.
+        """
+        if not result_cache_enabled():
+            return compute()
+        path = self.result_path(kind, query)
+        try:
+            with phase('result cache lookup', 'load'), open(path, 'rb') as f:
+                data = f.read()
+            entry = json.loads(data)
+            os.utime(path)  # mark as recently used
+            record(True, len(data), entry['seconds'])
+            return entry['answer']
+        except (OSError, ValueError, KeyError):
+            pass
+        started = time.perf_counter()
+        answer = compute()
+        entry = {'seconds': round(time.perf_counter() - started, 6), 'answer': answer}
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        evict(os.path.dirname(path), result_cache_bytes())
+        record(False, 0, 0)
+        return answer
+
+    @property
+    def graph(self):
+        """The parsed graph, loaded on first use"""
+        with self._lock:
+            if self._graph is None:
+                self._graph = load_graph(self.sources)
+        return self._graph
+
+    def query(self, query):
+        """Run any query and return the RDFLib result"""
+        graph = self.graph
+        with phase('query', 'query'):
+            return graph.query(query)
+
+    def select(self, query):
+        """Run a SELECT query and return CSV-style rows (dicts of strings)"""
+        def compute():
+            graph = self.graph
+            with phase('query', 'query'):
+                result = graph.query(query)
+                names = [str(v) for v in result.vars]
+                rows = []
+                for row in result:
+                    rows.append({name: '' if value is None else str(value)
+                                 for name, value in zip(names, row)})
+            return rows
+        return self.cached('select', query, compute)
+
+    def ask(self, query):
+        """Run an ASK query and return its boolean answer"""
+        def compute():
+            graph = self.graph
+            with phase('ask', 'query'):
+                return bool(graph.query(query).askAnswer)
+        return self.cached('ask', query, compute)
+
+class RemoteResult:
+    """The parts of an RDFLib query result the tooling uses, from SPARQL JSON"""
+
+    def __init__(self, data):
+        self.type = 'ASK' if 'boolean' in data else 'SELECT'
+        self.askAnswer = data.get('boolean')
+        self.vars = data.get('head', {}).get('vars', [])
+        self.bindings = data.get('results', {}).get('bindings', [])
+
+    def __iter__(self):
+        for binding in self.bindings:
+            yield tuple(binding[name]['value'] if name in binding else None for name in self.vars)
+
+class RemoteSession(QuerySession):
+    """A session whose queries are answered by sparql_endpoint.py"""
+
+    def __init__(self, sources, endpoint):
+        super().__init__(sources)
+        self.endpoint = endpoint
+        self.graph_names = [os.path.relpath(s, REPO_ROOT) for s in self.sources]
+
+    def query(self, query):
+        data = urlencode([('query', query)] + [('default-graph-uri', n) for n in self.graph_names]).encode()
+        request = Request(self.endpoint, data=data, headers={'Accept': 'application/sparql-results+json'})
+        with phase('remote query', 'query'), urlopen(request) as response:
+            return RemoteResult(json.load(response))
+
+    def select(self, query):
+        result = self.query(query)
+        return [{name: '' if value is None else value for name, value in zip(result.vars, row)}
+                for row in result]
+
+    def ask(self, query):
+        return bool(self.query(query).askAnswer)
+
+def endpoint_for(sources):
+    """The MHM_SPARQL_ENDPOINT URL if it can serve these files, else None"""
+    endpoint = os.environ.get('MHM_SPARQL_ENDPOINT')
+    if endpoint and all(os.path.commonpath([s, REPO_ROOT]) == REPO_ROOT for s in sources):
+        return endpoint
+    return None
+
+def get_session(sources):
+    """Return the process-wide session for the given source file(s)"""
+    key = normalize_sources(sources)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            endpoint = endpoint_for(key)
+            session = RemoteSession(key, endpoint) if endpoint else QuerySession(key)
+            _SESSIONS[key] = session
+    return session
+
+def main():
+    ap = argparse.ArgumentParser(description='SPARQL result cache statistics')
+    sub = ap.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='Show hit rate, bytes saved and cache size')
+    sub.add_parser('clear', help='Delete cached results and statistics')
+    args = ap.parse_args()
+
+    directory = cache_dir('sparql')
+    if args.command == 'stats':
+        try:
+            with open(stats_path()) as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            stats = {}
+        hits, misses = stats.get('hits', 0), stats.get('misses', 0)
+        rate = f"{hits / (hits + misses) * 100:.1f}%" if hits + misses else 'n/a'
+        sizes = [os.path.getsize(os.path.join(directory, n)) for n in os.listdir(directory)]
+        print(f"{directory}: {len(sizes)} result(s), {sum(sizes) / 1024:.1f} KiB "
+              f"(limit {result_cache_bytes() / 1024 / 1024:.0f} MiB)")
+        print(f"lookups: {hits + misses}, hits: {hits}, misses: {misses}, hit rate: {rate}")
+        print(f"saved: {stats.get('bytes_saved', 0) / 1024:.1f} KiB of results served from cache, "
+              f"{stats.get('seconds_saved', 0):.2f}s of query time")
+    elif args.command == 'clear':
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        if os.path.exists(stats_path()):
+            os.remove(stats_path())
+        print(f"Cleared {directory}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Focused subgraph selection shared by owl2dot.py and the generate_*_viz.py scripts
+
+Selectors (all optional; with none given the whole ontology is rendered):
+  --root IRI         Start from this class or property (repeatable)
+  --depth N          Only follow N levels from the roots (default: unlimited)
+  --ancestors        Include superclasses/superproperties of the roots
+  --descendants      Include subclasses/subproperties of the roots
+                     (with neither flag, both directions are included)
+  --layer VALUE      Classes whose connect:belongsToLayer is VALUE
+  --skos-tag CONCEPT Classes tagged (connect:skosTag) with CONCEPT or a
+                     narrower concept
+  --vocab FILE       Extra file with tags/concepts (default: vocab/*.ttl
+                     when --skos-tag is used)
+
+VALUE and CONCEPT accept a full IRI, a local name, or a label. Root
+neighbourhoods come from a `ClosureIndex` precomputed over rdfs:subClassOf
+and rdfs:subPropertyOf, so unbounded ancestor/descendant sets are bitset
+lookups instead of SPARQL property-path walks. Selections from different
+selectors are intersected.
+"""
+
+import glob
+import os
+from collections import defaultdict
+
+from rdflib import RDFS, SKOS, URIRef
+
+from graph_cache import load_graph
+from hierarchy import ClosureIndex
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONNECT = "http://connectdigitalstudy.com/ontology#"
+BELONGS_TO_LAYER = URIRef(CONNECT + "belongsToLayer")
+SKOS_TAG = URIRef(CONNECT + "skosTag")
+
+_INDEXES = {}
+
+def add_selector_args(parser):
+    """Register the subgraph selector options on an argparse parser"""
+    group = parser.add_argument_group('subgraph selection')
+    group.add_argument('--root', action='append', default=[], help='Root IRI to focus on (repeatable)')
+    group.add_argument('--depth', type=int, help='Levels to follow from the roots (default: unlimited)')
+    group.add_argument('--ancestors', action='store_true', help='Include ancestors of the roots')
+    group.add_argument('--descendants', action='store_true', help='Include descendants of the roots')
+    group.add_argument('--layer', help='Only classes with this connect:belongsToLayer value')
+    group.add_argument('--skos-tag', help='Only classes tagged with this SKOS concept (or a narrower one)')
+    group.add_argument('--vocab', action='append', default=[], help='Extra tag/vocabulary file (repeatable)')
+    return group
+
+def has_selectors(args):
+    return bool(getattr(args, 'root', None) or getattr(args, 'layer', None) or getattr(args, 'skos_tag', None))
+
+def hierarchy_children(g):
+    """IRI children map over rdfs:subClassOf and rdfs:subPropertyOf"""
+    children = defaultdict(set)
+    for pred in (RDFS.subClassOf, RDFS.subPropertyOf):
+        for child, parent in g.subject_objects(pred):
+            if isinstance(child, URIRef) and isinstance(parent, URIRef) and child != parent:
+                children[str(parent)].add(str(child))
+    return children
+
+def closure_index(g):
+    """ClosureIndex for a graph, built once per graph per process"""
+    index = _INDEXES.get(id(g))
+    if index is None:
+        index = ClosureIndex(hierarchy_children(g))
+        _INDEXES[id(g)] = index
+    return index
+
+def resolve_term(g, value):
+    """Resolve an IRI, local name or label to the matching IRIs in g"""
+    if '://' in value:
+        return {value}
+    matches = set()
+    for s in set(g.subjects()):
+        if isinstance(s, URIRef) and str(s).rsplit('#', 1)[-1].rsplit('/', 1)[-1] == value:
+            matches.add(str(s))
+    for pred in (RDFS.label, SKOS.prefLabel):
+        for s, label in g.subject_objects(pred):
+            if isinstance(s, URIRef) and str(label) == value:
+                matches.add(str(s))
+    return matches
+
+def root_neighbourhood(index, roots, depth=None, ancestors=False, descendants=False):
+    """Roots plus their ancestors and/or descendants, optionally depth-limited"""
+    if not ancestors and not descendants:
+        ancestors = descendants = True
+    selected = set(roots)
+    for root in roots:
+        if descendants:
+            selected |= index.descendants(root, depth)
+        if ancestors:
+            selected |= index.ancestors(root, depth)
+    return selected
+
+def layer_members(g, layer):
+    """Classes annotated with connect:belongsToLayer <layer>"""
+    layers = {URIRef(iri) for iri in resolve_term(g, layer)}
+    return {str(s) for s, o in g.subject_objects(BELONGS_TO_LAYER) if o in layers}
+
+def tagged_members(g, concept, vocab_files):
+    """Classes tagged with the concept or any concept narrower than it"""
+    vg = load_graph(vocab_files) if vocab_files else g
+    concepts = resolve_term(vg, concept) | resolve_term(g, concept)
+    narrower = defaultdict(set)
+    for child, parent in vg.subject_objects(SKOS.broader):
+        narrower[str(parent)].add(str(child))
+    for parent, child in vg.subject_objects(SKOS.narrower):
+        narrower[str(parent)].add(str(child))
+    concept_index = ClosureIndex(narrower)
+    for c in list(concepts):
+        concepts |= concept_index.descendants(c)
+    members = set()
+    for graph in (g, vg):
+        for s, o in graph.subject_objects(SKOS_TAG):
+            if str(o) in concepts:
+                members.add(str(s))
+    return members
+
+def select_entities(g, args):
+    """Return the set of selected IRIs (as strings), or None when no selector is given"""
+    if not has_selectors(args):
+        return None
+    selections = []
+    if args.root:
+        index = closure_index(g)
+        roots = set()
+        for root in args.root:
+            roots |= resolve_term(g, root)
+        selections.append(root_neighbourhood(index, roots, args.depth, args.ancestors, args.descendants))
+    if args.layer:
+        selections.append(layer_members(g, args.layer))
+    if args.skos_tag:
+        vocab = args.vocab or sorted(glob.glob(os.path.join(REPO_ROOT, 'vocab', '*.ttl')))
+        selections.append(tagged_members(g, args.skos_tag, vocab))
+    return set.intersection(*selections)
+
+def selected(selection, *iris):
+    """True if there is no selection or any of the given IRIs is selected"""
+    return selection is None or any(str(iri) in selection for iri in iris if iri)
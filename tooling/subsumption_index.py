@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Persisted subsumption index over asserted and ELK-inferred class edges
+
+`build` collects named-class rdfs:subClassOf edges from the ontology and,
+when present, from `classified-elk.owl` (the output of the `reason`
+target). owl:equivalentClass between named classes counts as an edge
+in both directions. It stores the `ClosureIndex` bitsets next to the
+ontology as `<ontology>.subsumption.json`. Loading the file restores the
+ancestor and descendant bitsets without parsing OWL or running a reasoner,
+so:
+  is_subclass(sub, sup)   one bit test
+  ancestors(cls)          bitset expansion (no graph walk)
+  descendants(cls)        bitset expansion (no graph walk)
+
+The file records the SHA-256 of its sources. `load_index` ignores (and
+warns about) an index whose sources changed since it was built, so callers
+fall back to the asserted hierarchy instead of an outdated one. The index is
+a build artifact of the `reason`/`qa` targets and is not committed. `materialize_types` adds the
+entailed rdf:type triples to a graph, so SPARQL checks such as
+`?m a odim:Measurement` also match individuals typed with a subclass.
+
+Usage:
+  python3 subsumption_index.py build mhm_ontology.owl [--inferred classified-elk.owl] [--output FILE]
+  python3 subsumption_index.py is-a SUB SUP [--index mhm_ontology.subsumption.json]
+  python3 subsumption_index.py ancestors|descendants CLASS [--index ...]
+
+CLASS arguments accept a full IRI or a local name.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from rdflib import OWL, RDF, RDFS, URIRef
+
+from graph_cache import file_digest, load_graph
+from hierarchy import ClosureIndex
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.subsumption.json'
+DEFAULT_INFERRED = 'classified-elk.owl'
+
+def index_path(ontology):
+    """Where the index for an ontology file lives"""
+    return os.path.splitext(ontology)[0] + INDEX_SUFFIX
+
+def subclass_edges(g, children=None):
+    """Add named-class subsumption edges from g to a parent -> {children} map"""
+    children = {} if children is None else children
+    for child, parent in g.subject_objects(RDFS.subClassOf):
+        if isinstance(child, URIRef) and isinstance(parent, URIRef) and child != parent and parent != OWL.Thing:
+            children.setdefault(str(parent), set()).add(str(child))
+    for a, b in g.subject_objects(OWL.equivalentClass):
+        if isinstance(a, URIRef) and isinstance(b, URIRef) and a != b:
+            children.setdefault(str(a), set()).add(str(b))
+            children.setdefault(str(b), set()).add(str(a))
+    return children
+
+class SubsumptionIndex:
+    """Constant-time is-a lookups backed by a persisted ClosureIndex"""
+
+    def __init__(self, closure, sources=None, base='.'):
+        self.closure = closure
+        self.sources = sources or {}  # path (relative to base) -> sha256
+        self.base = base
+        self._by_local = None
+
+    @classmethod
+    def build(cls, ontology, inferred=None):
+        children = subclass_edges(load_graph(ontology))
+        sources = {ontology: file_digest(ontology)}
+        if inferred and os.path.exists(inferred):
+            subclass_edges(load_graph(inferred), children)
+            sources[inferred] = file_digest(inferred)
+        return cls(ClosureIndex(children), sources)
+
+    def save(self, path):
+        base = os.path.dirname(os.path.abspath(path))
+        sources = {os.path.relpath(os.path.join(self.base, p), base): d for p, d in self.sources.items()}
+        data = {'version': INDEX_VERSION, 'sources': sources}
+        data.update(self.closure.to_dict())
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"{path}: unsupported index version {data.get('version')}")
+        return cls(ClosureIndex.from_dict(data), data.get('sources'), os.path.dirname(os.path.abspath(path)))
+
+    def stale_sources(self):
+        """Sources whose content changed (or vanished) since the index was built"""
+        stale = []
+        for path, digest in self.sources.items():
+            full = os.path.join(self.base, path)
+            if not os.path.exists(full) or file_digest(full) != digest:
+                stale.append(path)
+        return stale
+
+    def resolve(self, term):
+        """Map a local name to its IRI; IRIs are returned unchanged"""
+        if '://' in term or term in self.closure:
+            return term
+        if self._by_local is None:
+            self._by_local = {}
+            for node in self.closure.nodes:
+                local = node.rsplit('#', 1)[-1].rsplit('/', 1)[-1]
+                self._by_local.setdefault(local, node)
+        return self._by_local.get(term, term)
+
+    def is_subclass(self, sub, sup):
+        """True if sub is sup or is subsumed by it (asserted or inferred)"""
+        sub, sup = str(sub), str(sup)
+        return sub == sup or self.closure.is_descendant(sub, sup)
+
+    def ancestors(self, cls):
+        return self.closure.ancestors(str(cls))
+
+    def descendants(self, cls):
+        return self.closure.descendants(str(cls))
+
+    def is_instance(self, types, cls):
+        """True if any of the asserted types is cls or one of its subclasses"""
+        return any(self.is_subclass(t, cls) for t in types)
+
+def load_index(ontology_or_index, warn=True):
+    """Load the index for an ontology (or an index file directly), or None if missing or stale"""
+    path = ontology_or_index if ontology_or_index.endswith(INDEX_SUFFIX) else index_path(ontology_or_index)
+    if not os.path.exists(path):
+        return None
+    index = SubsumptionIndex.load(path)
+    stale = index.stale_sources()
+    if stale:
+        if warn:
+            print(f"Warning: ignoring {path}, it is older than {', '.join(stale)}; "
+                  f"rebuild with subsumption_index.py build", file=sys.stderr)
+        return None
+    return index
+
+def materialize_types(g, index):
+    """Add rdf:type triples entailed by the index to g; returns the number added"""
+    added = 0
+    for individual, cls in list(g.subject_objects(RDF.type)):
+        for ancestor in index.ancestors(cls):
+            triple = (individual, RDF.type, URIRef(ancestor))
+            if triple not in g:
+                g.add(triple)
+                added += 1
+    return added
+
+def parse_args():
+    ap = argparse.ArgumentParser(description='Build or query the persisted subsumption index')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    b = sub.add_parser('build', help='Build the index for an ontology')
+    b.add_argument('ontology')
+    b.add_argument('--inferred', default=DEFAULT_INFERRED,
+                   help=f'Classified ontology with inferred edges (default: {DEFAULT_INFERRED}, if present)')
+    b.add_argument('--output', help='Index file (default: <ontology>.subsumption.json)')
+    for name, nargs in (('is-a', 2), ('ancestors', 1), ('descendants', 1)):
+        q = sub.add_parser(name)
+        q.add_argument('terms', nargs=nargs)
+        q.add_argument('--index', default=index_path('mhm_ontology.owl'), help='Index file')
+    return ap.parse_args()
+
+def main():
+    args = parse_args()
+    if args.cmd == 'build':
+        index = SubsumptionIndex.build(args.ontology, args.inferred)
+        output = args.output or index_path(args.ontology)
+        index.save(output)
+        edges = sum(len(p) for p in index.closure.parents.values())
+        print(f"Wrote {output}: {len(index.closure.nodes)} classes, {edges} direct edges "
+              f"(sources: {', '.join(index.sources)})")
+        return
+
+    index = load_index(args.index)
+    if index is None:
+        print(f"No up-to-date index at {args.index}; run: python3 subsumption_index.py build mhm_ontology.owl", file=sys.stderr)
+        sys.exit(1)
+    terms = [index.resolve(t) for t in args.terms]
+    if args.cmd == 'is-a':
+        result = index.is_subclass(*terms)
+        print('true' if result else 'false')
+        sys.exit(0 if result else 1)
+    found = index.ancestors(terms[0]) if args.cmd == 'ancestors' else index.descendants(terms[0])
+    for iri in sorted(found):
+        print(iri)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Seeded generator of synthetic ontologies shaped like mhm_ontology.owl + examples.ttl
+
+Produces three files for a target triple count:
+  synthetic.owl           RDF/XML TBox: a Measurement subclass DAG under the
+                          physiological/behavioral/environmental branches,
+                          rdfs:label@en, connect:belongsToLayer annotations,
+                          object/data properties with domains and ranges
+  synthetic-vocab.ttl     SKOS scheme with a broader tree, prefLabel@en,
+                          inScheme/topConcept, and connect:skosTag on classes
+  synthetic-examples.ttl  ABox: measurements with QUDT quantity values,
+                          observedProperty, featureOfInterest, resultTime,
+                          and PROV chains (sensing activity, device, dataset)
+
+The same seed and size always produce byte-identical files. Files are
+written as text directly, so generating 1M triples does not need RDFLib.
+
+Usage:
+  python3 synthetic_ontology.py OUTPUT_DIR --triples 100k [--seed 42]
+"""
+
+import argparse
+import os
+import random
+
+CONNECT = "http://connectdigitalstudy.com/ontology#"
+QUDT = "http://qudt.org/schema/qudt/"
+UNIT = "http://qudt.org/vocab/unit/"
+SOSA = "http://www.w3.org/ns/sosa/"
+
+BRANCHES = ['PhysiologicalMeasurement', 'BehavioralMeasurement', 'EnvironmentalMeasurement']
+LAYERS = ['MeasurementLayer', 'FeatureLayer', 'DerivedFeatureLayer', 'ContextualLayer', 'ComputationalLayer']
+UNITS = ['BPM', 'MilliSecond', 'Minute', 'Hour', 'DEG_C', 'LUX', 'PERCENT']
+
+# Rough triple cost per generated item, used to split the target size
+CLASS_TRIPLES = 5
+CONCEPT_TRIPLES = 5
+MEASUREMENT_TRIPLES = 12
+TBOX_SHARE = 0.08
+VOCAB_SHARE = 0.04
+
+def parse_size(value):
+    """'1k' -> 1000, '1m' -> 1000000, '2500' -> 2500"""
+    value = value.strip().lower()
+    for suffix, factor in (('k', 1000), ('m', 1000000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+def write_tbox(path, n_classes, rng):
+    """Write the RDF/XML TBox; returns (class IRIs, triple count)"""
+    triples = 0
+    classes = []
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0"?>\n')
+        f.write('<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"\n'
+                '         xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#"\n'
+                '         xmlns:owl="http://www.w3.org/2002/07/owl#"\n'
+                f'         xmlns:connect="{CONNECT}">\n')
+        f.write('  <owl:Ontology rdf:about="http://connectdigitalstudy.com/ontology/synthetic"/>\n')
+        f.write(f'  <owl:AnnotationProperty rdf:about="{CONNECT}belongsToLayer"/>\n')
+        f.write(f'  <owl:AnnotationProperty rdf:about="{CONNECT}skosTag"/>\n')
+        triples += 3
+
+        def declare(name, parents, layer):
+            nonlocal triples
+            f.write(f'  <owl:Class rdf:about="{CONNECT}{name}">\n')
+            f.write(f'    <rdfs:label xml:lang="en">{name}</rdfs:label>\n')
+            for parent in parents:
+                f.write(f'    <rdfs:subClassOf rdf:resource="{parent}"/>\n')
+            if layer:
+                f.write(f'    <connect:belongsToLayer rdf:resource="{CONNECT}{layer}"/>\n')
+            f.write('  </owl:Class>\n')
+            triples += 2 + len(parents) + (1 if layer else 0)
+
+        declare('OntologyLayer', [], None)
+        for layer in LAYERS:
+            declare(layer, [CONNECT + 'OntologyLayer'], None)
+        declare('Measurement', [SOSA + 'Observation'], 'MeasurementLayer')
+        declare('Participant', [], 'ContextualLayer')
+        declare('Device', [], 'ContextualLayer')
+        declare('SensingActivity', [], 'ComputationalLayer')
+        declare('DataSet', [], 'DerivedFeatureLayer')
+        declare('ObservableProperty', [], 'MeasurementLayer')
+        for branch in BRANCHES:
+            declare(branch, [CONNECT + 'Measurement'], 'MeasurementLayer')
+            classes.append(CONNECT + branch)
+
+        # Subclass DAG: each new class picks one parent, sometimes a second one
+        for i in range(max(0, n_classes - len(classes))):
+            parents = {rng.choice(classes)}
+            if rng.random() < 0.15:
+                parents.add(rng.choice(classes))
+            name = f"SynMeasurement{i}"
+            declare(name, sorted(parents), rng.choice(LAYERS))
+            classes.append(CONNECT + name)
+
+        for name, domain, rng_cls in (('observedProperty', 'Measurement', 'ObservableProperty'),
+                                      ('featureOfInterest', 'Measurement', 'Participant'),
+                                      ('wasGeneratedBy', 'Measurement', 'SensingActivity'),
+                                      ('usedDevice', 'SensingActivity', 'Device'),
+                                      ('hasMeasurement', 'DataSet', 'Measurement')):
+            f.write(f'  <owl:ObjectProperty rdf:about="{CONNECT}{name}">\n'
+                    f'    <rdfs:label xml:lang="en">{name}</rdfs:label>\n'
+                    f'    <rdfs:domain rdf:resource="{CONNECT}{domain}"/>\n'
+                    f'    <rdfs:range rdf:resource="{CONNECT}{rng_cls}"/>\n'
+                    '  </owl:ObjectProperty>\n')
+            triples += 4
+        f.write(f'  <owl:DatatypeProperty rdf:about="{CONNECT}resultTime">\n'
+                '    <rdfs:label xml:lang="en">resultTime</rdfs:label>\n'
+                f'    <rdfs:domain rdf:resource="{CONNECT}Measurement"/>\n'
+                '    <rdfs:range rdf:resource="http://www.w3.org/2001/XMLSchema#dateTime"/>\n'
+                '  </owl:DatatypeProperty>\n')
+        triples += 4
+        f.write('</rdf:RDF>\n')
+    return classes, triples
+
+def write_vocab(path, n_concepts, classes, rng):
+    """Write the SKOS vocabulary and class tags; returns triple count"""
+    triples = 0
+    with open(path, 'w') as f:
+        f.write(f'@prefix connect: <{CONNECT}> .\n'
+                '@prefix skos: <http://www.w3.org/2004/02/skos/core#> .\n\n')
+        f.write('connect:SynScheme a skos:ConceptScheme ;\n  skos:prefLabel "Synthetic categories"@en ;\n'
+                '  skos:hasTopConcept connect:SynConcept0 .\n\n')
+        triples += 3
+        for i in range(max(1, n_concepts)):
+            f.write(f'connect:SynConcept{i} a skos:Concept ;\n'
+                    f'  skos:prefLabel "Concept {i}"@en ;\n'
+                    '  skos:inScheme connect:SynScheme')
+            triples += 3
+            if i:
+                f.write(f' ;\n  skos:broader connect:SynConcept{rng.randrange(i)}')
+                triples += 1
+            f.write(' .\n')
+        f.write('\n')
+        for cls in classes:
+            if rng.random() < 0.3:
+                f.write(f'<{cls}> connect:skosTag connect:SynConcept{rng.randrange(max(1, n_concepts))} .\n')
+                triples += 1
+    return triples
+
+def write_abox(path, n_measurements, classes, rng):
+    """Write measurements with QUDT values and PROV chains; returns triple count"""
+    triples = 0
+    n_participants = max(1, n_measurements // 50)
+    n_activities = max(1, n_measurements // 10)
+    with open(path, 'w') as f:
+        f.write(f'@prefix connect: <{CONNECT}> .\n@prefix qudt: <{QUDT}> .\n@prefix unit: <{UNIT}> .\n'
+                '@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n'
+                '@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n\n')
+        for i in range(n_participants):
+            f.write(f'connect:participant{i} a connect:Participant ; rdfs:label "Participant {i}" .\n')
+            triples += 2
+        for i in range(n_activities):
+            f.write(f'connect:activity{i} a connect:SensingActivity ; connect:usedDevice connect:device{i % 97} .\n')
+            triples += 2
+        for i in range(n_measurements):
+            cls = rng.choice(classes)
+            value = round(rng.uniform(0, 200), 2)
+            f.write(f'connect:measurement{i} a <{cls}> ;\n'
+                    f'  rdfs:label "Measurement {i}" ;\n'
+                    f'  connect:observedProperty connect:property{i % 31} ;\n'
+                    f'  connect:featureOfInterest connect:participant{rng.randrange(n_participants)} ;\n'
+                    f'  connect:resultTime "2025-03-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00"^^xsd:dateTime ;\n'
+                    f'  qudt:quantityValue [ a qudt:QuantityValue ; qudt:numericValue {value} ; '
+                    f'qudt:unit unit:{rng.choice(UNITS)} ] ;\n'
+                    f'  connect:wasGeneratedBy connect:activity{rng.randrange(n_activities)} ;\n'
+                    '  connect:belongsToLayer connect:MeasurementLayer .\n')
+            triples += 11
+            if i % 100 == 0:
+                f.write(f'connect:dataset{i // 100} a connect:DataSet ; connect:hasMeasurement connect:measurement{i} .\n')
+                triples += 2
+    return triples
+
+def generate(output_dir, target_triples, seed=42):
+    """Write a synthetic ontology of about target_triples triples; returns file paths and counts"""
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    n_classes = max(20, int(target_triples * TBOX_SHARE / CLASS_TRIPLES))
+    n_concepts = max(5, int(target_triples * VOCAB_SHARE / CONCEPT_TRIPLES))
+    tbox = os.path.join(output_dir, 'synthetic.owl')
+    vocab = os.path.join(output_dir, 'synthetic-vocab.ttl')
+    abox = os.path.join(output_dir, 'synthetic-examples.ttl')
+    classes, tbox_triples = write_tbox(tbox, n_classes, rng)
+    vocab_triples = write_vocab(vocab, n_concepts, classes, rng)
+    remaining = max(0, target_triples - tbox_triples - vocab_triples)
+    abox_triples = write_abox(abox, max(1, remaining // MEASUREMENT_TRIPLES), classes, rng)
+    return {
+        'tbox': tbox, 'vocab': vocab, 'abox': abox,
+        'classes': len(classes), 'concepts': n_concepts,
+        'triples': tbox_triples + vocab_triples + abox_triples,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description='Generate a seeded synthetic ontology + ABox')
+    ap.add_argument('output_dir')
+    ap.add_argument('--triples', default='10k', help='Target size, e.g. 1k, 10k, 100k, 1m (default: 10k)')
+    ap.add_argument('--seed', type=int, default=42)
+    args = ap.parse_args()
+    info = generate(args.output_dir, parse_size(args.triples), args.seed)
+    print(f"Wrote {info['triples']} triples ({info['classes']} classes, {info['concepts']} concepts) to {args.output_dir}")
+
+if __name__ == '__main__':
+    main()
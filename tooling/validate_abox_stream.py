@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Streaming validator for measurement ABoxes shaped like examples.ttl
+
+Checks every individual typed with odim:Measurement (or any subclass of it
+in the ontology, taken from the persisted subsumption index when an
+up-to-date one sits next to the ontology) against the per-measurement rules:
+  quantity_value      qudt:quantityValue to a qudt:QuantityValue node with
+                      qudt:numericValue and qudt:unit
+  observed_property   odim:observedProperty
+  feature_of_interest odim:featureOfInterest
+  result_time         odim:resultTime
+
+Unlike the ASK queries in queries/units_* and queries/sosa_*, the data is
+never loaded as one graph. N-Triples is read line by line and Turtle is
+split into statement chunks (`--chunk` statements at a time, each parsed
+with RDFLib on its own). Each subject is checked as soon as its triples
+are complete, so memory stays bounded by the chunk size, measurements
+still waiting for their quantity-value node, and one small flags entry per
+described quantity-value node (kept because several measurements may share
+a node). Subjects are checked in file order, so results do not depend on
+hash ordering. Every offending subject is reported, one row per broken rule.
+
+Triples of one subject must be contiguous: Turtle subject blocks are, and
+N-Triples can be brought into that shape with `LC_ALL=C sort`. Sorting
+moves blank-node descriptions away from their measurements, so the pending
+map then holds one small entry per measurement (`peak_pending` in the JSON
+summary) - still far less than a parsed graph.
+
+Usage:
+  python3 validate_abox_stream.py DATA.ttl|DATA.nt [...] [--ontology mhm_ontology.owl]
+      [--output build/abox-violations.tsv] [--json build/abox-violations.json]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+from rdflib import BNode, Graph, Literal, RDF, RDFS, URIRef
+
+from graph_cache import load_graph
+from hierarchy import ClosureIndex
+from profiling import add_profile_arg, configure, phase
+from subsumption_index import load_index
+
+ODIM = "http://connectdigitalstudy.com/ontology#"
+QUDT = "http://qudt.org/schema/qudt/"
+MEASUREMENT = ODIM + "Measurement"
+RDF_TYPE = str(RDF.type)
+QUANTITY_VALUE = QUDT + "quantityValue"
+QV_CLASS = QUDT + "QuantityValue"
+NUMERIC_VALUE = QUDT + "numericValue"
+UNIT = QUDT + "unit"
+
+# Quantity-value node flags
+QV_TYPED, QV_NUMERIC, QV_UNIT = 1, 2, 4
+QV_COMPLETE = QV_TYPED | QV_NUMERIC | QV_UNIT
+QV_PREDICATES = {NUMERIC_VALUE: QV_NUMERIC, UNIT: QV_UNIT}
+
+DIRECT_RULES = [
+    ('observed_property', ODIM + "observedProperty"),
+    ('feature_of_interest', ODIM + "featureOfInterest"),
+    ('result_time', ODIM + "resultTime"),
+]
+RULES = ['quantity_value'] + [rule for rule, _ in DIRECT_RULES]
+
+LITERAL = '"'  # every literal object is represented by this marker
+BNODE_IRI = 'urn:x-bnode:'  # Turtle `_:label` rewritten so labels survive chunking
+DEFAULT_CHUNK = 10000
+
+def measurement_classes(ontology_files, root=MEASUREMENT):
+    """IRIs of the root measurement class and all its subclasses"""
+    index = load_index(ontology_files[0]) if len(ontology_files) == 1 else None
+    if index is not None:
+        return {root} | index.descendants(root)  # includes ELK-inferred subclasses
+    g = load_graph(ontology_files)
+    children = {}
+    for child, parent in g.subject_objects(RDFS.subClassOf):
+        if isinstance(child, URIRef) and isinstance(parent, URIRef):
+            children.setdefault(str(parent), set()).add(str(child))
+    return {root} | ClosureIndex(children).descendants(root)
+
+def _better(a, b):
+    """The quantity-value flags that satisfy more of the rule"""
+    if a is None:
+        return b
+    return b if bin(b).count('1') > bin(a).count('1') else a
+
+def qv_detail(flags):
+    """Human-readable description of what a quantity-value node lacks"""
+    missing = [text for bit, text in ((QV_TYPED, 'a qudt:QuantityValue'),
+                                      (QV_NUMERIC, 'qudt:numericValue'),
+                                      (QV_UNIT, 'qudt:unit')) if not flags & bit]
+    return 'quantityValue node lacks ' + ', '.join(missing)
+
+# --- N-Triples -------------------------------------------------------------
+
+def _nt_term(token):
+    if token.startswith('<'):
+        return token[1:-1]
+    if token.startswith('_:'):
+        return token
+    return LITERAL
+
+def nt_triples(path):
+    """(subject, predicate, object) per N-Triples line; literals become LITERAL"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            subject, predicate, rest = line.split(None, 2)
+            obj = rest.rstrip()
+            if obj.endswith('.'):
+                obj = obj[:-1].rstrip()
+            yield _nt_term(subject), predicate[1:-1], _nt_term(obj)
+
+# --- Turtle ----------------------------------------------------------------
+
+DIRECTIVE = re.compile(r'^\s*(@prefix|@base|PREFIX|BASE)\b', re.I)
+BNODE_LABEL = re.compile(r'_:([A-Za-z0-9_][A-Za-z0-9_.-]*[A-Za-z0-9_-]|[A-Za-z0-9_])')
+
+class _StatementSplitter:
+    """Split Turtle text into directives and top-level statements"""
+
+    def __init__(self):
+        self.buffer = []
+        self.depth = 0
+        self.long_quote = None  # '\"\"\"' or "'''" while inside a long string
+
+    def feed(self, line):
+        """Consume one line; returns a list of complete statements"""
+        if not self.buffer and self.long_quote is None and self.depth == 0 and DIRECTIVE.match(line):
+            return [('directive', line.strip())]
+        out, i, n, start = [], 0, len(line), 0
+        text = []
+        while i < n:
+            c = line[i]
+            if self.long_quote:
+                end = line.find(self.long_quote, i)
+                while end > 0 and line[end - 1] == '\\':
+                    end = line.find(self.long_quote, end + 1)
+                if end < 0:
+                    i = n
+                    break
+                i = end + 3
+                self.long_quote = None
+            elif c == '#':
+                text.append(line[start:i])
+                start = i = n
+            elif c == '<':
+                end = line.find('>', i)
+                i = n if end < 0 else end + 1
+            elif c in '"\'':
+                if line.startswith(c * 3, i):
+                    self.long_quote = c * 3
+                    i += 3
+                    continue
+                i += 1
+                while i < n and line[i] != c:
+                    i += 2 if line[i] == '\\' else 1
+                i += 1
+            elif c == '_' and line.startswith('_:', i):
+                m = BNODE_LABEL.match(line, i)
+                if m:
+                    text.append(line[start:i] + f'<{BNODE_IRI}{m.group(1)}>')
+                    start = i = m.end()
+                else:
+                    i += 1
+            elif c in '[(':
+                self.depth += 1
+                i += 1
+            elif c in '])':
+                self.depth -= 1
+                i += 1
+            elif c == '.' and self.depth == 0 and (i + 1 >= n or line[i + 1] in ' \t\r\n#'):
+                text.append(line[start:i + 1])
+                self.buffer.append(''.join(text))
+                out.append(('statement', ''.join(self.buffer)))
+                self.buffer, text = [], []
+                start = i = i + 1
+            else:
+                i += 1
+        text.append(line[start:])
+        rest = ''.join(text)
+        if rest.strip() or self.buffer:
+            self.buffer.append(rest)
+        return out
+
+def _turtle_term(term):
+    if isinstance(term, Literal):
+        return LITERAL
+    if isinstance(term, BNode):
+        return '_:' + str(term)
+    term = str(term)
+    return '_:' + term[len(BNODE_IRI):] if term.startswith(BNODE_IRI) else term
+
+class _OrderedSink(Graph):
+    """Graph that only records triples in the order the parser emits them (file order)"""
+
+    def __init__(self):
+        super().__init__()
+        self.triples_in_order = {}
+
+    def add(self, triple):
+        self.triples_in_order[triple] = None
+        return self
+
+def _parse_chunk(header, statements):
+    """Parse a chunk of statements; anonymous `[...]` nodes never span chunks"""
+    g = _OrderedSink()
+    g.parse(data='\n'.join(header + statements), format='turtle')
+    for s, p, o in g.triples_in_order:
+        yield _turtle_term(s), str(p), _turtle_term(o)
+
+def turtle_triples(path, chunk=DEFAULT_CHUNK):
+    """Triples of a Turtle file, parsed `chunk` statements at a time, grouped by subject"""
+    splitter = _StatementSplitter()
+    header, statements = [], []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            for kind, text in splitter.feed(line):
+                if kind == 'directive':
+                    header.append(text)
+                    continue
+                statements.append(text)
+                if len(statements) >= chunk:
+                    yield from _grouped(_parse_chunk(header, statements))
+                    statements = []
+    if statements:
+        yield from _grouped(_parse_chunk(header, statements))
+
+def _grouped(triples):
+    """Group one chunk's triples by subject, subjects in order of first appearance"""
+    by_subject = {}
+    for s, p, o in triples:
+        by_subject.setdefault(s, []).append((s, p, o))
+    for rows in by_subject.values():
+        yield from rows
+
+def read_triples(path, chunk=DEFAULT_CHUNK):
+    """Stream triples from an N-Triples or Turtle file"""
+    if path.endswith('.nt'):
+        return nt_triples(path)
+    return turtle_triples(path, chunk)
+
+def subject_groups(triples):
+    """Yield (subject, [(predicate, object), ...]) for each contiguous run of a subject"""
+    current, rows = None, []
+    for s, p, o in triples:
+        if s != current:
+            if rows:
+                yield current, rows
+            current, rows = s, []
+        rows.append((p, o))
+    if rows:
+        yield current, rows
+
+# --- Validation ------------------------------------------------------------
+
+class StreamValidator:
+    """Check subject groups one at a time, keeping only unresolved references"""
+
+    def __init__(self, classes, report):
+        self.classes = classes
+        self.report = report  # callable(subject, rule, detail)
+        self.qv_flags = {}  # described quantity-value node -> flags
+        self.waiting = {}  # quantity-value node -> measurements referencing it
+        self.pending = {}  # measurement -> [unresolved node count, best flags, already failed]
+        self.measurements = 0
+        self.offenders = 0
+        self.issues = 0
+        self.peak_pending = 0
+
+    def _fail(self, subject, rule, detail):
+        self.issues += 1
+        self.report(subject, rule, detail)
+
+    def _finish_qv(self, measurement, flags, failed):
+        """Report a quantity-value failure; returns True if the subject has failed"""
+        if flags == QV_COMPLETE:
+            return failed
+        detail = qv_detail(flags) if flags is not None else 'quantityValue node is never described'
+        self._fail(measurement, 'quantity_value', detail)
+        if not failed:
+            self.offenders += 1
+        return True
+
+    def subject(self, subject, rows):
+        """Validate one subject's complete set of (predicate, object) pairs"""
+        flags, types, qv_nodes = 0, set(), []
+        present = set()
+        for p, o in rows:
+            if p == RDF_TYPE:
+                types.add(o)
+                if o == QV_CLASS:
+                    flags |= QV_TYPED
+            elif p == QUANTITY_VALUE:
+                qv_nodes.append(o)
+            else:
+                flags |= QV_PREDICATES.get(p, 0)
+                present.add(p)
+
+        if flags:
+            self._describe_qv(subject, flags)
+        if types & self.classes:
+            self._measurement(subject, present, qv_nodes)
+
+    def _describe_qv(self, node, flags):
+        # Kept after use: a quantity-value node may be shared by several measurements
+        self.qv_flags[node] = self.qv_flags.get(node, 0) | flags
+        waiting = self.waiting.pop(node, None)
+        if waiting is None:
+            return
+        for measurement in waiting:
+            state = self.pending.get(measurement)
+            if state is None:
+                continue  # already satisfied through another node
+            state[0] -= 1
+            state[1] = _better(state[1], flags)
+            if flags == QV_COMPLETE:
+                del self.pending[measurement]
+            elif state[0] == 0:
+                del self.pending[measurement]
+                self._finish_qv(measurement, state[1], state[2])
+
+    def _measurement(self, subject, present, qv_nodes):
+        self.measurements += 1
+        failed = False
+        for rule, predicate in DIRECT_RULES:
+            if predicate not in present:
+                self._fail(subject, rule, f"missing {predicate.replace(ODIM, 'odim:')}")
+                failed = True
+        if failed:
+            self.offenders += 1
+        if not qv_nodes:
+            self._fail(subject, 'quantity_value', 'missing qudt:quantityValue')
+            self.offenders += not failed
+            return
+        best, unresolved = None, []
+        for node in qv_nodes:
+            flags = 0 if node == LITERAL else self.qv_flags.get(node)
+            if flags is None:
+                unresolved.append(node)
+            elif flags == QV_COMPLETE:
+                return
+            else:
+                best = _better(best, flags)
+        if not unresolved:
+            self._finish_qv(subject, best, failed)
+            return
+        self.pending[subject] = [len(unresolved), best, failed]
+        for node in unresolved:
+            self.waiting.setdefault(node, []).append(subject)
+        self.peak_pending = max(self.peak_pending, len(self.pending))
+
+    def finish(self):
+        """Report measurements whose quantity-value nodes never appeared"""
+        for measurement, (_, best, failed) in sorted(self.pending.items()):
+            self._finish_qv(measurement, best, failed)
+        self.pending.clear()
+        self.waiting.clear()
+
+def validate(paths, classes, report, chunk=DEFAULT_CHUNK):
+    """Stream every file through one validator; returns the validator"""
+    validator = StreamValidator(classes, report)
+    for path in paths:
+        for subject, rows in subject_groups(read_triples(path, chunk)):
+            validator.subject(subject, rows)
+    validator.finish()
+    return validator
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Stream-validate measurement individuals in N-Triples/Turtle data')
+    parser.add_argument('data', nargs='+', help='N-Triples (.nt) or Turtle files')
+    parser.add_argument('--ontology', action='append', help='Ontology defining the measurement classes (default: mhm_ontology.owl)')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK, help=f'Turtle statements per parse (default: {DEFAULT_CHUNK})')
+    parser.add_argument('--output', help='Write all violations as TSV (Subject, Rule, Detail)')
+    parser.add_argument('--json', help='Write a JSON summary')
+    parser.add_argument('--max-print', type=int, default=50, help='Violations to print (default: 50)')
+    add_profile_arg(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    configure(args.profile)
+    ontology = args.ontology or ['mhm_ontology.owl']
+    with phase('measurement classes', 'load'):
+        classes = measurement_classes(ontology)
+
+    out = open(args.output, 'w') if args.output else None
+    if out:
+        out.write('Subject\tRule\tDetail\n')
+    printed = [0]
+    per_rule = dict.fromkeys(RULES, 0)
+
+    def report(subject, rule, detail):
+        per_rule[rule] += 1
+        if out:
+            out.write(f"{subject}\t{rule}\t{detail}\n")
+        if printed[0] < args.max_print:
+            print(f"[FAIL] {subject}: {rule} ({detail})")
+            printed[0] += 1
+
+    started = time.perf_counter()
+    try:
+        with phase('stream validate', 'query'):
+            validator = validate(args.data, classes, report, args.chunk)
+    finally:
+        if out:
+            out.close()
+    seconds = time.perf_counter() - started
+
+    if validator.issues > printed[0]:
+        print(f"... {validator.issues - printed[0]} more" + (f" in {args.output}" if args.output else ''))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'data': args.data,
+                'measurements': validator.measurements,
+                'offending_subjects': validator.offenders,
+                'issues': validator.issues,
+                'issues_per_rule': per_rule,
+                'peak_pending': validator.peak_pending,
+                'seconds': round(seconds, 3),
+                'violations': args.output,
+            }, f, indent=2)
+    print(f"[validate-abox] {validator.measurements} measurements, "
+          f"{validator.offenders} offending subjects ({validator.issues} issues) in {seconds:.2f}s")
+    if validator.issues:
+        sys.exit(2)
+
+if __name__ == '__main__':
+    main()
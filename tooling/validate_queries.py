@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Run the SPARQL checks in queries/<prefix>_*.rq against one loaded graph
+
+The data file(s) are parsed once (through the snapshot cache in
+`graph_cache.py`) and every matching query runs against that graph, in
+parallel worker processes when `--jobs` is greater than one. A check passes
+when an ASK query answers true or a SELECT query returns no rows (SELECT
+checks list violations).
+
+Results are printed in the same `[OK]`/`[FAIL]` form as the former shell
+loop and can also be written as JSON and JUnit XML with per-query timings.
+Exits 2 if any check fails or errors.
+
+With `MHM_SPARQL_ENDPOINT` set (see `sparql_endpoint.py`), the data is not
+loaded here; the queries are sent to the endpoint from a thread pool.
+
+Usage:
+  python3 validate_queries.py --data build/units-merged.owl --prefix units \\
+      [--jobs N] [--json build/validate-units.json] [--junit build/validate-units.xml]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from graph_cache import load_graph
+from sparql_session import endpoint_for, get_session, normalize_sources
+from subsumption_index import load_index, materialize_types
+from profiling import add_profile_arg, configure, flush, phase
+
+MAX_REPORTED_ROWS = 20
+
+_GRAPH = None
+
+def _init_worker(sources, types_index=None):
+    """Load the graph once per worker; forked workers inherit the parent's copy"""
+    global _GRAPH
+    if _GRAPH is None:
+        _GRAPH = load_graph(sources)
+        index = load_index(types_index) if types_index else None
+        if index is not None:  # missing or stale: query the asserted types only
+            materialize_types(_GRAPH, index)
+
+def run_check(path):
+    """Evaluate one query file against the worker's graph and return a result dict"""
+    result = evaluate(_GRAPH, path)
+    flush()  # pool workers exit without running atexit hooks
+    return result
+
+def evaluate(g, path):
+    """Evaluate one query file against g and return a result dict"""
+    name = os.path.basename(path)
+    started = time.perf_counter()
+    result = {'name': name, 'path': path, 'type': None, 'passed': False, 'error': None, 'rows': []}
+    try:
+        with phase(name, 'query'), open(path) as f:
+            outcome = g.query(f.read())
+        result['type'] = outcome.type
+        if outcome.type == 'ASK':
+            result['passed'] = bool(outcome.askAnswer)
+        elif outcome.type == 'SELECT':
+            names = [str(v) for v in outcome.vars]
+            rows = [{n: ('' if v is None else str(v)) for n, v in zip(names, row)} for row in outcome]
+            result['passed'] = not rows
+            result['rows'] = rows[:MAX_REPORTED_ROWS]
+            result['row_count'] = len(rows)
+        else:
+            result['error'] = f"unsupported query type {outcome.type}"
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - started, 6)
+    return result
+
+def find_queries(queries_dir, prefix):
+    """Sorted query files matching <prefix>_*.rq"""
+    return sorted(glob.glob(os.path.join(queries_dir, f"{prefix}_*.rq")))
+
+def run_checks(sources, paths, jobs=1, types_index=None):
+    """Load the graph once and run all checks; returns (results, load_seconds)"""
+    if endpoint_for(normalize_sources(sources)) and not types_index:
+        # the endpoint holds the graph; queries are requests, so threads suffice
+        session = get_session(sources)
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+            return list(pool.map(lambda path: evaluate(session, path), paths)), 0.0
+    started = time.perf_counter()
+    _init_worker(sources, types_index)
+    load_seconds = time.perf_counter() - started
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(sources, types_index)) as pool:
+            results = list(pool.map(run_check, paths))
+    else:
+        results = [run_check(p) for p in paths]
+    return results, load_seconds
+
+def summarize(suite, sources, results, load_seconds, total_seconds):
+    """Machine-readable summary of a validation run"""
+    return {
+        'suite': suite,
+        'data': list(sources),
+        'tests': len(results),
+        'failures': sum(1 for r in results if not r['passed'] and not r['error']),
+        'errors': sum(1 for r in results if r['error']),
+        'load_seconds': round(load_seconds, 6),
+        'seconds': round(total_seconds, 6),
+        'results': results,
+    }
+
+def write_json(summary, output_file):
+    with open(output_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+        f.write('\n')
+
+def write_junit(summary, output_file):
+    suite = ET.Element('testsuite', {
+        'name': summary['suite'],
+        'tests': str(summary['tests']),
+        'failures': str(summary['failures']),
+        'errors': str(summary['errors']),
+        'time': f"{summary['seconds']:.6f}",
+    })
+    for r in summary['results']:
+        case = ET.SubElement(suite, 'testcase', {
+            'classname': summary['suite'],
+            'name': r['name'],
+            'time': f"{r['seconds']:.6f}",
+        })
+        if r['error']:
+            ET.SubElement(case, 'error', {'message': r['error']})
+        elif not r['passed']:
+            if r['type'] == 'ASK':
+                message = 'ASK returned false'
+            else:
+                message = f"{r.get('row_count', 0)} violating row(s)"
+            failure = ET.SubElement(case, 'failure', {'message': message})
+            if r['rows']:
+                failure.text = json.dumps(r['rows'], indent=2)
+    ET.ElementTree(suite).write(output_file, encoding='utf-8', xml_declaration=True)
+
+def print_results(results):
+    for r in results:
+        print(f"[check] {r['path']}")
+        if r['passed']:
+            print(f"[OK]   {r['path']} ({r['seconds'] * 1000:.1f} ms)")
+        else:
+            print(f"[FAIL] {r['path']}")
+            if r['error']:
+                print(f"  {r['error']}")
+            elif r['type'] == 'SELECT':
+                print(f"  {r.get('row_count', 0)} violating row(s)")
+                for row in r['rows']:
+                    print(f"  {row}")
+            else:
+                print("  Ask => No")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run SPARQL validation queries against one loaded graph')
+    parser.add_argument('--data', action='append', required=True, help='Data file (repeatable; files are merged)')
+    parser.add_argument('--prefix', required=True, help='Run queries/<prefix>_*.rq')
+    parser.add_argument('--queries-dir', default='queries', help='Directory with .rq files (default: queries)')
+    parser.add_argument('--name', help='Suite name for reports (default: validate-<prefix>)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Worker processes (default: CPU count)')
+    parser.add_argument('--json', help='Write JSON results to this file')
+    parser.add_argument('--junit', help='Write JUnit XML results to this file')
+    parser.add_argument('--types-index', help='Subsumption index; adds entailed rdf:type triples before querying')
+    add_profile_arg(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    configure(args.profile)
+    suite = args.name or f"validate-{args.prefix}"
+    paths = find_queries(args.queries_dir, args.prefix)
+    if not paths:
+        print(f"[{suite}] no queries match {args.queries_dir}/{args.prefix}_*.rq", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    results, load_seconds = run_checks(args.data, paths, args.jobs, args.types_index)
+    summary = summarize(suite, args.data, results, load_seconds, time.perf_counter() - started)
+
+    print_results(results)
+    if args.json:
+        write_json(summary, args.json)
+    if args.junit:
+        write_junit(summary, args.junit)
+
+    failed = summary['failures'] + summary['errors']
+    if failed:
+        print(f"[{suite}] {failed} failure(s)")
+        sys.exit(2)
+    print(f"[{suite}] all checks passed ({len(results)} queries, {summary['seconds']:.2f}s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Watch the ontology sources and re-run only the checks an edit touches
+
+Every watched file (`mhm_ontology.owl`, `examples.ttl`, `vocab/*.ttl`,
+`alignments/mhm-prov-align.owl`) is parsed once and kept in memory, as are
+the merged graphs of the validation suites (the same inputs as the
+`validate-*` targets, plus their catalog-resolved local imports). The files
+are polled for changes; a changed file is re-parsed on its own and the
+difference against its previous graph is applied to the merged graphs as
+added and removed triples. A triple stays in a merged graph while another
+of its files still asserts it.
+
+After each change only the affected work runs:
+  - validate-* suites whose inputs include the file (queries in-process,
+    plus the broader-cycle check for validate-skos);
+  - the native QA rules (`qa_report.py`) when the core ontology changed,
+    re-checking only entities whose axioms changed;
+  - owl2dot views of the core ontology whose content categories were
+    touched (see `semantic_diff.py`), written to `build/watch/`.
+A file that fails to parse (half-saved) is reported and retried on the
+next change; its last good graph stays in place.
+
+Usage:
+  python3 watch.py [--interval 0.25] [--format svg] [--once]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+from rdflib import Graph
+from rdflib.util import guess_format
+
+import qa_report
+import skos_cycles
+import validate_queries
+from graph_cache import file_digest, load_graph, resolved_imports
+from owl2dot import VIEWS, TermTable, build_label_index, build_view, convert_all, save_dot
+from profiling import add_profile_arg, configure, phase
+from semantic_diff import diff_graphs
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE = os.path.join(REPO_ROOT, 'mhm_ontology.owl')
+ALIGNMENTS = os.path.join(REPO_ROOT, 'alignments', 'mhm-prov-align.owl')
+EXAMPLES = os.path.join(REPO_ROOT, 'examples.ttl')
+CATALOG = os.path.join(REPO_ROOT, 'catalog-v001.xml')
+VOCAB = sorted(glob.glob(os.path.join(REPO_ROOT, 'vocab', '*.ttl')))
+
+# suite -> (inputs, query prefix), as in run_ontology_tools.sh validate-*
+SUITES = {
+    'validate-prov': ([ALIGNMENTS, EXAMPLES], 'prov'),
+    'validate-units': ([CORE, EXAMPLES], 'units'),
+    'validate-sosa': ([CORE, EXAMPLES], 'sosa'),
+    'validate-skos': ([CORE] + VOCAB + [EXAMPLES], 'skos'),
+}
+# owl2dot view -> semantic_diff categories it renders
+VIEW_INPUTS = {
+    'classes': {'classes', 'subclass_edges', 'labels'},
+    'objproperties': {'object_properties', 'labels', 'other'},
+    'dataproperties': {'data_properties', 'labels', 'other'},
+    'layers': {'classes', 'layers', 'labels'},
+    'mappings': {'classes', 'subclass_edges', 'subproperty_edges', 'labels'},
+}
+
+def with_imports(inputs):
+    """Inputs plus the local files of their import closure (what robot merge would pull in)"""
+    paths = list(inputs)
+    for _, local in resolved_imports(inputs, CATALOG):
+        if local and os.path.abspath(local) not in paths:
+            paths.append(os.path.abspath(local))
+    return paths
+
+def signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def parse_file(path):
+    """Parse one file without the snapshot cache (every edit would write a new snapshot)"""
+    g = Graph()
+    with phase(f"parse {os.path.basename(path)}", 'parse'):
+        g.parse(path, format=guess_format(path) or 'turtle')
+    return g
+
+class Workspace:
+    """Parsed files, merged suite graphs and the state needed to report only changes"""
+
+    def __init__(self, output_dir, formats=()):
+        self.output_dir = output_dir
+        self.formats = [f for f in formats if f != 'dot']
+        self.suites = {name: (with_imports(inputs), prefix) for name, (inputs, prefix) in SUITES.items()}
+        self.paths = sorted({p for inputs, _ in self.suites.values() for p in inputs})
+        self.seen = {p: signature(p) for p in self.paths}
+        self.digests = {p: file_digest(p) for p in self.paths if self.seen[p]}
+        self.graphs = {p: load_graph(p) if self.seen[p] else Graph() for p in self.paths}
+        self.merged = {}
+        for inputs, _ in self.suites.values():
+            key = tuple(inputs)
+            if key not in self.merged:
+                merged = Graph()
+                with phase(f"merge {len(inputs)} files", 'build'):
+                    for path in inputs:
+                        for triple in self.graphs[path]:
+                            merged.add(triple)
+                self.merged[key] = merged
+        self.qa_cache = {}
+        self.qa_rows = None
+        self.failed = {}
+
+    def changed_files(self):
+        """Files whose content changed since the last poll"""
+        changed = []
+        for path in self.paths:
+            sig = signature(path)
+            if sig == self.seen[path]:
+                continue
+            self.seen[path] = sig
+            digest = file_digest(path) if sig else None
+            if digest != self.digests.get(path):
+                changed.append(path)
+        return changed
+
+    def apply(self, path):
+        """Re-parse path and apply its triple delta; returns the semantic diff or None"""
+        try:
+            new = parse_file(path) if os.path.exists(path) else Graph()
+        except Exception as e:
+            print(f"[watch] {self.relative(path)}: parse failed, keeping the last good graph ({e})")
+            return None
+        old = self.graphs[path]
+        self.digests[path] = file_digest(path) if os.path.exists(path) else None
+        with phase('diff', 'build'):
+            result = diff_graphs(old, new)
+            removed, added = set(old) - set(new), set(new) - set(old)
+        self.graphs[path] = new
+        with phase('apply delta', 'build'):
+            for key, merged in self.merged.items():
+                if path not in key:
+                    continue
+                others = [self.graphs[p] for p in key if p != path]
+                for triple in removed:
+                    if not any(triple in g for g in others):
+                        merged.remove(triple)
+                for triple in added:
+                    merged.add(triple)
+        t = result['triples']
+        print(f"[watch] {self.relative(path)}: +{t['added']} -{t['removed']} triples, "
+              f"{len(result['affected'])} affected entities")
+        return result
+
+    def relative(self, path):
+        return os.path.relpath(path, REPO_ROOT)
+
+    def validate(self, changed):
+        """Run the suites that read a changed file"""
+        for name, (inputs, prefix) in self.suites.items():
+            if not changed & set(inputs):
+                continue
+            g = self.merged[tuple(inputs)]
+            started = time.perf_counter()
+            results = [validate_queries.evaluate(g, path) for path in
+                       validate_queries.find_queries(os.path.join(REPO_ROOT, 'queries'), prefix)]
+            failed = [r for r in results if not r['passed']]
+            if prefix == 'skos':
+                cycles = skos_cycles.find_cycles(*skos_cycles.broader_edges(g))
+                for cycle in cycles:
+                    print(f"[FAIL] broader cycle: {' -> '.join(cycle['path'])}")
+                failed += cycles
+            validate_queries.print_results([r for r in results if not r['passed']])
+            status = f"{len(failed)} failure(s)" if failed else 'all checks passed'
+            print(f"[{name}] {status} ({len(results)} queries, {(time.perf_counter() - started) * 1000:.0f} ms)")
+            self.failed[name] = bool(failed)
+
+    def report(self):
+        """Native QA rules over the core ontology; prints rows that appeared or went away"""
+        started = time.perf_counter()
+        with phase('qa rules', 'query'):
+            self.qa_cache, checked = qa_report.run_report(self.graphs[CORE], self.qa_cache)
+        rows = {tuple(r) for entry in self.qa_cache.values() for r in entry['rows']}
+        if self.qa_rows is not None:
+            for change, delta in (('new', rows - self.qa_rows), ('fixed', self.qa_rows - rows)):
+                for row in qa_report.sort_rows(delta):
+                    print(f"[{change}] {row[0]} {row[1]} {row[2]} {row[4]}".rstrip())
+        self.qa_rows = rows
+        errors = sum(1 for r in rows if r[0] == 'ERROR')
+        print(f"[qa] {len(rows)} rows, {errors} ERROR; {checked}/{len(self.qa_cache)} entities re-checked "
+              f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+    def render(self, views):
+        """Rebuild the given owl2dot views of the core ontology in the output directory"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        g = self.graphs[CORE]
+        with phase('index labels', 'build'):
+            labels = build_label_index(g)
+        jobs = []
+        for view in views:
+            started = time.perf_counter()
+            with phase(f'build {view}', 'build'):
+                dot_content = build_view(view, g, labels, TermTable(), None, [self.graphs[ALIGNMENTS]])
+            dot_file = os.path.join(self.output_dir, f"{VIEWS[view]}.dot")
+            try:
+                with open(dot_file) as f:
+                    if f.read() == dot_content:
+                        continue  # same picture; no layout needed
+            except OSError:
+                pass
+            save_dot(dot_content, dot_file)
+            print(f"[view] {VIEWS[view]} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+            jobs += [(dot_file, os.path.join(self.output_dir, f"{VIEWS[view]}.{fmt}"), fmt) for fmt in self.formats]
+        convert_all(jobs, os.cpu_count() or 1)
+
+    def run_all(self):
+        self.validate(set(self.paths))
+        self.report()
+        self.render(list(VIEWS))
+
+    def update(self, changed):
+        """Apply changed files and run the work that depends on them"""
+        started = time.perf_counter()
+        applied, categories = set(), set()
+        for path in changed:
+            result = self.apply(path)
+            if result is None or not (result['triples']['added'] or result['triples']['removed']):
+                continue
+            applied.add(path)
+            if path in (CORE, ALIGNMENTS):
+                categories |= {name for name, sides in result['changes'].items()
+                               if sides['added'] or sides['removed']}
+        if not applied:
+            return
+        self.validate(applied)
+        if CORE in applied:
+            self.report()
+        views = [view for view, inputs in VIEW_INPUTS.items()
+                 if inputs & categories and (CORE in applied or view == 'mappings')]
+        if views:
+            self.render(views)
+        print(f"[watch] done in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Keep the ontology loaded and re-run affected checks on edits')
+    parser.add_argument('--interval', type=float, default=0.25, help='Polling interval in seconds (default: 0.25)')
+    parser.add_argument('--output-dir', default=os.path.join(REPO_ROOT, 'build', 'watch'),
+                        help='Directory for rebuilt views (default: build/watch)')
+    parser.add_argument('--format', action='append', default=[], choices=['svg', 'png', 'pdf'],
+                        help='Also render changed views with Graphviz (repeatable)')
+    parser.add_argument('--once', action='store_true', help='Run every check once and exit')
+    add_profile_arg(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    configure(args.profile)
+    started = time.perf_counter()
+    workspace = Workspace(args.output_dir, args.format)
+    print(f"[watch] loaded {len(workspace.paths)} files in {time.perf_counter() - started:.2f}s")
+    workspace.run_all()
+    if args.once:
+        return 1 if any(workspace.failed.values()) else 0
+    print(f"[watch] watching {', '.join(workspace.relative(p) for p in workspace.paths)} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(args.interval)
+            changed = workspace.changed_files()
+            if changed:
+                workspace.update(changed)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())